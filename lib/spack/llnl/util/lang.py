@@ -11,7 +11,9 @@
 import functools
 import collections
 import inspect
+import threading
 from datetime import datetime, timedelta
+from ordereddict_backport import OrderedDict
 from six import string_types
 import sys
 
@@ -608,6 +610,56 @@ def __repr__(self):
         return repr(self.ref_function())
 
 
+class LRUCache(object):
+    """Cache of bounded size that evicts the least recently used items.
+
+    The cache is safe to use from multiple threads.  It counts the hits
+    and misses of ``get()``, to measure how effective it is.
+    """
+
+    def __init__(self, maxsize):
+        """Create a cache holding at most ``maxsize`` items."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the value cached for key, or default if there is none."""
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            # re-insert the item to mark it as the most recently used
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def clear(self):
+        """Remove all the items and reset the counters."""
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+
 def load_module_from_file(module_name, module_path):
     """Loads a python module from the path of the corresponding file.
 
@@ -4,12 +4,18 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import codecs
+import itertools
+import multiprocessing
+import multiprocessing.pool
 import os
 import re
 import sys
 import tarfile
 import shutil
+import subprocess
 import tempfile
+import threading
+import time
 import hashlib
 import glob
 
@@ -33,6 +39,7 @@
 import spack.util.gpg
 import spack.util.spack_json as sjson
 import spack.util.spack_yaml as syaml
+import spack.util.executable
 import spack.mirror
 import spack.util.url as url_util
 import spack.util.web as web_util
@@ -46,6 +53,22 @@
 _build_cache_relative_path = 'build_cache'
 _build_cache_keys_relative_path = '_pgp'
 
+#: Compression backends for buildcache tarballs.  Each one maps to the
+#: compression format recorded in the spec.yaml, the extension of the
+#: tarball and the command compressing it (None for the tarfile module).
+_compressors = {
+    'gzip': ('gzip', '.tar.gz', None),
+    'pigz': ('gzip', '.tar.gz', ['pigz', '-c']),
+    'zstd': ('zstd', '.tar.zst', ['zstd', '-c', '-q', '-T0']),
+}
+
+#: Compression formats of buildcache tarballs, by their magic number
+_compression_magic = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bzip2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
 
 class BinaryCacheIndex(object):
     """
@@ -520,6 +543,18 @@ def __init__(self, msg):
         super(NewLayoutException, self).__init__(msg)
 
 
+class UnknownCompressionException(spack.error.SpackError):
+    """
+    Raised if a buildcache tarball uses an unsupported compression.
+    """
+
+    def __init__(self, compression, supported):
+        err_msg = "Unsupported buildcache compression '%s'.\n" % compression
+        err_msg += "Supported compressions are: %s" % ', '.join(
+            sorted(supported))
+        super(UnknownCompressionException, self).__init__(err_msg)
+
+
 def compute_hash(data):
     return hashlib.sha256(data.encode('utf-8')).hexdigest()
 
@@ -690,12 +725,93 @@ def sign_tarball(key, force, specfile_path):
     spack.util.gpg.sign(key, specfile_path, '%s.asc' % specfile_path)
 
 
-def generate_package_index(cache_prefix):
+def _read_spec_from_mirror(yaml_url):
+    """Fetch and parse a spec.yaml file from a mirror.
+
+    Args:
+        yaml_url (str): url of the spec.yaml file
+
+    Returns:
+        A (spec, error) tuple, where spec is None if the file could not be
+        read, and error is None if it could
+    """
+    try:
+        tty.debug('fetching {0}'.format(yaml_url))
+        _, _, yaml_file = web_util.read_from_url(yaml_url)
+        yaml_contents = codecs.getreader('utf-8')(yaml_file).read()
+        return Spec.from_yaml(yaml_contents), None
+    except (URLError, web_util.SpackWebError) as url_err:
+        return None, url_err
+
+
+def _spec_hash_from_yaml_name(file_path):
+    """Return the DAG hash encoded in the name of a spec.yaml file.
+
+    The name follows the convention of ``tarball_name()``, i.e. it ends
+    in ``-<dag_hash>.spec.yaml``.  Returns None if the name does not.
+    """
+    match = re.search(r'-([a-z0-9]{32})\.spec\.yaml$', file_path)
+    return match.group(1) if match else None
+
+
+def _read_package_index(cache_prefix, db):
+    """Read the existing index.json of a build cache into ``db``.
+
+    Args:
+        cache_prefix (str): url of the build cache
+        db (spack.database.Database): database to fill with the index
+
+    Returns:
+        True if the index could be read and matched its hash, False
+        otherwise
+    """
+    index_url = url_util.join(cache_prefix, 'index.json')
+    hash_url = url_util.join(cache_prefix, 'index.json.hash')
+    try:
+        _, _, stream = web_util.read_from_url(index_url)
+        index_string = codecs.getreader('utf-8')(stream).read()
+        _, _, stream = web_util.read_from_url(hash_url)
+        index_hash = codecs.getreader('utf-8')(stream).read()
+    except (URLError, web_util.SpackWebError) as url_err:
+        tty.debug('Unable to read index {0}'.format(index_url), url_err)
+        return False
+
+    if compute_hash(index_string) != index_hash:
+        tty.debug('Index {0} does not match its hash'.format(index_url))
+        return False
+
+    try:
+        db.read_index(index_string)
+    except spack_db.CorruptDatabaseError as e:
+        tty.debug('Unable to parse index {0}'.format(index_url), e)
+        return False
+    return True
+
+
+def generate_package_index(cache_prefix, concurrency=32, incremental=False):
     """Create the build cache index page.
 
     Creates (or replaces) the "index.json" page at the location given in
     cache_prefix.  This page contains a link for each binary package (.yaml)
     under cache_prefix.
+
+    The spec.yaml files are fetched and parsed by a pool of threads, but
+    they are added to the index in the order in which they were listed so
+    that the result is deterministic.
+
+    In incremental mode the existing index is read first, and only the
+    spec.yaml files whose hash it does not contain are fetched.  Specs
+    whose spec.yaml is no longer listed are dropped from the index.  A
+    spec.yaml that was overwritten in place keeps its DAG hash, so a full
+    rebuild is still needed to pick up such changes.  If the existing
+    index cannot be read, the index is rebuilt from scratch.
+
+    Args:
+        cache_prefix (str): url of the build cache
+        concurrency (int): maximum number of spec.yaml files fetched at the
+            same time
+        incremental (bool): update the existing index instead of
+            rebuilding it from all the spec.yaml files
     """
     tmpdir = tempfile.mkdtemp()
     db_root_dir = os.path.join(tmpdir, 'db_root')
@@ -703,26 +819,51 @@ def generate_package_index(cache_prefix):
                            enable_transaction_locking=False,
                            record_fields=['spec', 'ref_count'])
 
-    file_list = (
+    file_list = [
         entry
         for entry in web_util.list_url(cache_prefix)
-        if entry.endswith('.yaml'))
+        if entry.endswith('.yaml')]
+
+    # Specs from the existing index, by DAG hash, that can be reused
+    indexed_specs = {}
+    if incremental:
+        old_db = spack_db.Database(None, db_dir=os.path.join(tmpdir, 'old'),
+                                   enable_transaction_locking=False,
+                                   record_fields=['spec', 'ref_count'])
+        if _read_package_index(cache_prefix, old_db):
+            indexed_specs = dict(
+                (h, rec.spec) for h, rec in old_db._data.items())
+        else:
+            tty.debug('Rebuilding index of {0} from scratch'.format(
+                cache_prefix))
+
+    fetch_list = [
+        file_path for file_path in file_list
+        if _spec_hash_from_yaml_name(file_path) not in indexed_specs]
+
+    tty.debug('Retrieving {0} of {1} spec.yaml files from {2} to build '
+              'index'.format(len(fetch_list), len(file_list), cache_prefix))
+    yaml_urls = [url_util.join(cache_prefix, file_path)
+                 for file_path in fetch_list]
+    tp = multiprocessing.pool.ThreadPool(
+        processes=max(1, min(concurrency, len(yaml_urls))))
+    try:
+        results = dict(zip(fetch_list,
+                           tp.imap(_read_spec_from_mirror, yaml_urls)))
+    finally:
+        tp.terminate()
+        tp.join()
 
-    tty.debug('Retrieving spec.yaml files from {0} to build index'.format(
-        cache_prefix))
     for file_path in file_list:
-        try:
-            yaml_url = url_util.join(cache_prefix, file_path)
-            tty.debug('fetching {0}'.format(yaml_url))
-            _, _, yaml_file = web_util.read_from_url(yaml_url)
-            yaml_contents = codecs.getreader('utf-8')(yaml_file).read()
-            # yaml_obj = syaml.load(yaml_contents)
-            # s = Spec.from_yaml(yaml_obj)
-            s = Spec.from_yaml(yaml_contents)
-            db.add(s, None)
-        except (URLError, web_util.SpackWebError) as url_err:
-            tty.error('Error reading spec.yaml: {0}'.format(file_path))
-            tty.error(url_err)
+        if file_path in results:
+            s, url_err = results[file_path]
+            if url_err is not None:
+                tty.error('Error reading spec.yaml: {0}'.format(file_path))
+                tty.error(url_err)
+                continue
+        else:
+            s = indexed_specs[_spec_hash_from_yaml_name(file_path)]
+        db.add(s, None)
 
     try:
         index_json_path = os.path.join(db_root_dir, 'index.json')
@@ -804,22 +945,195 @@ def generate_key_index(key_prefix, tmpdir=None):
                 shutil.rmtree(tmpdir)
 
 
+class _ChecksumWriter(object):
+    """Write-only file object computing the sha256 checksum and the size of
+    the data written through it to another file object."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        self.fileobj.write(data)
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+
+class _CompressorPipe(object):
+    """Write-only file object compressing the data written to it with an
+    external command, whose output is copied to another file object."""
+
+    def __init__(self, command, fileobj):
+        exe = spack.util.executable.which(command[0], required=True)
+        self.command = exe.exe + command[1:]
+        self.proc = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._copy_output, args=(fileobj,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _copy_output(self, fileobj):
+        try:
+            for data in iter(lambda: self.proc.stdout.read(65536), b''):
+                fileobj.write(data)
+        except Exception as e:
+            # Stop the command rather than let it block on a full pipe
+            self.error = e
+            self.proc.stdout.close()
+
+    def write(self, data):
+        self.proc.stdin.write(data)
+
+    def close(self):
+        self.proc.stdin.close()
+        self.thread.join()
+        returncode = self.proc.wait()
+        if self.error is not None:
+            raise self.error
+        if returncode != 0:
+            raise spack.util.executable.ProcessError(
+                'Command exited with status %d:' % returncode,
+                ' '.join(self.command))
+
+
+def _add_prefix_to_tarball(tar, prefix, workdir, arcname, relpath=''):
+    """Recursively add ``prefix`` to ``tar`` under ``arcname``.
+
+    Files, links and directories that exist in ``workdir`` at the same
+    relative path are added in place of the ones in the prefix.
+    """
+    def is_dir(path):
+        return os.path.isdir(path) and not os.path.islink(path)
+
+    path = os.path.join(prefix, relpath)
+    alt_path = os.path.join(workdir, relpath)
+    if not os.path.lexists(path) or (
+            os.path.lexists(alt_path) and not is_dir(alt_path)):
+        path = alt_path
+
+    tarinfo = tar.gettarinfo(
+        path, os.path.normpath(os.path.join(arcname, relpath)))
+    if tarinfo is None:
+        tty.warn('Unsupported file type, not added to tarball: %s' % path)
+        return
+
+    if tarinfo.isreg():
+        with open(path, 'rb') as f:
+            tar.addfile(tarinfo, f)
+        return
+
+    tar.addfile(tarinfo)
+    if tarinfo.isdir():
+        entries = set()
+        for d in (os.path.join(prefix, relpath), alt_path):
+            if is_dir(d):
+                entries.update(os.listdir(d))
+        for entry in sorted(entries):
+            _add_prefix_to_tarball(
+                tar, prefix, workdir, arcname, os.path.join(relpath, entry))
+
+
+def _write_prefix_tarball(spackfile_path, tarfile_name, prefix, workdir,
+                          compression='gzip'):
+    """Write a compressed tarball of an install prefix as the first
+    member of a new .spack archive.
+
+    The compressed data is written straight into the archive and hashed on
+    the way. The archive is terminated, so that other members can be
+    appended to it afterwards.
+
+    Args:
+        spackfile_path (str): path of the .spack archive to create
+        tarfile_name (str): name of the tarball member in the archive
+        prefix (str): install prefix to archive
+        workdir (str): directory with files to be archived in place of
+            those in the prefix (see ``_add_prefix_to_tarball()``)
+        compression (str): compression backend, one of ``_compressors``
+
+    Returns:
+        str: the sha256 checksum of the compressed tarball
+    """
+    # The GNU format encodes any size in the same number of header blocks,
+    # so the header can be written once the size is known.
+    tarinfo = tarfile.TarInfo(tarfile_name)
+    header_size = len(tarinfo.tobuf(tarfile.GNU_FORMAT))
+    with open(spackfile_path, 'wb') as spackfile:
+        spackfile.write(b'\0' * header_size)
+        writer = _ChecksumWriter(spackfile)
+        command = _compressors[compression][2]
+        if command is None:
+            with closing(tarfile.open(tarfile_name, 'w|gz',
+                                      fileobj=writer)) as tar:
+                _add_prefix_to_tarball(
+                    tar, prefix, workdir, os.path.basename(prefix))
+        else:
+            pipe = _CompressorPipe(command, writer)
+            try:
+                with closing(tarfile.open(tarfile_name, 'w|',
+                                          fileobj=pipe)) as tar:
+                    _add_prefix_to_tarball(
+                        tar, prefix, workdir, os.path.basename(prefix))
+            finally:
+                pipe.close()
+
+        # Pad the member to a whole block and terminate the archive
+        padding = -writer.size % tarfile.BLOCKSIZE
+        spackfile.write(b'\0' * (padding + 2 * tarfile.BLOCKSIZE))
+
+        tarinfo.size = writer.size
+        tarinfo.mtime = time.time()
+        tarinfo.mode = 0o644
+        spackfile.seek(0)
+        spackfile.write(tarinfo.tobuf(tarfile.GNU_FORMAT))
+    return writer.hexdigest()
+
+
+def _copy_files_to_make_relative(prefix, workdir):
+    """Copy the binaries and links of a prefix that are listed in the
+    buildinfo file in workdir to workdir, where they can be made relative.
+    """
+    buildinfo = read_buildinfo_file(workdir)
+    for filename in buildinfo['relocate_binaries']:
+        mkdirp(os.path.dirname(os.path.join(workdir, filename)))
+        shutil.copy2(os.path.join(prefix, filename),
+                     os.path.join(workdir, filename))
+    for linkname in buildinfo.get('relocate_links', []):
+        mkdirp(os.path.dirname(os.path.join(workdir, linkname)))
+        os.symlink(os.readlink(os.path.join(prefix, linkname)),
+                   os.path.join(workdir, linkname))
+
+
 def build_tarball(spec, outdir, force=False, rel=False, unsigned=False,
-                  allow_root=False, key=None, regenerate_index=False):
+                  allow_root=False, key=None, regenerate_index=False,
+                  compression=None):
     """
     Build a tarball from given spec and put it into the directory structure
     used at the mirror (following <tarball_directory_name>).
+
+    The tarball is compressed with the given compression backend, which
+    defaults to ``config:buildcache_compression``.
     """
     if not spec.concrete:
         raise ValueError('spec must be concrete to build tarball')
 
+    compression = compression or config.get(
+        'config:buildcache_compression', 'gzip')
+    if compression not in _compressors:
+        raise UnknownCompressionException(compression, _compressors)
+    compression_format, tarfile_ext, _ = _compressors[compression]
+
     # set up some paths
     tmpdir = tempfile.mkdtemp()
     cache_prefix = build_cache_prefix(tmpdir)
 
-    tarfile_name = tarball_name(spec, '.tar.gz')
+    tarfile_name = tarball_name(spec, tarfile_ext)
     tarfile_dir = os.path.join(cache_prefix, tarball_directory_name(spec))
-    tarfile_path = os.path.join(tarfile_dir, tarfile_name)
     spackfile_path = os.path.join(
         cache_prefix, tarball_path_name(spec, '.spack'))
 
@@ -850,52 +1164,34 @@ def build_tarball(spec, outdir, force=False, rel=False, unsigned=False,
         else:
             raise NoOverwriteException(url_util.format(remote_specfile_path))
 
-    # make a copy of the install directory to work with
+    # The install prefix is read only once, while the compressed tarball
+    # is streamed into the .spack archive.  Files that differ from those in
+    # the prefix (the buildinfo file, and binaries and links made relative)
+    # are written to workdir and taken from there instead.
     workdir = os.path.join(tmpdir, os.path.basename(spec.prefix))
-    # install_tree copies hardlinks
-    # create a temporary tarfile from prefix and exract it to workdir
-    # tarfile preserves hardlinks
-    temp_tarfile_name = tarball_name(spec, '.tar')
-    temp_tarfile_path = os.path.join(tarfile_dir, temp_tarfile_name)
-    with closing(tarfile.open(temp_tarfile_path, 'w')) as tar:
-        tar.add(name='%s' % spec.prefix,
-                arcname='.')
-    with closing(tarfile.open(temp_tarfile_path, 'r')) as tar:
-        tar.extractall(workdir)
-    os.remove(temp_tarfile_path)
+    mkdirp(os.path.join(workdir, '.spack'))
 
-    # create info for later relocation and create tar
+    # create info for later relocation
     write_buildinfo_file(spec, workdir, rel)
 
     # optionally make the paths in the binaries relative to each other
     # in the spack install tree before creating tarball
-    if rel:
-        try:
+    try:
+        if rel:
+            _copy_files_to_make_relative(spec.prefix, workdir)
             make_package_relative(workdir, spec, allow_root)
-        except Exception as e:
-            shutil.rmtree(workdir)
-            shutil.rmtree(tarfile_dir)
-            shutil.rmtree(tmpdir)
-            tty.die(e)
-    else:
-        try:
+        else:
             check_package_relocatable(workdir, spec, allow_root)
-        except Exception as e:
-            shutil.rmtree(workdir)
-            shutil.rmtree(tarfile_dir)
-            shutil.rmtree(tmpdir)
-            tty.die(e)
+    except Exception as e:
+        shutil.rmtree(tmpdir)
+        tty.die(e)
 
-    # create gzip compressed tarball of the install prefix
-    with closing(tarfile.open(tarfile_path, 'w:gz')) as tar:
-        tar.add(name='%s' % workdir,
-                arcname='%s' % os.path.basename(spec.prefix))
-    # remove copy of install directory
+    # create gzip compressed tarball of the install prefix as the first
+    # member of the .spack archive, and get its sha256 checksum
+    checksum = _write_prefix_tarball(
+        spackfile_path, tarfile_name, spec.prefix, workdir, compression)
     shutil.rmtree(workdir)
 
-    # get the sha256 checksum of the tarball
-    checksum = checksum_tarball(tarfile_path)
-
     # add sha256 checksum to spec.yaml
     with open(spec_file, 'r') as inputfile:
         content = inputfile.read()
@@ -910,6 +1206,7 @@ def build_tarball(spec, outdir, force=False, rel=False, unsigned=False,
     buildinfo['relative_prefix'] = os.path.relpath(
         spec.prefix, spack.store.layout.root)
     buildinfo['relative_rpaths'] = rel
+    buildinfo['compression'] = compression_format
     spec_dict['buildinfo'] = buildinfo
 
     with open(specfile_path, 'w') as outfile:
@@ -920,16 +1217,14 @@ def build_tarball(spec, outdir, force=False, rel=False, unsigned=False,
         key = select_signing_key(key)
         sign_tarball(key, force, specfile_path)
 
-    # put tarball, spec and signature files in .spack archive
-    with closing(tarfile.open(spackfile_path, 'w')) as tar:
-        tar.add(name=tarfile_path, arcname='%s' % tarfile_name)
+    # add spec and signature files to the .spack archive
+    with closing(tarfile.open(spackfile_path, 'a')) as tar:
         tar.add(name=specfile_path, arcname='%s' % specfile_name)
         if not unsigned:
             tar.add(name='%s.asc' % specfile_path,
                     arcname='%s.asc' % specfile_name)
 
     # cleanup file moved to archive
-    os.remove(tarfile_path)
     if not unsigned:
         os.remove('%s.asc' % specfile_path)
 
@@ -1043,19 +1338,115 @@ def make_package_relative(workdir, spec, allow_root):
 
 def check_package_relocatable(workdir, spec, allow_root):
     """
-    Check if package binaries are relocatable.
-    Change links to placeholder links.
+    Check if the binaries in the prefix of the package are relocatable.
+    The list of binaries is read from the buildinfo file in workdir.
     """
     buildinfo = read_buildinfo_file(workdir)
     cur_path_names = list()
     for filename in buildinfo['relocate_binaries']:
-        cur_path_names.append(os.path.join(workdir, filename))
+        cur_path_names.append(os.path.join(spec.prefix, filename))
     relocate.raise_if_not_relocatable(cur_path_names, allow_root)
 
 
+def _relocation_jobs():
+    """Number of worker processes used to relocate the files of a package"""
+    return min(config.get('config:build_jobs', 16),
+               multiprocessing.cpu_count())
+
+
+def _relocation_chunks(files, nchunks):
+    """
+    Split files into at most ``nchunks`` lists for the relocation workers.
+
+    Prefixes extracted from a buildcache keep their hardlinks, so several of
+    the files may be the same inode. All the paths to one inode go in the
+    same chunk, in their original order, so that no two workers modify a
+    file at once.
+    """
+    groups, links = [], {}
+    for path in files:
+        try:
+            st = os.stat(path)
+            key = (st.st_dev, st.st_ino)
+        except OSError:
+            key = path
+        if key not in links:
+            links[key] = []
+            groups.append(links[key])
+        links[key].append(path)
+
+    nchunks = min(len(groups), nchunks)
+    return [list(itertools.chain.from_iterable(groups[i::nchunks]))
+            for i in range(nchunks)]
+
+
+def _map_relocation(function, files, *args):
+    """
+    Apply ``function(chunk, *args)`` to chunks of the files in a bounded pool
+    of worker processes.
+
+    Hardlinks to the same file are always in the same chunk (see
+    ``_relocation_chunks()``). Every chunk is processed before any error is
+    reported, so that a failure does not leave other files half-relocated
+    behind our back.
+
+    Args:
+        function (callable): module-level relocation function taking a list
+            of files as its first argument
+        files (list): files to be relocated
+        args: remaining arguments of the relocation function
+
+    Returns:
+        list: the return values of the function for every chunk
+
+    Raises:
+        Exception: the first error (e.g., ``InstallRootStringError``,
+            ``BinaryTextReplaceError`` or ``OSError``) raised while
+            relocating a chunk
+    """
+    jobs = _relocation_jobs()
+    if jobs < 2:
+        return [function(files, *args)]
+
+    chunks = _relocation_chunks(files, jobs * 4)
+    if len(chunks) < 2:
+        return [function(files, *args)]
+
+    results, errors = [], []
+    pool = llnl.util.lang.fork_context.Pool(processes=jobs)
+    try:
+        pending = [pool.apply_async(function, (chunk,) + args)
+                   for chunk in chunks]
+        for chunk, result in zip(chunks, pending):
+            try:
+                results.append(result.get())
+            except Exception as e:
+                tty.debug('Failed to relocate {0}'.format(', '.join(chunk)))
+                errors.append(e)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    if errors:
+        for error in errors[1:]:
+            tty.debug(str(error))
+        raise errors[0]
+
+    return results
+
+
+def _files_not_relocatable(files, paths_to_relocate):
+    """Return the files that still contain any of the paths to relocate."""
+    return [f for f in files if not relocate.file_is_relocatable(
+        f, paths_to_relocate=paths_to_relocate)]
+
+
 def relocate_package(spec, allow_root):
     """
     Relocate the given package
+
+    The files of the package are relocated by a bounded pool of worker
+    processes (see ``config:build_jobs``).
     """
     workdir = str(spec.prefix)
     buildinfo = read_buildinfo_file(workdir)
@@ -1113,20 +1504,22 @@ def is_backup_file(file):
         # do the relocation of path in binaries
         platform = spack.architecture.get_platform(spec.platform)
         if 'macho' in platform.binary_formats:
-            relocate.relocate_macho_binaries(files_to_relocate,
-                                             old_layout_root,
-                                             new_layout_root,
-                                             prefix_to_prefix, rel,
-                                             old_prefix,
-                                             new_prefix)
+            _map_relocation(relocate.relocate_macho_binaries,
+                            files_to_relocate,
+                            old_layout_root,
+                            new_layout_root,
+                            prefix_to_prefix, rel,
+                            old_prefix,
+                            new_prefix)
 
         if 'elf' in platform.binary_formats:
-            relocate.relocate_elf_binaries(files_to_relocate,
-                                           old_layout_root,
-                                           new_layout_root,
-                                           prefix_to_prefix, rel,
-                                           old_prefix,
-                                           new_prefix)
+            _map_relocation(relocate.relocate_elf_binaries,
+                            files_to_relocate,
+                            old_layout_root,
+                            new_layout_root,
+                            prefix_to_prefix, rel,
+                            old_prefix,
+                            new_prefix)
             # Relocate links to the new install prefix
             links = [link for link in buildinfo.get('relocate_links', [])]
             relocate.relocate_links(
@@ -1135,37 +1528,67 @@ def is_backup_file(file):
 
         # For all buildcaches
         # relocate the install prefixes in text files including dependencies
-        relocate.relocate_text(text_names,
-                               old_layout_root, new_layout_root,
-                               old_prefix, new_prefix,
-                               old_spack_prefix,
-                               new_spack_prefix,
-                               prefix_to_prefix)
+        _map_relocation(relocate.relocate_text,
+                        text_names,
+                        old_layout_root, new_layout_root,
+                        old_prefix, new_prefix,
+                        old_spack_prefix,
+                        new_spack_prefix,
+                        prefix_to_prefix)
 
         paths_to_relocate = [old_prefix, old_layout_root]
         paths_to_relocate.extend(prefix_to_hash.keys())
-        files_to_relocate = list(filter(
-            lambda pathname: not relocate.file_is_relocatable(
-                pathname, paths_to_relocate=paths_to_relocate),
-            map(lambda filename: os.path.join(workdir, filename),
-                buildinfo['relocate_binaries'])))
+        files_to_relocate = list(itertools.chain.from_iterable(
+            _map_relocation(
+                _files_not_relocatable,
+                [os.path.join(workdir, filename)
+                 for filename in buildinfo['relocate_binaries']],
+                paths_to_relocate)))
         # relocate the install prefixes in binary files including dependencies
-        relocate.relocate_text_bin(files_to_relocate,
-                                   old_prefix, new_prefix,
-                                   old_spack_prefix,
-                                   new_spack_prefix,
-                                   prefix_to_prefix)
+        _map_relocation(relocate.relocate_text_bin,
+                        files_to_relocate,
+                        old_prefix, new_prefix,
+                        old_spack_prefix,
+                        new_spack_prefix,
+                        prefix_to_prefix)
 
 # If we are installing back to the same location
 # relocate the sbang location if the spack directory changed
     else:
         if old_spack_prefix != new_spack_prefix:
-            relocate.relocate_text(text_names,
-                                   old_layout_root, new_layout_root,
-                                   old_prefix, new_prefix,
-                                   old_spack_prefix,
-                                   new_spack_prefix,
-                                   prefix_to_prefix)
+            _map_relocation(relocate.relocate_text,
+                            text_names,
+                            old_layout_root, new_layout_root,
+                            old_prefix, new_prefix,
+                            old_spack_prefix,
+                            new_spack_prefix,
+                            prefix_to_prefix)
+
+
+def _extract_compressed_tarball(tarfile_path, path):
+    """Extract a buildcache tarball, detecting its compression format from
+    its magic number."""
+    with open(tarfile_path, 'rb') as f:
+        magic = f.read(4)
+    if not any(magic.startswith(m) and c == 'zstd'
+               for m, c in _compression_magic):
+        # gzip and bzip2 are handled by the tarfile module
+        with closing(tarfile.open(tarfile_path, 'r')) as tar:
+            tar.extractall(path=path)
+        return
+
+    zstd = spack.util.executable.which('zstd', required=True)
+    command = zstd.exe + ['-d', '-c', '-q', tarfile_path]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        with closing(tarfile.open(mode='r|', fileobj=proc.stdout)) as tar:
+            tar.extractall(path=path)
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise spack.util.executable.ProcessError(
+            'Command exited with status %d:' % returncode, ' '.join(command))
 
 
 def extract_tarball(spec, filename, allow_root=False, unsigned=False,
@@ -1190,10 +1613,11 @@ def extract_tarball(spec, filename, allow_root=False, unsigned=False,
 
     with closing(tarfile.open(spackfile_path, 'r')) as tar:
         tar.extractall(tmpdir)
-    # some buildcache tarfiles use bzip2 compression
-    if not os.path.exists(tarfile_path):
-        tarfile_name = tarball_name(spec, '.tar.bz2')
-        tarfile_path = os.path.join(tmpdir, tarfile_name)
+    # some buildcache tarfiles use zstd or bzip2 compression
+    for ext in ('.tar.zst', '.tar.bz2'):
+        if not os.path.exists(tarfile_path):
+            tarfile_name = tarball_name(spec, ext)
+            tarfile_path = os.path.join(tmpdir, tarfile_name)
     if not unsigned:
         if os.path.exists('%s.asc' % specfile_path):
             try:
@@ -1232,6 +1656,12 @@ def extract_tarball(spec, filename, allow_root=False, unsigned=False,
     buildinfo = spec_dict.get('buildinfo', {})
     old_relative_prefix = buildinfo.get('relative_prefix', new_relative_prefix)
     rel = buildinfo.get('relative_rpaths')
+    # fail clearly on tarballs compressed in a format we can't read
+    compression = buildinfo.get('compression', 'gzip')
+    supported = [c for _, c in _compression_magic]
+    if compression not in supported:
+        shutil.rmtree(tmpdir)
+        raise UnknownCompressionException(compression, supported)
     # if the original relative prefix and new relative prefix differ the
     # directory layout has changed and the  buildcache cannot be installed
     # if it was created with relative rpaths
@@ -1247,8 +1677,7 @@ def extract_tarball(spec, filename, allow_root=False, unsigned=False,
 #        raise NewLayoutException(msg)
 
     # extract the tarball in a temp directory
-    with closing(tarfile.open(tarfile_path, 'r')) as tar:
-        tar.extractall(path=tmpdir)
+    _extract_compressed_tarball(tarfile_path, tmpdir)
     # get the parent directory of the file .spack/binary_distribution
     # this should the directory unpacked from the tarball whose
     # name is unknown because the prefix naming is unknown
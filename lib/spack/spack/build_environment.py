@@ -831,6 +831,35 @@ def child_fun():
     passes it to the parent wrapped in a ChildError.  The parent is
     expected to handle (or re-raise) the ChildError.
     """
+    return start_build_process(pkg, function, dirty, fake).complete()
+
+
+def start_build_process(pkg, function, dirty, fake, jobs=None,
+                        forward_stdin=True):
+    """Start a child process to do part of a spack build without waiting
+    for it to finish.
+
+    This is the non-blocking counterpart of ``fork()``, which allows the
+    caller to keep several builds running at the same time.
+
+    Args:
+
+        pkg (PackageBase): package whose environment we should set up the
+            forked process for.
+        function (callable): argless function to run in the child
+            process.
+        dirty (bool): If True, do NOT clean the environment before
+            building.
+        fake (bool): If True, skip package setup b/c it's not a real build
+        jobs (int): number of parallel make jobs the child may use, or
+            None to use ``config:build_jobs``
+        forward_stdin (bool): If True, give the child access to the
+            terminal's stdin (e.g., to toggle verbosity).  This must be
+            disabled when several children are running concurrently.
+
+    Returns:
+        (BuildProcess): handle used to wait for the child's result
+    """
 
     def child_process(child_pipe, input_stream):
         # We are in the child process. Python sets sys.stdin to
@@ -842,6 +871,9 @@ def child_process(child_pipe, input_stream):
             sys.stdin = input_stream
 
         try:
+            if jobs is not None:
+                spack.config.set('config:build_jobs', jobs,
+                                 scope='command_line')
             if not fake:
                 setup_package(pkg, dirty=dirty)
             return_value = function()
@@ -883,7 +915,8 @@ def child_process(child_pipe, input_stream):
     input_stream = None
     try:
         # Forward sys.stdin when appropriate, to allow toggling verbosity
-        if sys.stdin.isatty() and hasattr(sys.stdin, 'fileno'):
+        if forward_stdin and sys.stdin.isatty() and \
+                hasattr(sys.stdin, 'fileno'):
             input_stream = os.fdopen(os.dup(sys.stdin.fileno()))
 
         p = fork_context.Process(
@@ -899,27 +932,69 @@ def child_process(child_pipe, input_stream):
         if input_stream is not None:
             input_stream.close()
 
-    child_result = parent_pipe.recv()
-    p.join()
+    # Only the child writes to its end of the pipe; closing it here lets the
+    # parent see EOF if the child dies without sending a result.
+    child_pipe.close()
+
+    return BuildProcess(pkg, p, parent_pipe)
+
 
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, StopPhase):
-        # do not print
-        raise child_result
+class BuildProcess(object):
+    """Handle on a child build process started by ``start_build_process``.
 
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
+    The handle has a ``fileno()``, so it can be passed to ``select.select()``
+    to find out which of several concurrent builds has finished.
+    """
+
+    def __init__(self, pkg, process, pipe):
+        self.pkg = pkg
+        self.process = process
+        self.pipe = pipe
+
+    def fileno(self):
+        """File descriptor that becomes readable when the child is done."""
+        return self.pipe.fileno()
 
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
+    def done(self):
+        """``True`` if the child has sent its result, otherwise ``False``."""
+        return self.pipe.poll()
 
-    return child_result
+    def terminate(self):
+        """Kill the child process, e.g., when aborting an install."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.pipe.close()
+
+    def complete(self):
+        """Wait for the child to finish and return its result.
+
+        Raises:
+            StopPhase: if the child stopped early at the request of the user
+            ChildError: if anything went wrong in the child
+        """
+        child_result = self.pipe.recv()
+        self.process.join()
+        self.pipe.close()
+
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, StopPhase):
+            # do not print
+            raise child_result
+
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = self.pkg
+
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here
+            # rather than waiting until the call to SpackError.die() in
+            # main(). This allows exception handling output to be logged
+            # from within Spack.  see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        return child_result
 
 
 def get_package_context(traceback, context=3):
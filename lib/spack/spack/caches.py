@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 """Caches used by Spack to store data"""
+import errno
 import os
 
 import llnl.util.lang
@@ -12,7 +13,6 @@
 import spack.error
 import spack.paths
 import spack.config
-import spack.fetch_strategy
 import spack.util.file_cache
 import spack.util.path
 
@@ -46,6 +46,7 @@ def _fetch_cache():
         path = os.path.join(spack.paths.var_path, "cache")
     path = spack.util.path.canonicalize_path(path)
 
+    import spack.fetch_strategy
     return spack.fetch_strategy.FsCache(path)
 
 
@@ -61,7 +62,17 @@ def store(self, fetcher, relative_dest):
         # normally be cached (e.g. the current tip of an hg/git branch)
         dst = os.path.join(self.root, relative_dest)
         mkdirp(os.path.dirname(dst))
-        fetcher.archive(dst)
+
+        # Archive to a temporary file first, so that concurrent mirroring
+        # processes never see a partial archive.
+        tmp = os.path.join(os.path.dirname(dst), '.{0}.{1}'.format(
+            os.getpid(), os.path.basename(dst)))
+        try:
+            fetcher.archive(tmp)
+            os.rename(tmp, dst)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
 
     def symlink(self, mirror_ref):
         """Symlink a human readible path in our mirror to the actual
@@ -80,7 +91,12 @@ def symlink(self, mirror_ref):
                 # to https://github.com/spack/spack/pull/13908)
                 os.unlink(cosmetic_path)
             mkdirp(os.path.dirname(cosmetic_path))
-            os.symlink(relative_dst, cosmetic_path)
+            try:
+                os.symlink(relative_dst, cosmetic_path)
+            except OSError as e:
+                # Another process mirroring the same resource was faster
+                if e.errno != errno.EEXIST:
+                    raise
 
 
 #: Spack's local cache for downloaded source archives
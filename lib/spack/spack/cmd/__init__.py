@@ -23,8 +23,6 @@
 import spack.error
 import spack.extensions
 import spack.paths
-import spack.spec
-import spack.store
 import spack.util.spack_json as sjson
 import spack.util.string
 from ruamel.yaml.error import MarkedYAMLError
@@ -81,9 +79,7 @@ def all_commands():
     global _all_commands
     if _all_commands is None:
         _all_commands = []
-        command_paths = [spack.paths.command_path]  # Built-in commands
-        command_paths += spack.extensions.get_command_paths()  # Extensions
-        for path in command_paths:
+        for path in _command_paths():
             for file in os.listdir(path):
                 if file.endswith(".py") and not re.search(ignore_files, file):
                     cmd = re.sub(r'.py$', '', file)
@@ -94,6 +90,32 @@ def all_commands():
     return _all_commands
 
 
+def command_files():
+    """Get the path of the file that defines each spack command.
+
+    Like ``all_commands()``, this does not import any command module.
+    Built-in commands take precedence over extension commands with the
+    same name, as they do in ``get_module()``.
+
+    Returns:
+        (dict): source file path, by command name
+    """
+    files = {}
+    for path in reversed(_command_paths()):
+        for file in os.listdir(path):
+            if file.endswith(".py") and not re.search(ignore_files, file):
+                cmd = re.sub(r'.py$', '', file)
+                files[cmd_name(cmd)] = os.path.join(path, file)
+    return files
+
+
+def _command_paths():
+    """Directories that contain command modules, built-in ones first."""
+    command_paths = [spack.paths.command_path]  # Built-in commands
+    command_paths += spack.extensions.get_command_paths()  # Extensions
+    return command_paths
+
+
 def remove_options(parser, *options):
     """Remove some options from a parser."""
     for option in options:
@@ -154,6 +176,7 @@ def parse_specs(args, **kwargs):
     normalize = kwargs.get('normalize', False)
     tests = kwargs.get('tests', False)
 
+    import spack.spec
     try:
         sargs = args
         if not isinstance(args, six.string_types):
@@ -225,6 +248,7 @@ def disambiguate_spec_from_hashes(spec, hashes, local=False,
             of spack.database.InstallStatus): install status argument passed to
             database query. See ``spack.database.Database._query`` for details.
     """
+    import spack.store
     if local:
         matching_specs = spack.store.db.query_local(spec, hashes=hashes,
                                                     installed=installed)
@@ -280,6 +304,7 @@ def display_specs_as_json(specs, deps=False):
 def iter_groups(specs, indent, all_headers):
     """Break a list of specs into groups indexed by arch/compiler."""
     # Make a dict with specs keyed by architecture and compiler.
+    import spack.spec
     index = index_by(specs, ('architecture', 'compiler'))
     ispace = indent * ' '
 
@@ -415,6 +440,7 @@ def format_list(specs):
 
         # getting lots of prefixes requires DB lookups. Ensure
         # all spec.prefix calls are in one transaction.
+        import spack.store
         with spack.store.db.read_transaction():
             for string, spec in formatted:
                 if not string:
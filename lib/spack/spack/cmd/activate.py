@@ -8,6 +8,7 @@
 import spack.cmd
 import spack.cmd.common.arguments as arguments
 import spack.environment as ev
+import spack.store
 from spack.filesystem_view import YamlFilesystemView
 
 description = "activate a package extension"
@@ -234,6 +234,9 @@ def setup_parser(subparser):
     update_index.add_argument(
         '-k', '--keys', default=False, action='store_true',
         help='If provided, key index will be updated as well as package index')
+    update_index.add_argument(
+        '-i', '--incremental', default=False, action='store_true',
+        help='Only fetch the spec.yaml files missing from the existing index')
     update_index.set_defaults(func=buildcache_update_index)
 
 
@@ -779,7 +782,8 @@ def buildcache_update_index(args):
     outdir = url_util.format(mirror.push_url)
 
     bindist.generate_package_index(
-        url_util.join(outdir, bindist.build_cache_relative_path()))
+        url_util.join(outdir, bindist.build_cache_relative_path()),
+        incremental=args.incremental)
 
     if args.keys:
         keys_url = url_util.join(outdir,
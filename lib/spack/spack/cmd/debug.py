@@ -16,6 +16,7 @@
 
 import spack.architecture as architecture
 import spack.paths
+import spack.store
 from spack.main import get_version
 from spack.util.executable import which
 
@@ -39,9 +39,10 @@ def inverted_dependencies():
        actual dependents.
     """
     dag = {}
-    for pkg in spack.repo.path.all_packages():
-        dag.setdefault(pkg.name, set())
-        for dep in pkg.dependencies:
+    for pkg_name in spack.repo.path.all_package_names():
+        dag.setdefault(pkg_name, set())
+        metadata = spack.repo.path.package_metadata(pkg_name)
+        for dep in metadata['dependencies']:
             deps = [dep]
 
             # expand virtuals if necessary
@@ -49,7 +50,7 @@ def inverted_dependencies():
                 deps += [s.name for s in spack.repo.path.providers_for(dep)]
 
             for d in deps:
-                dag.setdefault(d, set()).add(pkg.name)
+                dag.setdefault(d, set()).add(pkg_name)
     return dag
 
 
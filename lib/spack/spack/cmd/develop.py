@@ -10,6 +10,7 @@
 import spack.cmd
 import spack.cmd.common.arguments as arguments
 import spack.environment as ev
+import spack.spec
 
 from spack.error import SpackError
 
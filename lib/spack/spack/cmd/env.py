@@ -304,6 +304,10 @@ def env_view_setup_parser(subparser):
         'view_path', nargs='?',
         help="when enabling a view, optionally set the path manually"
     )
+    subparser.add_argument(
+        '--full', action='store_true',
+        help="when regenerating, rebuild the view from scratch instead of "
+        "updating the packages that changed")
 
 
 def env_view(args):
@@ -311,7 +315,7 @@ def env_view(args):
 
     if env:
         if args.action == ViewAction.regenerate:
-            env.regenerate_views()
+            env.regenerate_views(full=args.full)
         elif args.action == ViewAction.enable:
             if args.view_path:
                 view_path = args.view_path
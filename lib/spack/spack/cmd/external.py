@@ -17,6 +17,8 @@
 import spack
 import spack.cmd
 import spack.error
+import spack.repo
+import spack.spec
 import spack.util.environment
 import spack.util.spack_yaml as syaml
 
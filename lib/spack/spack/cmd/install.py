@@ -19,6 +19,8 @@
 import spack.fetch_strategy
 import spack.paths
 import spack.report
+import spack.spec
+import spack.store
 from spack.error import SpackError
 
 
@@ -46,6 +48,8 @@ def update_kwargs_from_args(args, kwargs):
         'stop_at': args.until,
         'unsigned': args.unsigned,
         'full_hash_match': args.full_hash_match,
+        'jobs_packages': args.jobs_packages,
+        'prefetch_jobs': args.prefetch_jobs,
     })
 
     kwargs.update({
@@ -77,6 +81,16 @@ def setup_parser(subparser):
         '-u', '--until', type=str, dest='until', default=None,
         help="phase to stop after when installing (default None)")
     arguments.add_common_arguments(subparser, ['jobs'])
+    subparser.add_argument(
+        '--jobs-packages', type=int, default=1, dest='jobs_packages',
+        metavar='N',
+        help="build up to N independent packages at the same time, "
+        "splitting the parallel jobs between them (default 1)")
+    subparser.add_argument(
+        '--prefetch-jobs', type=int, default=4, dest='prefetch_jobs',
+        metavar='N',
+        help="download the sources of up to N packages at the same time, "
+        "ahead of their builds (default 4, 0 disables prefetching)")
     subparser.add_argument(
         '--overwrite', action='store_true',
         help="reinstall an existing spec, even if it has dependents")
@@ -280,6 +294,19 @@ def install(parser, args, **kwargs):
         parser.print_help()
         return
 
+    if args.jobs_packages < 1:
+        tty.die('--jobs-packages must be a positive integer')
+
+    if args.prefetch_jobs < 0:
+        tty.die('--prefetch-jobs must not be negative')
+
+    if args.jobs_packages > 1 and args.log_format is not None:
+        # Reporters record the result of each package as soon as its build
+        # is started, so they need the packages to be built one at a time.
+        tty.warn('Building one package at a time to generate the {0} report'
+                 .format(args.log_format))
+        args.jobs_packages = 1
+
     if not args.spec and not args.specfiles:
         # if there are no args but an active environment
         # then install the packages from it.
@@ -85,9 +85,10 @@ def match(p, f):
                 if f.match(p):
                     return True
 
-                pkg = spack.repo.get(p)
-                if pkg.__doc__:
-                    return f.match(pkg.__doc__)
+                description = spack.repo.path.package_metadata(p)[
+                    'description']
+                if description:
+                    return f.match(description)
                 return False
         else:
             def match(p, f):
@@ -65,6 +65,14 @@ def setup_parser(subparser):
         '-n', '--versions-per-spec',
         help="the number of versions to fetch for each spec, choose 'all' to"
              " retrieve all versions of each package")
+    create_parser.add_argument(
+        '-j', '--jobs', type=int, default=4, metavar='N',
+        help="add up to N packages to the mirror at the same time"
+             " (default 4)")
+    create_parser.add_argument(
+        '--jobs-per-host', type=int, default=None, metavar='N',
+        help="fetch the sources of at most N packages from the same server"
+             " at the same time (default: no limit)")
     arguments.add_common_arguments(create_parser, ['specs'])
 
     # used to construct scope arguments below
@@ -333,6 +341,11 @@ def _determine_specs_to_mirror(args):
 def mirror_create(args):
     """Create a directory to be used as a spack mirror, and fill it with
        package archives."""
+    if args.jobs < 1:
+        tty.die('--jobs must be at least 1')
+    if args.jobs_per_host is not None and args.jobs_per_host < 1:
+        tty.die('--jobs-per-host must be at least 1')
+
     mirror_specs = _determine_specs_to_mirror(args)
 
     mirror = spack.mirror.Mirror(
@@ -344,7 +357,8 @@ def mirror_create(args):
 
     # Actually do the work to create the mirror
     present, mirrored, error = spack.mirror.create(
-        directory, mirror_specs, args.skip_unstable_versions)
+        directory, mirror_specs, args.skip_unstable_versions,
+        jobs=args.jobs, jobs_per_host=args.jobs_per_host)
     p, m, e = len(present), len(mirrored), len(error)
 
     verb = "updated" if existed else "created"
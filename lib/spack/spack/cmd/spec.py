@@ -16,6 +16,7 @@
 import spack.spec
 import spack.store
 import spack.hash_types as ht
+import spack.repo
 
 description = "show what would be installed, given a spec"
 section = "build"
@@ -8,6 +8,7 @@
 
 import spack.cmd
 import spack.cmd.common.arguments as arguments
+import spack.store
 import spack.util.environment
 import spack.user_environment as uenv
 import spack.error
@@ -12,6 +12,7 @@
 
 import spack.cmd.common.arguments as arguments
 import spack.repo
+from spack.version import Version
 
 description = "list available versions of a package"
 section = "packaging"
@@ -29,16 +30,18 @@ def setup_parser(subparser):
 
 
 def versions(parser, args):
-    pkg = spack.repo.get(args.package)
+    # Safe versions are read from the repo metadata cache, so the package
+    # is only loaded when remote versions are needed
+    metadata = spack.repo.path.package_metadata(args.package)
 
     if sys.stdout.isatty():
         tty.msg('Safe versions (already checksummed):')
 
-    safe_versions = pkg.versions
+    safe_versions = [Version(v) for v in metadata['versions']]
 
     if not safe_versions:
         if sys.stdout.isatty():
-            tty.warn('Found no versions for {0}'.format(pkg.name))
+            tty.warn('Found no versions for {0}'.format(args.package))
             tty.debug('Manually add versions to the package.')
     else:
         colify(sorted(safe_versions, reverse=True), indent=2)
@@ -49,6 +52,8 @@ def versions(parser, args):
     if sys.stdout.isatty():
         tty.msg('Remote versions (not yet checksummed):')
 
+    pkg = spack.repo.get(args.package)
+
     fetched_versions = pkg.fetch_remote_versions(args.concurrency)
     remote_versions = set(fetched_versions).difference(safe_versions)
 
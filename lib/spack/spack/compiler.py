@@ -14,8 +14,10 @@
 import llnl.util.lang
 from llnl.util.filesystem import (
     path_contains_subdirectory, paths_containing_libs)
+from llnl.util.lock import LockError
 import llnl.util.tty as tty
 
+import spack.caches
 import spack.error
 import spack.spec
 import spack.version
@@ -23,23 +25,146 @@
 import spack.util.executable
 import spack.util.module_cmd
 import spack.compilers
+import spack.util.spack_json as sjson
 from spack.util.environment import filter_system_paths
+from spack.util.file_cache import CacheError
 
 __all__ = ['Compiler']
 
+#: name of the compiler probe cache in the misc cache
+probe_cache_key = 'compilers/probes.json'
+
+
+class CompilerProbeCache(object):
+    """Persistent cache of the results of running compilers.
+
+    Asking a compiler for its version or its implicit link directories
+    means running it, which can take seconds when it lives on a network
+    filesystem. Results are stored by compiler path and probe arguments,
+    together with the mtime and size of the compiler executable, and are
+    thrown away when the executable changes. ``spack clean --misc-cache``
+    clears the cache.
+
+    Problems reading or writing the cache are never fatal; the probe is
+    just run again.
+    """
+
+    def __init__(self, file_cache=None):
+        #: FileCache to store probes in (default: ``spack.caches.misc_cache``)
+        self.file_cache = file_cache
+        self._entries = {}
+        self._loaded = None
+
+    @property
+    def _cache(self):
+        return self.file_cache or spack.caches.misc_cache
+
+    @staticmethod
+    def _stamp(exe):
+        """Identify the current contents of an executable, or None."""
+        if not exe or not os.path.isabs(exe):
+            return None
+        try:
+            st = os.stat(exe)
+        except OSError:
+            return None
+        return [st.st_mtime, st.st_size]
+
+    @staticmethod
+    def _probe_key(probe):
+        return sjson.dump(list(probe))
+
+    def _load(self):
+        """Read the cache file, if it changed since it was last read."""
+        cache = self._cache
+        loaded = (cache.root, cache.mtime(probe_cache_key))
+        if loaded != self._loaded:
+            entries = {}
+            if loaded[1]:
+                with cache.read_transaction(probe_cache_key) as f:
+                    entries = sjson.load(f)
+            self._entries, self._loaded = entries, loaded
+        return self._entries
+
+    def get(self, exe, probe):
+        """Get a cached probe result.
+
+        Args:
+            exe (str): absolute path of the compiler executable
+            probe (list): JSON-serializable description of the probe: the
+                arguments and anything else that affects its result
+
+        Returns:
+            The value stored with ``set()``, or None if there is no valid
+            entry.
+        """
+        stamp = self._stamp(exe)
+        if stamp is None:
+            return None
+
+        try:
+            entry = self._load().get(exe)
+        except (IOError, OSError, ValueError, CacheError, LockError) as e:
+            tty.debug('Cannot read compiler probe cache: {0}'.format(e))
+            return None
+
+        if not entry or entry['stamp'] != stamp:
+            return None
+        return entry['probes'].get(self._probe_key(probe))
+
+    def set(self, exe, probe, value):
+        """Store the result of a probe of ``exe``; see ``get()``."""
+        stamp = self._stamp(exe)
+        if stamp is None:
+            return
+
+        key = self._probe_key(probe)
+        cache = self._cache
+        try:
+            cache.init_entry(probe_cache_key)
+            with cache.write_transaction(probe_cache_key) as (old, new):
+                try:
+                    entries = sjson.load(old) if old else {}
+                except ValueError:
+                    entries = {}  # replace a corrupt cache file
+
+                # probes of an older version of the executable are dropped
+                entry = entries.get(exe)
+                if not entry or entry['stamp'] != stamp:
+                    entry = entries[exe] = {'stamp': stamp, 'probes': {}}
+                entry['probes'][key] = value
+
+                sjson.dump(entries, new)
+        except (IOError, OSError, ValueError, CacheError, LockError) as e:
+            tty.debug('Cannot write compiler probe cache: {0}'.format(e))
+            return
+
+        self._entries = entries
+        self._loaded = (cache.root, cache.mtime(probe_cache_key))
+
+
+#: Persistent cache of compiler versions and implicit link directories
+probe_cache = CompilerProbeCache()
+
 
 @llnl.util.lang.memoized
 def _get_compiler_version_output(compiler_path, version_arg, ignore_errors=()):
     """Invokes the compiler at a given path passing a single
     version argument and returns the output.
 
+    The output is kept in the ``probe_cache`` until the compiler changes.
+
     Args:
         compiler_path (path): path of the compiler to be invoked
         version_arg (str): the argument used to extract version information
     """
-    compiler = spack.util.executable.Executable(compiler_path)
-    output = compiler(
-        version_arg, output=str, error=str, ignore_errors=ignore_errors)
+    probe = ['version', version_arg]
+    output = probe_cache.get(compiler_path, probe)
+    if output is None:
+        compiler = spack.util.executable.Executable(compiler_path)
+        output = compiler(
+            version_arg, output=str, error=str, ignore_errors=ignore_errors)
+        probe_cache.set(compiler_path, probe, output)
     return output
 
 
@@ -390,6 +515,13 @@ def _get_compiler_link_paths(self, paths):
         else:
             flags.append('fflags')
 
+        probe = ['link-paths', self.verbose_flag,
+                 [self.flags.get(flag_type, []) for flag_type in flags],
+                 self._probe_environment()]
+        link_dirs = probe_cache.get(first_compiler, probe)
+        if link_dirs is not None:
+            return link_dirs
+
         try:
             tmpdir = tempfile.mkdtemp(prefix='spack-implicit-link-info')
             fout = os.path.join(tmpdir, 'output')
@@ -409,7 +541,9 @@ def _get_compiler_link_paths(self, paths):
                 output = str(compiler_exe(
                     self.verbose_flag, fin, '-o', fout,
                     output=str, error=str))  # str for py2
-            return _parse_non_system_link_dirs(output)
+            link_dirs = _parse_non_system_link_dirs(output)
+            probe_cache.set(first_compiler, probe, link_dirs)
+            return link_dirs
         except spack.util.executable.ProcessError as pe:
             tty.debug('ProcessError: Command exited with non-zero status: ' +
                       pe.long_message)
@@ -520,12 +654,22 @@ def get_real_version(self):
         Use the runtime environment of the compiler (modules and environment
         modifications) to enable the compiler to run properly on any platform.
         """
-        cc = spack.util.executable.Executable(self.cc)
-        with self._compiler_environment():
-            output = cc(self.version_argument,
-                        output=str, error=str,
-                        ignore_errors=tuple(self.ignore_version_errors))
-            return self.extract_version_from_output(output)
+        probe = ['real-version', self.version_argument,
+                 self._probe_environment()]
+        output = probe_cache.get(self.cc, probe)
+        if output is None:
+            cc = spack.util.executable.Executable(self.cc)
+            with self._compiler_environment():
+                output = cc(self.version_argument,
+                            output=str, error=str,
+                            ignore_errors=tuple(self.ignore_version_errors))
+            probe_cache.set(self.cc, probe, output)
+        return self.extract_version_from_output(output)
+
+    def _probe_environment(self):
+        """Part of the ``probe_cache`` key for probes that are run in the
+        compiler's environment."""
+        return [self.modules, self.environment]
 
     #
     # Compiler classes have methods for querying the version of
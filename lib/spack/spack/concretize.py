@@ -68,6 +68,7 @@ def concretize_develop(self, spec):
         """
         Add ``dev_path=*`` variant to packages built from local source.
         """
+        import spack.environment
         env = spack.environment.get_env(None, None)
         dev_info = env.dev_specs.get(spec.name, {}) if env else {}
         if not dev_info:
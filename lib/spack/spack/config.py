@@ -47,7 +47,6 @@
 from llnl.util.filesystem import mkdirp
 
 import spack.paths
-import spack.architecture
 import spack.schema
 import spack.schema.compilers
 import spack.schema.mirrors
@@ -742,6 +741,7 @@ def override(path_or_scope, value=None):
 
 def _add_platform_scope(cfg, scope_type, name, path):
     """Add a platform-specific subdirectory for the current platform."""
+    import spack.architecture
     platform = spack.architecture.platform().name
     plat_name = '%s/%s' % (name, platform)
     plat_path = os.path.join(path, platform)
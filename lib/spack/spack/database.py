@@ -22,6 +22,7 @@
 
 import contextlib
 import datetime
+import functools
 import os
 import six
 import socket
@@ -187,7 +188,9 @@ def __init__(
             installation_time=None,
             deprecated_for=None
     ):
-        self.spec = spec
+        self._spec = spec
+        self._spec_dict = None
+        self._read_spec = None
         self.path = str(path) if path else None
         self.installed = bool(installed)
         self.ref_count = ref_count
@@ -195,6 +198,60 @@ def __init__(
         self.installation_time = installation_time or _now()
         self.deprecated_for = deprecated_for
 
+    @property
+    def spec(self):
+        """Spec tracked by the record.
+
+        Records read from the database index build their spec on first
+        access (see ``read_spec_lazily()``). If the spec cannot be built,
+        every access raises the same error.
+        """
+        if self._spec is None and self._read_spec is not None:
+            read_spec, self._read_spec = self._read_spec, None
+            try:
+                read_spec()
+            finally:
+                if self._spec is None:
+                    self._read_spec = read_spec
+        return self._spec
+
+    @spec.setter
+    def spec(self, spec):
+        self._spec = spec
+        self._spec_dict = None
+        self._read_spec = None
+
+    @property
+    def name(self):
+        """Name of the spec tracked by the record, which is available
+        without building the spec."""
+        if self._spec is None and self._spec_dict is not None:
+            return next(iter(self._spec_dict))
+        return self.spec.name
+
+    @property
+    def compiler_name(self):
+        """Name of the compiler of the spec tracked by the record, which is
+        available without building the spec."""
+        if self._spec is None and self._spec_dict is not None:
+            compiler = self._spec_dict[self.name].get('compiler') or {}
+            return compiler.get('name')
+        compiler = self.spec.compiler
+        return compiler.name if compiler else None
+
+    def read_spec_lazily(self, spec_dict, read_spec):
+        """Defer building the spec of the record until it is needed.
+
+        Args:
+            spec_dict (dict): node dictionary of the spec, as written in the
+                database index
+            read_spec (callable): function setting the ``spec`` of the
+                record, called on first access
+        """
+        self._spec = None
+        self._spec_dict = spec_dict
+        self._read_spec = read_spec
+
     def install_type_matches(self, installed):
         installed = InstallStatuses.canonicalize(installed)
         if self.installed:
@@ -209,7 +266,12 @@ def to_dict(self, include_fields=default_install_record_fields):
 
         for field_name in include_fields:
             if field_name == 'spec':
-                rec_dict.update({'spec': self.spec.node_dict_with_hashes()})
+                if self._spec is None and self._spec_dict is not None:
+                    # Write back what was read, rather than building a spec
+                    rec_dict.update({'spec': self._spec_dict})
+                else:
+                    rec_dict.update(
+                        {'spec': self.spec.node_dict_with_hashes()})
             elif field_name == 'deprecated_for' and self.deprecated_for:
                 rec_dict.update({'deprecated_for': self.deprecated_for})
             else:
@@ -232,6 +294,93 @@ def from_dict(cls, spec, dictionary):
         return InstallRecord(spec, **d)
 
 
+class InstallRecordIndex(dict):
+    """Install records by DAG hash, with secondary indexes.
+
+    Along with the records, this keeps the hashes of the records by package
+    name, by compiler name and by explicit flag, so that queries can narrow
+    down the records they test without building their specs.
+
+    The indexes are updated when records are set or deleted.  The explicit
+    flag of a record in the index must be changed through
+    ``set_explicit()``.
+    """
+
+    def __init__(self):
+        super(InstallRecordIndex, self).__init__()
+        self._by_name = {}
+        self._by_compiler = {}
+        self._explicit = set()
+
+    def __setitem__(self, key, record):
+        if key in self:
+            self._unindex(key, self[key])
+        super(InstallRecordIndex, self).__setitem__(key, record)
+        self._index(key, record)
+
+    def __delitem__(self, key):
+        self._unindex(key, self[key])
+        super(InstallRecordIndex, self).__delitem__(key)
+
+    def __reduce__(self):
+        # Indexes are rebuilt as records are set when unpickling
+        return self.__class__, (), None, None, iter(self.items())
+
+    def _index(self, key, record):
+        self._by_name.setdefault(record.name, set()).add(key)
+        self._by_compiler.setdefault(record.compiler_name, set()).add(key)
+        if record.explicit:
+            self._explicit.add(key)
+
+    def _unindex(self, key, record):
+        for index, value in ((self._by_name, record.name),
+                             (self._by_compiler, record.compiler_name)):
+            keys = index.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del index[value]
+        self._explicit.discard(key)
+
+    def set_explicit(self, key, explicit):
+        """Set the explicit flag of the record with the given hash."""
+        self[key].explicit = explicit
+        if explicit:
+            self._explicit.add(key)
+        else:
+            self._explicit.discard(key)
+
+    def select(self, names=None, compiler=None, explicit=any):
+        """Return the hashes of the records that may match a query.
+
+        Args:
+            names (list or None): package names of the records, if not None
+            compiler (str or None): compiler name of the records, if not None
+            explicit (bool or any): explicit flag of the records, if not any
+
+        Returns:
+            (set): hashes of the selected records
+        """
+        selections = []
+        if names is not None:
+            selections.append(set().union(
+                *(self._by_name.get(name, ()) for name in names)))
+        if compiler is not None:
+            selections.append(self._by_compiler.get(compiler, set()))
+        if explicit is not any and explicit:
+            selections.append(self._explicit)
+
+        if selections:
+            selections.sort(key=len)
+            keys = set(selections[0]).intersection(*selections[1:])
+        else:
+            keys = set(self)
+
+        if explicit is not any and not explicit:
+            keys -= self._explicit
+        return keys
+
+
 class ForbiddenLockError(SpackError):
     """Raised when an upstream DB attempts to acquire a lock"""
 
@@ -371,7 +520,7 @@ def __init__(self, root, db_dir=None, upstream_dbs=None,
             self.lock = lk.Lock(self._lock_path,
                                 default_timeout=self.db_lock_timeout,
                                 desc='database')
-        self._data = {}
+        self._data = InstallRecordIndex()
 
         self.upstream_dbs = list(upstream_dbs) if upstream_dbs else []
 
@@ -667,37 +816,75 @@ def query_by_spec_hash(self, hash_key, data=None):
                 return True, db._data[hash_key]
         return False, None
 
-    def _assign_dependencies(self, hash_key, installs, data):
+    def _dependency_hashes(self, hash_key, installs):
+        """Return the (name, hash, deptypes) of the dependencies of a record
+        in the install DB, without building its spec.
+        """
+        spec_dict = installs[hash_key]['spec']
+        node = spec_dict[next(iter(spec_dict))]
+        if 'dependencies' not in node:
+            return []
+        return list(spack.spec.Spec.read_yaml_dep_specs(node['dependencies']))
+
+    def _check_dependencies(self, hash_key, installs, data):
+        """Warn about (or fail on) the dependencies of a record in the install
+        DB that are neither in this DB nor upstream.
+        """
+        deps = self._dependency_hashes(hash_key, installs)
+        for dname, dhash, dtypes in deps:
+            upstream, record = self.query_by_spec_hash(dhash, data=data)
+            if not record:
+                msg = ("Missing dependency not in database: "
+                       "%s/%s needs %s-%s" % (
+                           data[hash_key].name, hash_key[:7],
+                           dname, dhash[:7]))
+                if self._fail_when_missing_deps:
+                    raise MissingDependenciesError(msg)
+                tty.warn(msg)
+
+    def _assign_dependencies(self, spec, hash_key, installs, data):
         # Add dependencies from other records in the install DB to
         # form a full spec.
-        spec = data[hash_key].spec
-        spec_dict = installs[hash_key]['spec']
-        if 'dependencies' in spec_dict[spec.name]:
-            yaml_deps = spec_dict[spec.name]['dependencies']
-            for dname, dhash, dtypes in spack.spec.Spec.read_yaml_dep_specs(
-                    yaml_deps):
-                # It is important that we always check upstream installations
-                # in the same order, and that we always check the local
-                # installation first: if a downstream Spack installs a package
-                # then dependents in that installation could be using it.
-                # If a hash is installed locally and upstream, there isn't
-                # enough information to determine which one a local package
-                # depends on, so the convention ensures that this isn't an
-                # issue.
-                upstream, record = self.query_by_spec_hash(dhash, data=data)
-                child = record.spec if record else None
-
-                if not child:
-                    msg = ("Missing dependency not in database: "
-                           "%s needs %s-%s" % (
-                               spec.cformat('{name}{/hash:7}'),
-                               dname, dhash[:7]))
-                    if self._fail_when_missing_deps:
-                        raise MissingDependenciesError(msg)
-                    tty.warn(msg)
-                    continue
+        deps = self._dependency_hashes(hash_key, installs)
+        for dname, dhash, dtypes in deps:
+            # It is important that we always check upstream installations
+            # in the same order, and that we always check the local
+            # installation first: if a downstream Spack installs a package
+            # then dependents in that installation could be using it.
+            # If a hash is installed locally and upstream, there isn't
+            # enough information to determine which one a local package
+            # depends on, so the convention ensures that this isn't an
+            # issue.  Missing dependencies were reported when the DB was
+            # read (see ``_check_dependencies()``).
+            upstream, record = self.query_by_spec_hash(dhash, data=data)
+            if record:
+                spec._add_dependency(record.spec, dtypes)
+
+    def _read_spec_lazily(self, hash_key, installs, data):
+        """Build the spec of a record read from the install DB.
+
+        The specs of its dependencies are built first, so that all the specs
+        read from the DB share nodes (i.e., they form a true Merkle DAG,
+        unlike most specs).  Specs are marked concrete only once their
+        dependencies are connected, as doing it earlier causes hashes to be
+        cached prematurely.
+
+        The spec is only set once it is complete, so a corrupt record
+        raises ``CorruptDatabaseError`` every time it is accessed.
+        """
+        try:
+            spec = self._read_spec_from_dict(hash_key, installs)
+            self._assign_dependencies(spec, hash_key, installs, data)
+        except Exception as e:
+            self._invalid_record(hash_key, e)
+        spec._mark_concrete()
+        data[hash_key].spec = spec
 
-                spec._add_dependency(child, dtypes)
+    def _invalid_record(self, hash_key, error):
+        msg = ("Invalid record in Spack database: "
+               "hash: %s, cause: %s: %s")
+        msg %= (hash_key, type(error).__name__, str(error))
+        raise CorruptDatabaseError(msg, self._index_path)
 
     def _read_from_file(self, filename):
         """Fill database from file, do not maintain old data.
@@ -711,6 +898,32 @@ def _read_from_file(self, filename):
         except Exception as e:
             raise CorruptDatabaseError("error parsing database:", str(e))
 
+        self._read_from_data(fdata)
+
+    def read_index(self, index_string):
+        """Replace the records of the database with those of an index,
+        e.g. the ``index.json`` of a build cache.
+
+        Does not do any locking.
+
+        Args:
+            index_string (str): contents of the index, in JSON
+
+        Raises:
+            CorruptDatabaseError: if the index is not valid
+        """
+        try:
+            fdata = sjson.load(index_string)
+        except Exception as e:
+            raise CorruptDatabaseError("error parsing database:", str(e))
+
+        self._read_from_data(fdata)
+
+    def _read_from_data(self, fdata):
+        """Fill database from the parsed contents of an index.
+
+        Does not do any locking.
+        """
         if fdata is None:
             return
 
@@ -748,52 +961,40 @@ def check(cond, msg):
                     for k, v in self._data.items()
                 )
 
-        def invalid_record(hash_key, error):
-            msg = ("Invalid record in Spack database: "
-                   "hash: %s, cause: %s: %s")
-            msg %= (hash_key, type(error).__name__, str(error))
-            raise CorruptDatabaseError(msg, self._index_path)
-
-        # Build up the database in three passes:
+        # Build up the database in two passes, without building specs:
         #
-        #   1. Read in all specs without dependencies.
-        #   2. Hook dependencies up among specs.
-        #   3. Mark all specs concrete.
+        #   1. Read in all records.
+        #   2. Check that the dependencies of each record are known.
         #
-        # The database is built up so that ALL specs in it share nodes
-        # (i.e., its specs are a true Merkle DAG, unlike most specs.)
+        # The spec of a record, along with the specs of its dependencies,
+        # is only built when it is first accessed, so that e.g. queries by
+        # hash or by name don't pay for the specs they don't return.
 
-        # Pass 1: Iterate through database and build specs w/o dependencies
-        data = {}
+        # Pass 1: Iterate through database and read records w/o specs
+        data = InstallRecordIndex()
         for hash_key, rec in installs.items():
             try:
-                # This constructs a spec DAG from the list of all installs
-                spec = self._read_spec_from_dict(hash_key, installs)
-
-                # Insert the brand new spec in the database.  Each
-                # spec has its own copies of its dependency specs.
-                # TODO: would a more immmutable spec implementation simplify
-                #       this?
-                data[hash_key] = InstallRecord.from_dict(spec, rec)
+                # Install records don't include hash with spec, so we add it
+                # in here to ensure it is read (and written back) properly.
+                spec_dict = rec['spec']
+                for name in spec_dict:
+                    spec_dict[name]['hash'] = hash_key
+
+                record = InstallRecord.from_dict(None, rec)
+                record.read_spec_lazily(spec_dict, functools.partial(
+                    self._read_spec_lazily, hash_key, installs, data))
+                data[hash_key] = record
             except Exception as e:
-                invalid_record(hash_key, e)
+                self._invalid_record(hash_key, e)
 
-        # Pass 2: Assign dependencies once all specs are created.
+        # Pass 2: Check dependencies once all records are read.
         for hash_key in data:
             try:
-                self._assign_dependencies(hash_key, installs, data)
+                self._check_dependencies(hash_key, installs, data)
             except MissingDependenciesError:
                 raise
             except Exception as e:
-                invalid_record(hash_key, e)
-
-        # Pass 3: Mark all specs concrete.  Specs representing real
-        # installations must be explicitly marked.
-        # We do this *after* all dependencies are connected because if we
-        # do it *while* we're constructing specs,it causes hashes to be
-        # cached prematurely.
-        for hash_key, rec in data.items():
-            rec.spec._mark_concrete()
+                self._invalid_record(hash_key, e)
 
         self._data = data
 
@@ -814,7 +1015,7 @@ def _read_suppress_error():
                     self._read_from_file(self._index_path)
             except CorruptDatabaseError as e:
                 self._error = e
-                self._data = {}
+                self._data = InstallRecordIndex()
 
         transaction = lk.WriteTransaction(
             self.lock, acquire=_read_suppress_error, release=self._write
@@ -870,7 +1071,7 @@ def _construct_from_directory_layout(self, directory_layout, old_data):
         # instead, we would perpetuate errors over a reindex.
         with directory_layout.disable_upstream_check():
             # Initialize data in the reconstructed DB
-            self._data = {}
+            self._data = InstallRecordIndex()
 
             # Start inspecting the installed prefixes
             processed_specs = set()
@@ -1120,7 +1321,7 @@ def _add(
             self._data[key].installed = True
             self._data[key].installation_time = _now()
 
-        self._data[key].explicit = explicit
+        self._data.set_explicit(key, explicit)
 
     @_autospec
     def add(self, spec, directory_layout, explicit=False):
@@ -1134,6 +1335,25 @@ def add(self, spec, directory_layout, explicit=False):
         with self.write_transaction():
             self._add(spec, directory_layout, explicit=explicit)
 
+    @_autospec
+    def update_explicit(self, spec, explicit):
+        """Update the explicit flag of a spec in the database.
+
+        Args:
+            spec (Spec): the spec whose install record is being updated
+            explicit (bool): ``True`` if the package was requested explicitly
+                by the user, ``False`` if it was pulled in as a dependency of
+                an explicit package.
+        """
+        with self.write_transaction():
+            key = self._get_matching_spec_key(spec)
+            rec = self._data[key]
+            if rec.explicit != explicit:
+                message = '{s.name}@{s.version} : marking the package {0}'
+                status = 'explicit' if explicit else 'implicit'
+                tty.debug(message.format(status, s=rec.spec))
+                self._data.set_explicit(key, explicit)
+
     def _get_matching_spec_key(self, spec, **kwargs):
         """Get the exact spec OR get a single spec that matches."""
         key = spec.dag_hash()
@@ -1267,7 +1487,13 @@ def installed_relatives(self, spec, direction='children', transitive=True,
             raise ValueError("Invalid direction: %s" % direction)
 
         relatives = set()
-        for spec in self.query(spec):
+        specs = self.query(spec)
+        if direction == 'parents':
+            # Specs read from the DB are connected to their dependents only
+            # once the specs of the dependents are built
+            self._build_all_specs()
+
+        for spec in specs:
             if transitive:
                 to_add = spec.traverse(
                     direction=direction, root=False, deptype=deptype)
@@ -1295,6 +1521,15 @@ def installed_relatives(self, spec, direction='children', transitive=True,
                 relatives.add(relative)
         return relatives
 
+    def _build_all_specs(self):
+        """Build the specs of all the records in this DB and upstream.
+
+        Does not do any locking.
+        """
+        for db in [self] + self.upstream_dbs:
+            for rec in db._data.values():
+                rec.spec
+
     @_autospec
     def installed_extensions_for(self, extendee_spec):
         """
@@ -1438,18 +1673,34 @@ def _query(
         start_date = start_date or datetime.datetime.min
         end_date = end_date or datetime.datetime.max
 
-        for key, rec in self._data.items():
-            if hashes is not None and rec.spec.dag_hash() not in hashes:
+        # Narrow down the records to test through the secondary indexes,
+        # without building their specs: virtual names match the specs of
+        # any of their providers. Names that are not in the repo (e.g.,
+        # packages removed since they were installed) are not virtual.
+        if isinstance(query_spec, six.string_types):
+            query_spec = spack.spec.Spec(query_spec)
+        names, compiler = None, None
+        if isinstance(query_spec, spack.spec.Spec):
+            if query_spec.name:
+                names = set([query_spec.name])
+                if spack.repo.path.is_virtual(query_spec.name):
+                    names.update(
+                        p.name for p in
+                        spack.repo.path.provider_index.providers_for(
+                            query_spec.name))
+            if query_spec.compiler:
+                compiler = query_spec.compiler.name
+
+        for key in self._data.select(names, compiler, explicit):
+            rec = self._data[key]
+            if hashes is not None and key not in hashes:
                 continue
 
             if not rec.install_type_matches(installed):
                 continue
 
-            if explicit is not any and rec.explicit != explicit:
-                continue
-
             if known is not any and spack.repo.path.exists(
-                    rec.spec.name) != known:
+                    rec.name) != known:
                 continue
 
             inst_date = datetime.datetime.fromtimestamp(
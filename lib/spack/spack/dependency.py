@@ -7,8 +7,6 @@
 """
 from six import string_types
 
-import spack.spec
-
 
 #: The types of dependency relationships that Spack understands.
 all_deptypes = ('build', 'link', 'run', 'test')
@@ -98,6 +96,7 @@ def __init__(self, pkg, spec, type=default_deptype):
             spec (Spec): Spec indicating dependency requirements
             type (sequence): strings describing dependency relationship
         """
+        import spack.spec
         assert isinstance(spec, spack.spec.Spec)
 
         self.pkg = pkg
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import collections
+import multiprocessing
 import os
 import re
 import sys
@@ -16,12 +17,14 @@
 from ordereddict_backport import OrderedDict
 
 import llnl.util.filesystem as fs
+import llnl.util.lang
 import llnl.util.tty as tty
 from llnl.util.tty.color import colorize
 
 import spack.concretize
 import spack.error
 import spack.hash_types as ht
+import spack.installer
 import spack.repo
 import spack.schema.env
 import spack.spec
@@ -31,7 +34,8 @@
 import spack.util.spack_yaml as syaml
 import spack.config
 import spack.user_environment as uenv
-from spack.filesystem_view import YamlFilesystemView
+from spack.filesystem_view import (
+    YamlFilesystemView, ConflictingProjectionsError)
 import spack.util.environment
 import spack.architecture as architecture
 from spack.spec import Spec
@@ -529,7 +533,13 @@ def __contains__(self, spec):
 
         return True
 
-    def regenerate(self, all_specs, roots):
+    def regenerate(self, all_specs, roots, full=False):
+        """Update the view with the installed specs that it describes.
+
+        Only the files of specs added to or removed from the view are
+        linked or unlinked, using the manifest of the view.  The view is
+        rebuilt from scratch if ``full`` is True or if it can't be updated.
+        """
         specs_for_view = []
         specs = all_specs if self.link == 'all' else roots
         for spec in specs:
@@ -550,13 +560,21 @@ def regenerate(self, all_specs, roots):
             installed_specs_for_view = set(
                 s for s in specs_for_view if s in self and s.package.installed)
 
-            # To ensure there are no conflicts with packages being installed
-            # that cannot be resolved or have repos that have been removed
-            # we always regenerate the view from scratch. We must first make
-            # sure the root directory exists for the very first time though.
             root = self.root
             if not os.path.isabs(root):
                 root = os.path.normpath(os.path.join(self.base, self.root))
+            if not full and os.path.isdir(root):
+                try:
+                    if self._update(installed_specs_for_view):
+                        return
+                except Exception as e:
+                    tty.debug('Rebuilding view at {0}: {1}'.format(
+                        self.root, str(e)))
+
+            # To ensure there are no conflicts with packages being installed
+            # that cannot be resolved or have repos that have been removed
+            # we regenerate the view from scratch. We must first make
+            # sure the root directory exists for the very first time though.
             fs.mkdirp(root)
             with fs.replace_directory_transaction(root):
                 view = self.view()
@@ -574,6 +592,52 @@ def regenerate(self, all_specs, roots):
                                   all_specs=specs_in_view)
                 view.add_specs(*add_specs, with_dependencies=False)
 
+                view.write_manifest(dict(
+                    (s.dag_hash(), view.manifest_entry(s))
+                    for s in installed_specs_for_view if view.check_added(s)))
+
+    def _update(self, installed_specs_for_view):
+        """Incrementally update the view from its manifest.
+
+        Return:
+            (bool) ``True`` if the view was updated, ``False`` if it must be
+                rebuilt instead
+        """
+        try:
+            view = self.view()
+        except ConflictingProjectionsError:
+            return False
+
+        entries = view.read_manifest()
+        if entries is None:
+            return False
+
+        specs_by_hash = dict(
+            (s.dag_hash(), s) for s in installed_specs_for_view)
+        rm_hashes = [h for h in entries if h not in specs_by_hash]
+        add_specs = [s for h, s in specs_by_hash.items() if h not in entries]
+
+        # Extensions are deactivated through their extendee, which needs the
+        # whole view
+        if any(entries[h]['extension'] for h in rm_hashes):
+            return False
+
+        tty.msg("Updating view at {0}".format(self.root))
+
+        # Drop the manifest while the view is changed, so that the view is
+        # rebuilt from scratch if the update is interrupted
+        view.write_manifest(None)
+
+        kept = dict((h, e) for h, e in entries.items() if h in specs_by_hash)
+        view.unlink_entries([entries[h] for h in rm_hashes],
+                            list(kept.values()))
+        view.add_specs(*add_specs, with_dependencies=False)
+
+        kept.update((s.dag_hash(), view.manifest_entry(s))
+                    for s in add_specs if view.check_added(s))
+        view.write_manifest(kept)
+        return True
+
 
 class Environment(object):
     def __init__(self, path, init_file=None, with_view=None):
@@ -1143,13 +1207,21 @@ def _concretize_separately(self):
                 self._add_concrete_spec(s, concrete, new=False)
 
         # Concretize any new user specs that we haven't concretized yet
+        new_user_specs = [
+            (uspec, uspec_constraints) for uspec, uspec_constraints in zip(
+                self.user_specs, self.user_specs.specs_as_constraints)
+            if uspec not in old_concretized_user_specs]
+        concrete_specs = _concretize_in_parallel(
+            [constraints for _, constraints in new_user_specs])
+
+        # Results are added in manifest order
         concretized_specs = []
-        for uspec, uspec_constraints in zip(
-                self.user_specs, self.user_specs.specs_as_constraints):
-            if uspec not in old_concretized_user_specs:
+        for (uspec, uspec_constraints), concrete in zip(
+                new_user_specs, concrete_specs):
+            if concrete is None:
                 concrete = _concretize_from_constraints(uspec_constraints)
-                self._add_concrete_spec(uspec, concrete)
-                concretized_specs.append((uspec, concrete))
+            self._add_concrete_spec(uspec, concrete)
+            concretized_specs.append((uspec, concrete))
         return concretized_specs
 
     def concretize_and_add(self, user_spec, concrete_spec=None):
@@ -1215,7 +1287,14 @@ def update_default_view(self, viewpath):
         else:
             self.views.pop(name, None)
 
-    def regenerate_views(self):
+    def regenerate_views(self, full=False):
+        """Update the views of the environment.
+
+        Args:
+            full (bool): rebuild the views from scratch instead of updating
+                the files of the specs added or removed since the last
+                update, e.g. to repair a view
+        """
         if not self.views:
             tty.debug("Skip view update, this environment does not"
                       " maintain a view")
@@ -1223,7 +1302,7 @@ def regenerate_views(self):
 
         specs = self._get_environment_specs()
         for view in self.views.values():
-            view.regenerate(specs, self.roots())
+            view.regenerate(specs, self.roots(), full=full)
 
     def check_views(self):
         """Checks if the environments default view can be activated."""
@@ -1389,6 +1468,10 @@ def _install(self, spec, **install_args):
             'overwrite', []) + self._get_overwrite_specs()
         package.do_install(**install_args)
 
+        self._link_build_log(spec)
+
+    def _link_build_log(self, spec):
+        """Link the build log of an installed spec into the logs dir."""
         if not spec.external:
             # Make sure log directory exists
             log_path = self.log_path
@@ -1405,6 +1488,10 @@ def _install(self, spec, **install_args):
     def install_all(self, args=None):
         """Install all concretized specs in an environment.
 
+        The specs are installed together, so dependencies they share are
+        only processed once and independent specs can be built concurrently
+        (see the ``jobs_packages`` install argument).
+
         Note: this does not regenerate the views for the environment;
         that needs to be done separately with a call to write().
 
@@ -1426,14 +1513,35 @@ def install_all(self, args=None):
                     # If it's a dev build it could need to be reinstalled
                     specs_to_install.append(spec)
 
+        # Parse cli arguments and construct a dictionary
+        # that will be passed to Package.do_install API
+        kwargs = dict()
+        if args:
+            spack.cmd.install.update_kwargs_from_args(args, kwargs)
+
+        # Development specs keep their stage (see Package.do_install), so
+        # they are installed on their own
+        roots = []
         for spec in specs_to_install:
-            # Parse cli arguments and construct a dictionary
-            # that will be passed to Package.do_install API
-            kwargs = dict()
-            if args:
-                spack.cmd.install.update_kwargs_from_args(args, kwargs)
+            if spec.variants.get('dev_path', None):
+                self._install(spec, **kwargs)
+            else:
+                roots.append(spec)
 
-            self._install(spec, **kwargs)
+        # Specs sharing dependencies are installed in one build DAG, unless
+        # the dependencies have the same name but differ
+        kwargs['overwrite'] = kwargs.get(
+            'overwrite', []) + self._get_overwrite_specs()
+        for batch in spack.installer.batch_roots([s.package for s in roots]):
+            installer = spack.installer.PackageInstaller(batch[0], batch[1:])
+            try:
+                installer.install(**kwargs)
+            finally:
+                # Link the logs of the roots that were installed, even if
+                # others failed
+                for pkg in batch:
+                    if pkg.installed:
+                        self._link_build_log(pkg.spec)
 
     def all_specs(self):
         """Return all specs, even those a user spec would shadow."""
@@ -1848,6 +1956,83 @@ def _concretize_from_constraints(spec_constraints):
             invalid_constraints.extend(inv_variant_constraints)
 
 
+def _concretize_task(constraint_strs):
+    """Concretize a user spec in a worker process.
+
+    Returns:
+        (dict): the concrete spec, as returned by ``Spec.to_dict()``, or
+            None if the spec couldn't be concretized.
+    """
+    try:
+        constraints = [Spec(c) for c in constraint_strs]
+        concrete = _concretize_from_constraints(constraints)
+        return concrete.to_dict(hash=ht.build_hash)
+    except Exception:
+        # The error is reported when the spec is concretized again
+        return None
+
+
+def _constraint_strs(constraints):
+    """Constraints of a user spec as strings for a worker process, or None
+    if strings would lose some of them.
+
+    Specs don't pickle, and their strings drop hashes: e.g., a dependency
+    on an installed spec (``^/abc1234``) would be read back as a copy of
+    its constraints, not as the installed spec.
+    """
+    strs = []
+    for c in constraints:
+        if any(s.concrete for s in c.traverse()):
+            return None
+        c_str = str(c)
+        try:
+            if Spec(c_str) != c:
+                return None
+        except spack.error.SpackError:
+            return None
+        strs.append(c_str)
+    return strs
+
+
+def _concretize_in_parallel(specs_constraints):
+    """Concretize independent user specs in worker processes.
+
+    Args:
+        specs_constraints (list): the constraints of each user spec
+
+    Returns:
+        (list): the concrete spec of each user spec, in the same order, or
+            None for specs to be concretized in this process instead
+            (e.g., because there are too few specs to make worker processes
+            worthwhile, because their constraints can't be sent to a worker,
+            or because concretization failed).
+    """
+    results = [None] * len(specs_constraints)
+    jobs = min(spack.config.get('config:build_jobs', 16),
+               multiprocessing.cpu_count(), len(specs_constraints))
+    if jobs < 2:
+        return results
+
+    tasks = [(i, _constraint_strs(constraints))
+             for i, constraints in enumerate(specs_constraints)]
+    tasks = [(i, strs) for i, strs in tasks if strs is not None]
+    jobs = min(jobs, len(tasks))
+    if jobs < 2:
+        return results
+
+    pool = llnl.util.lang.fork_context.Pool(processes=jobs)
+    try:
+        dicts = pool.map(_concretize_task, [strs for _, strs in tasks])
+    finally:
+        pool.terminate()
+        pool.join()
+
+    for (i, _), d in zip(tasks, dicts):
+        if d is not None:
+            results[i] = Spec.from_dict(d)
+    return results
+
+
 def make_repo_path(root):
     """Make a RepoPath from the repo subdirectories in an environment."""
     path = spack.repo.RepoPath()
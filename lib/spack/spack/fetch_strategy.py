@@ -256,7 +256,7 @@ def __init__(self, url=None, checksum=None, **kwargs):
                 self.digest = kwargs[h]
 
         self.expand_archive = kwargs.get('expand', True)
-        self.extra_options = kwargs.get('fetch_options', {})
+        self.extra_options = kwargs.get('fetch_options') or {}
         self._curl = None
 
         self.extension = kwargs.get('extension', None)
@@ -315,8 +315,19 @@ def fetch(self):
         if not self.archive_file:
             raise FailedDownloadError(url)
 
+    def _use_pool(self, url):
+        """Whether to fetch ``url`` over pooled connections, not curl."""
+        method = spack.config.get('config:url_fetch_method', 'urllib')
+        return method == 'urllib' and web_util.can_pool(url)
+
     def _existing_url(self, url):
         tty.debug('Checking existence of {0}'.format(url))
+        if self._use_pool(url):
+            try:
+                return web_util.probe_url(url, self._timeout())
+            except web_util.UnpoolableURLError as e:
+                tty.debug(str(e))
+
         curl = self.curl
         # Telling curl to fetch the first byte (-r 0-0) is supposed to be
         # portable.
@@ -324,7 +335,96 @@ def _existing_url(self, url):
         _ = curl(*curl_args, fail_on_error=False, output=os.devnull)
         return curl.returncode == 0
 
+    def _timeout(self):
+        connect_timeout = spack.config.get('config:connect_timeout', 10)
+        timeout = self.extra_options.get('timeout')
+        if timeout:
+            connect_timeout = max(connect_timeout, int(timeout))
+        return connect_timeout
+
     def _fetch_from_url(self, url):
+        if self.stage.save_filename and self._use_pool(url):
+            try:
+                return self._fetch_pooled(url)
+            except web_util.UnpoolableURLError as e:
+                tty.debug(str(e))
+        return self._fetch_curl(url)
+
+    def _fetch_pooled(self, url):
+        save_file = self.stage.save_filename
+        partial_file = save_file + '.part'
+        tty.msg('Fetching {0}'.format(url))
+
+        headers = {}
+        cookie = self.extra_options.get('cookie')
+        if cookie:
+            headers['Cookie'] = cookie
+
+        # Hash the archive as it arrives, so that a corrupted download is
+        # rejected before it becomes the archive, and check() need not
+        # read it again.
+        checker = hasher = None
+        if self.digest and spack.config.get('config:checksum'):
+            checker = crypto.Checker(self.digest)
+            hasher = checker.hash_fun()
+
+        try:
+            content_type = web_util.download_url(
+                url, partial_file, headers, self._timeout(), hasher)
+        except web_util.HTTPError as e:
+            if e.status == 404:
+                raise FailedDownloadError(url, "URL %s was not found!" % url)
+            raise FailedDownloadError(url, str(e))
+        except web_util.UnpoolableURLError:
+            raise
+        except web_util.SpackWebError as e:
+            # The partial file is kept, so a retry resumes the download.
+            raise FailedDownloadError(url, str(e))
+
+        if content_type and 'text/html' in content_type:
+            warn_content_type_mismatch(self.archive_file or "the archive")
+
+        if checker:
+            checker.sum = hasher.hexdigest()
+            if checker.sum != self.digest:
+                os.remove(partial_file)
+                raise ChecksumError(
+                    "%s checksum failed for %s" % (checker.hash_name, url),
+                    "Expected %s but got %s" % (self.digest, checker.sum))
+            self._record_digest(partial_file, save_file, checker)
+
+        return partial_file, save_file
+
+    def _digest_record(self, archive_file, hash_name):
+        return '{0}.{1}'.format(archive_file, hash_name)
+
+    def _record_digest(self, partial_file, save_file, checker):
+        """Record the digest of a download that will become ``save_file``.
+
+        The size and modification time of the file are recorded with the
+        digest, so that a changed archive does not match the record.
+        """
+        stat = os.stat(partial_file)
+        record = self._digest_record(save_file, checker.hash_name)
+        with open(record, 'w') as f:
+            f.write('{0} {1} {2!r}\n'.format(
+                checker.sum, stat.st_size, stat.st_mtime))
+
+    def _recorded_digest(self, hash_name):
+        """Digest of the archive recorded while fetching it, or None."""
+        try:
+            record = self._digest_record(self.archive_file, hash_name)
+            with open(record) as f:
+                digest, size, mtime = f.read().split()
+            stat = os.stat(self.archive_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if int(size) == stat.st_size and float(mtime) == stat.st_mtime:
+            return digest
+        return None
+
+    def _fetch_curl(self, url):
         save_file = None
         partial_file = None
         if self.stage.save_filename:
@@ -355,19 +455,13 @@ def _fetch_from_url(self, url):
         else:
             curl_args.append('-sS')  # show errors if fail
 
-        connect_timeout = spack.config.get('config:connect_timeout', 10)
-
-        if self.extra_options:
-            cookie = self.extra_options.get('cookie')
-            if cookie:
-                curl_args.append('-j')  # junk cookies
-                curl_args.append('-b')  # specify cookie
-                curl_args.append(cookie)
-
-            timeout = self.extra_options.get('timeout')
-            if timeout:
-                connect_timeout = max(connect_timeout, int(timeout))
+        cookie = self.extra_options.get('cookie')
+        if cookie:
+            curl_args.append('-j')  # junk cookies
+            curl_args.append('-b')  # specify cookie
+            curl_args.append(cookie)
 
+        connect_timeout = self._timeout()
         if connect_timeout > 0:
             # Timeout if can't establish a connection after n sec.
             curl_args.extend(['--connect-timeout', str(connect_timeout)])
@@ -516,6 +610,11 @@ def check(self):
                 "Attempt to check URLFetchStrategy with no digest.")
 
         checker = crypto.Checker(self.digest)
+        if self._recorded_digest(checker.hash_name) == self.digest:
+            tty.debug('Checksum of {0} was verified while fetching it'
+                      .format(self.archive_file))
+            return
+
         if not checker.check(self.archive_file):
             raise ChecksumError(
                 "%s checksum failed for %s" %
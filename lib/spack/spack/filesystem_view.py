@@ -40,6 +40,7 @@
 
 
 _projections_path = '.spack/projections.yaml'
+_manifest_path = '.spack/manifest.json'
 
 
 def view_symlink(src, dst, **kwargs):
@@ -246,6 +247,7 @@ def __init__(self, root, layout, **kwargs):
         # Super class gets projections from the kwargs
         # YAML specific to get projections from YAML file
         self.projections_path = os.path.join(self._root, _projections_path)
+        self.manifest_path = os.path.join(self._root, _manifest_path)
         if not self.projections:
             # Read projections file from view
             self.projections = self.read_projections()
@@ -280,6 +282,106 @@ def read_projections(self):
         else:
             return {}
 
+    def read_manifest(self):
+        """Read the manifest of the files linked in this view.
+
+        Return:
+            (dict) manifest entries (see ``manifest_entry()``) keyed on the
+                DAG hash of the specs, or None if the view has no valid
+                manifest
+        """
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return s_json.load(f)['specs']
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def write_manifest(self, entries):
+        """Atomically write the manifest of the files linked in this view.
+
+        Args:
+            entries (dict): manifest entries keyed on the DAG hash of the
+                specs, or None to remove the manifest
+        """
+        if entries is None:
+            if os.path.exists(self.manifest_path):
+                os.remove(self.manifest_path)
+            return
+
+        mkdirp(os.path.dirname(self.manifest_path))
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            s_json.dump({'specs': entries}, f)
+        os.rename(tmp_path, self.manifest_path)
+
+    def manifest_entry(self, spec):
+        """Describe the files that a spec links in this view.
+
+        Paths of files and of the metadata folder are relative to the view
+        destination of the spec and to the view root, respectively.
+        """
+        pkg = spec.package
+        view_source = pkg.view_source()
+        view_dst = pkg.view_destination(self)
+
+        ignore_file = match_predicate(self.layout.hidden_file_paths)
+        merge_map = LinkTree(view_source).get_file_map(view_dst, ignore_file)
+
+        return {
+            'name': spec.name,
+            'extension': pkg.is_extension,
+            'source': view_source,
+            'destination': os.path.relpath(view_dst, self._root),
+            'metadata': os.path.relpath(
+                self.get_path_meta_folder(spec), self._root),
+            'files': sorted(
+                os.path.relpath(src, view_source) for src in merge_map),
+        }
+
+    def unlink_entries(self, entries, kept_entries):
+        """Remove the files of manifest entries from this view.
+
+        Only links to the files of the removed entries are deleted.  Files
+        of kept entries that were shadowed by a deleted link are linked in
+        its place.
+
+        Args:
+            entries (list): manifest entries of the specs being removed
+            kept_entries (list): manifest entries of the specs kept in the
+                view
+        """
+        removed = set()
+        for entry in entries:
+            view_dst = os.path.join(self._root, entry['destination'])
+            for f in entry['files']:
+                dst = os.path.join(view_dst, f)
+                src = os.path.join(entry['source'], f)
+                if os.path.islink(dst) and os.readlink(dst) == src:
+                    os.remove(dst)
+                    removed.add(dst)
+
+            meta_folder = os.path.join(self._root, entry['metadata'])
+            if os.path.exists(meta_folder):
+                shutil.rmtree(meta_folder)
+            removed.add(meta_folder)
+
+        for entry in kept_entries:
+            view_dst = os.path.join(self._root, entry['destination'])
+            for f in entry['files']:
+                dst = os.path.join(view_dst, f)
+                src = os.path.join(entry['source'], f)
+                if dst in removed and os.path.exists(src):
+                    self.link(src, dst)
+                    removed.discard(dst)
+
+        # Remove the directories left empty
+        for path in removed:
+            path = os.path.dirname(path)
+            while path.startswith(self._root + os.sep) and \
+                    os.path.isdir(path) and not os.listdir(path):
+                os.rmdir(path)
+                path = os.path.dirname(path)
+
     def add_specs(self, *specs, **kwargs):
         assert all((s.concrete for s in specs))
         specs = set(specs)
@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import spack
+import spack.store
 from spack.filesystem_view import YamlFilesystemView
 
 
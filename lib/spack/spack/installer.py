@@ -30,17 +30,21 @@
 import glob
 import heapq
 import itertools
+import multiprocessing
 import os
+import select
 import shutil
 import six
 import sys
 import time
 
 import llnl.util.filesystem as fs
+import llnl.util.lang
 import llnl.util.lock as lk
 import llnl.util.tty as tty
 import spack.binary_distribution as binary_distribution
 import spack.compilers
+import spack.config
 import spack.error
 import spack.hooks
 import spack.package
@@ -59,6 +63,9 @@
 #: were added (see https://docs.python.org/2/library/heapq.html).
 _counter = itertools.count(0)
 
+#: Message used when terminating the installation after the first failure.
+_fail_fast_err = 'Terminating after first install failure'
+
 #: Build status indicating task has been added.
 STATUS_ADDED = 'queued'
 
@@ -79,6 +86,10 @@
 #: queue invariants).
 STATUS_REMOVED = 'removed'
 
+#: Packages whose sources are being prefetched, keyed on the package's unique
+#: id.  Download workers are forked after it is set, so they inherit it.
+_prefetch_pkgs = {}
+
 
 def _handle_external_and_upstream(pkg, explicit):
     """
@@ -247,6 +258,73 @@ def _install_from_cache(pkg, cache_only, explicit, unsigned=False,
     return True
 
 
+def _prefetch(pkg_id, use_cache, full_hash_match):
+    """
+    Fetch the sources of a package ahead of its build, in a download
+    worker process.
+
+    Args:
+        pkg_id (str): unique id of the package, in ``_prefetch_pkgs``
+        use_cache (bool): ``True`` if the package is going to be installed
+            from a binary cache, if available, otherwise ``False``
+        full_hash_match (bool): ``True`` if binary packages must match the
+            full hash of the package
+
+    Return:
+        (str or None) an error message if the fetch failed, otherwise None
+    """
+    pkg = _prefetch_pkgs[pkg_id]
+    try:
+        # Messages (and progress bars) of concurrent downloads would be
+        # interleaved, so the build reports on the fetch instead.
+        tty.set_msg_enabled(False)
+
+        # Don't download sources that won't be needed
+        if use_cache and binary_distribution.get_mirrors_for_spec(
+                pkg.spec, force=False, full_hash_match=full_hash_match):
+            return None
+
+        pkg.do_fetch()
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+    return None
+
+
+def _prefetchable(pkg, restage):
+    """
+    Determine if the sources of a package can be fetched ahead of its build.
+
+    Args:
+        pkg (PackageBase): the package to be built
+        restage (bool): ``True`` if the stage is going to be destroyed before
+            the build, otherwise ``False``
+
+    Return:
+        (bool) ``True`` if the sources can be prefetched, otherwise ``False``
+    """
+    if not pkg.has_code or pkg.manual_download:
+        return False
+
+    if not pkg.stage.managed_by_spack:
+        return False
+
+    # Existing stages (e.g., made by ``spack stage``) are left alone, since
+    # the stages of prefetched packages are destroyed if they aren't built
+    if os.path.exists(pkg.stage.path):
+        return False
+
+    # Fetching without a checksum may need to ask the user first
+    if spack.config.get('config:checksum') and \
+            pkg.version not in pkg.versions:
+        return False
+
+    # Restaging destroys the downloads that aren't in the fetch cache
+    if restage:
+        return all(stage.default_fetcher.cachable for stage in pkg.stage)
+
+    return True
+
+
 def _print_installed_pkg(message):
     """
     Output a message with a package icon.
@@ -377,11 +455,7 @@ def _update_explicit_entry_in_db(pkg, rec, explicit):
             package.
     """
     if explicit and not rec.explicit:
-        with spack.store.db.write_transaction():
-            rec = spack.store.db.get_record(pkg.spec)
-            message = '{s.name}@{s.version} : marking the package explicit'
-            tty.debug(message.format(s=pkg.spec))
-            rec.explicit = True
+        spack.store.db.update_explicit(pkg.spec, True)
 
 
 def clear_failures():
@@ -567,6 +641,36 @@ def package_id(pkg):
     return pkg.name
 
 
+def batch_roots(pkgs):
+    """Group explicit packages so that each group can be installed by a
+    single ``PackageInstaller``.
+
+    Build tasks are keyed on package ids (see ``package_id()``), so
+    packages whose DAGs have different specs with the same id are put in
+    different groups.
+
+    Args:
+        pkgs (list): concrete packages to be installed
+
+    Return:
+        (list) lists of packages, ordered by their first package
+    """
+    batches = []
+    for pkg in pkgs:
+        hashes = dict((package_id(spec.package), spec.dag_hash())
+                      for spec in pkg.spec.traverse())
+        for batch, batch_hashes in batches:
+            if all(batch_hashes.get(pkg_id, dag_hash) == dag_hash
+                   for pkg_id, dag_hash in hashes.items()):
+                batch.append(pkg)
+                batch_hashes.update(hashes)
+                break
+        else:
+            batches.append(([pkg], hashes))
+
+    return [batch for batch, _ in batches]
+
+
 install_args_docstring = """
             cache_only (bool): Fail if binary package unavailable.
             dirty (bool): Don't clean the build environment before installing.
@@ -580,6 +684,9 @@ def package_id(pkg):
                 package
             install_source (bool): By default, source is not installed, but
                 for debugging it might be useful to keep it around.
+            jobs_packages (int): Maximum number of packages to build
+                concurrently.  The ``config:build_jobs`` budget is split
+                evenly between the concurrent builds.  Default 1.
             keep_prefix (bool): Keep install prefix on failure. By default,
                 destroys it.
             keep_stage (bool): By default, stage is destroyed only if there
@@ -587,6 +694,9 @@ def package_id(pkg):
                 even with exceptions.
             overwrite (list): list of hashes for packages to do overwrite
                 installs. Default empty list.
+            prefetch_jobs (int): Maximum number of packages whose sources
+                are downloaded concurrently, ahead of their builds.  ``0``
+                disables prefetching.  Default 4.
             restage (bool): Force spack to restage the package source.
             skip_patch (bool): Skip patch stage of build if True.
             stop_before (InstallPhase): stop execution before this
@@ -611,23 +721,29 @@ class PackageInstaller(object):
     instance.
     '''
 
-    def __init__(self, pkg):
+    def __init__(self, pkg, extra_roots=()):
         """
         Initialize and set up the build specs.
 
         Args:
             pkg (PackageBase): the package being installed, whose spec is
                 concrete
+            extra_roots (list): other explicit packages installed along with
+                ``pkg``, whose build tasks are part of the same build DAG.
+                No two packages of the DAG may share a package id (see
+                ``batch_roots()``).
 
         Return:
             (PackageInstaller) instance
         """
-        if not isinstance(pkg, spack.package.PackageBase):
-            raise ValueError("{0} must be a package".format(str(pkg)))
+        roots = [pkg] + list(extra_roots)
+        for root in roots:
+            if not isinstance(root, spack.package.PackageBase):
+                raise ValueError("{0} must be a package".format(str(root)))
 
-        if not pkg.spec.concrete:
-            raise ValueError("{0}: Can only install concrete packages."
-                             .format(pkg.spec.name))
+            if not root.spec.concrete:
+                raise ValueError("{0}: Can only install concrete packages."
+                                 .format(root.spec.name))
 
         # Spec of the package to be built
         self.pkg = pkg
@@ -635,6 +751,10 @@ def __init__(self, pkg):
         # The identifier used for the explicit package being built
         self.pkg_id = package_id(pkg)
 
+        # All the explicit packages being built, and their identifiers
+        self.roots = roots
+        self.root_ids = set(package_id(root) for root in roots)
+
         # Priority queue of build tasks
         self.build_pq = []
 
@@ -660,6 +780,27 @@ def __init__(self, pkg):
         # Locks on specs being built, keyed on the package's unique id
         self.locks = {}
 
+        # Maximum number of build processes to run at the same time
+        self.max_concurrent_builds = 1
+
+        # Number of parallel make jobs given to each build process, or None
+        # to use the configured build_jobs
+        self.jobs_per_build = None
+
+        # Build tasks and processes of in-progress concurrent builds, keyed
+        # on the package's unique id
+        self.build_processes = {}
+
+        # Unique ids of the dependents of packages in the DAGs of all the
+        # roots, keyed on the package's unique id
+        self.dependents = {}
+
+        # Pool of processes downloading sources ahead of the builds, and the
+        # packages and pending results of its downloads, keyed on the
+        # package's unique id
+        self.prefetch_pool = None
+        self.prefetches = {}
+
     def __repr__(self):
         """Returns a formal representation of the package installer."""
         rep = '{0}('.format(self.__class__.__name__)
@@ -710,11 +851,15 @@ def _check_db(self, spec):
             installed_in_db = False
         return rec, installed_in_db
 
-    def _check_deps_status(self):
-        """Check the install status of the explicit spec's dependencies"""
+    def _check_deps_status(self, pkg):
+        """Check the install status of an explicit package's dependencies
+
+        Args:
+            pkg (PackageBase): the explicit package being installed
+        """
 
         err = 'Cannot proceed with {0}: {1}'
-        for dep in self.spec.traverse(order='post', root=False):
+        for dep in pkg.spec.traverse(order='post', root=False):
             dep_pkg = dep.package
             dep_id = package_id(dep_pkg)
 
@@ -723,7 +868,7 @@ def _check_deps_status(self):
                 action = "'spack install' the dependency"
                 msg = '{0} is marked as an install failure: {1}' \
                     .format(dep_id, action)
-                raise InstallError(err.format(self.pkg_id, msg))
+                raise InstallError(err.format(package_id(pkg), msg))
 
             # Attempt to get a write lock to ensure another process does not
             # uninstall the dependency while the requested spec is being
@@ -731,7 +876,7 @@ def _check_deps_status(self):
             ltype, lock = self._ensure_locked('write', dep_pkg)
             if lock is None:
                 msg = '{0} is write locked by another process'.format(dep_id)
-                raise InstallError(err.format(self.pkg_id, msg))
+                raise InstallError(err.format(package_id(pkg), msg))
 
             # Flag external and upstream packages as being installed
             if dep_pkg.spec.external or dep_pkg.installed_upstream:
@@ -802,8 +947,8 @@ def _prepare_for_install(self, task, keep_prefix, keep_stage,
         ):
             self._update_installed(task)
 
-            # Only update the explicit entry once for the explicit package
-            if task.pkg_id == self.pkg_id:
+            # Only update the explicit entry once for the explicit packages
+            if task.pkg_id in self.root_ids:
                 _update_explicit_entry_in_db(task.pkg, rec, True)
 
             # In case the stage directory has already been created, this
@@ -814,13 +959,13 @@ def _prepare_for_install(self, task, keep_prefix, keep_stage,
 
     def _check_last_phase(self, **kwargs):
         """
-        Ensures the package being installed has a valid last phase before
+        Ensures the packages being installed have a valid last phase before
         proceeding with the installation.
 
         The ``stop_before`` or ``stop_at`` arguments are removed from the
         installation arguments.
 
-        The last phase is also set to None if it is the last phase of the
+        The last phase is also set to None if it is the last phase of a
         package already
 
         Args:
@@ -828,24 +973,29 @@ def _check_last_phase(self, **kwargs):
               ``stop_before``': stop before execution of this phase (or None)
               ``stop_at``': last installation phase to be executed (or None)
         """
-        self.pkg.stop_before_phase = kwargs.pop('stop_before', None)
-        if self.pkg.stop_before_phase is not None and \
-           self.pkg.stop_before_phase not in self.pkg.phases:
-            tty.die('\'{0}\' is not an allowed phase for package {1}'
-                    .format(self.pkg.stop_before_phase, self.pkg.name))
-
-        self.pkg.last_phase = kwargs.pop('stop_at', None)
-        if self.pkg.last_phase is not None and \
-                self.pkg.last_phase not in self.pkg.phases:
-            tty.die('\'{0}\' is not an allowed phase for package {1}'
-                    .format(self.pkg.last_phase, self.pkg.name))
-        # If we got a last_phase, make sure it's not already last
-        if self.pkg.last_phase and \
-                self.pkg.last_phase == self.pkg.phases[-1]:
-            self.pkg.last_phase = None
+        stop_before = kwargs.pop('stop_before', None)
+        last_phase = kwargs.pop('stop_at', None)
+        for pkg in self.roots:
+            pkg.stop_before_phase = stop_before
+            if pkg.stop_before_phase is not None and \
+               pkg.stop_before_phase not in pkg.phases:
+                tty.die('\'{0}\' is not an allowed phase for package {1}'
+                        .format(pkg.stop_before_phase, pkg.name))
+
+            pkg.last_phase = last_phase
+            if pkg.last_phase is not None and \
+                    pkg.last_phase not in pkg.phases:
+                tty.die('\'{0}\' is not an allowed phase for package {1}'
+                        .format(pkg.last_phase, pkg.name))
+            # If we got a last_phase, make sure it's not already last
+            if pkg.last_phase and \
+                    pkg.last_phase == pkg.phases[-1]:
+                pkg.last_phase = None
 
     def _cleanup_all_tasks(self):
         """Cleanup all build tasks to include releasing their locks."""
+        self._terminate_builds()
+
         for pkg_id in self.locks:
             self._release_lock(pkg_id)
 
@@ -950,8 +1100,10 @@ def _ensure_locked(self, lock_type, pkg):
             # Wait until the other process finishes if there are no more
             # build tasks with priority 0 (i.e., with no uninstalled
             # dependencies).
+            # Never block indefinitely while concurrent builds are running
+            # since their results still need to be processed.
             no_p0 = len(self.build_tasks) == 0 or not self._next_is_pri0()
-            timeout = None if no_p0 else 3
+            timeout = None if no_p0 and not self.build_processes else 3
         else:
             timeout = 1e-9  # Near 0 to iterate through install specs quickly
 
@@ -1010,42 +1162,56 @@ def _init_queue(self, install_deps, install_package):
             install_package (bool): ``True`` if installing the package,
                 otherwise ``False``
         """
-        tty.debug('Initializing the build queue for {0}'.format(self.pkg.name))
+        tty.debug('Initializing the build queue for {0}'.format(
+            ', '.join(root.name for root in self.roots)))
         install_compilers = spack.config.get(
             'config:install_missing_compilers', False)
 
-        if install_deps:
-            for dep in self.spec.traverse(order='post', root=False):
-                dep_pkg = dep.package
+        # Dependencies shared by the roots get a single build task, which
+        # must know about their dependents in the DAGs of all the roots
+        for pkg in self.roots:
+            for spec in pkg.spec.traverse():
+                self.dependents.setdefault(package_id(spec.package), set()) \
+                    .update(package_id(d.package) for d in spec.dependents())
 
-                # First push any missing compilers (if requested)
-                if install_compilers:
-                    self._add_bootstrap_compilers(dep_pkg)
+        for pkg in self.roots:
+            if install_deps:
+                for dep in pkg.spec.traverse(order='post', root=False):
+                    dep_pkg = dep.package
+                    dep_id = package_id(dep_pkg)
+
+                    # First push any missing compilers (if requested)
+                    if install_compilers:
+                        self._add_bootstrap_compilers(dep_pkg)
+
+                    if dep_id in self.build_tasks or dep_id in self.installed:
+                        continue
 
-                if package_id(dep_pkg) not in self.build_tasks:
                     self._push_task(dep_pkg, False, 0, 0, STATUS_ADDED)
 
-                # Clear any persistent failure markings _unless_ they are
-                # associated with another process in this parallel build
-                # of the spec.
-                spack.store.db.clear_failure(dep, force=False)
+                    # Clear any persistent failure markings _unless_ they are
+                    # associated with another process in this parallel build
+                    # of the spec.
+                    spack.store.db.clear_failure(dep, force=False)
 
-            # Push any missing compilers (if requested) as part of the
-            # package dependencies.
-            if install_compilers:
-                self._add_bootstrap_compilers(self.pkg)
+                # Push any missing compilers (if requested) as part of the
+                # package dependencies.
+                if install_compilers:
+                    self._add_bootstrap_compilers(pkg)
 
-        if install_package and self.pkg_id not in self.build_tasks:
-            # Be sure to clear any previous failure
-            spack.store.db.clear_failure(self.pkg.spec, force=True)
+            pkg_id = package_id(pkg)
+            if install_package and pkg_id not in self.build_tasks and \
+                    pkg_id not in self.installed:
+                # Be sure to clear any previous failure
+                spack.store.db.clear_failure(pkg.spec, force=True)
 
-            # If not installing dependencies, then determine their
-            # installation status before proceeding
-            if not install_deps:
-                self._check_deps_status()
+                # If not installing dependencies, then determine their
+                # installation status before proceeding
+                if not install_deps:
+                    self._check_deps_status(pkg)
 
-            # Now add the package itself, if appropriate
-            self._push_task(self.pkg, False, 0, 0, STATUS_ADDED)
+                # Now add the package itself, if appropriate
+                self._push_task(pkg, False, 0, 0, STATUS_ADDED)
 
     def _install_task(self, task, **kwargs):
         """
@@ -1069,7 +1235,7 @@ def _install_task(self, task, **kwargs):
 
         pkg = task.pkg
         pkg_id = package_id(pkg)
-        explicit = pkg_id == self.pkg_id
+        explicit = pkg_id in self.root_ids
 
         tty.msg(install_msg(pkg_id, self.pid))
         task.start = task.start or time.time()
@@ -1196,18 +1362,60 @@ def build_process():
         if not pkg.unit_test_check():
             return
 
-        try:
-            self._setup_install_dir(pkg)
+        self._setup_install_dir(pkg)
+
+        if self._build_concurrently(task):
+            # Fork a child to do the actual installation in the background.
+            # Its result is collected once it finishes (see _wait_for_builds).
+            process = spack.build_environment.start_build_process(
+                pkg, build_process, dirty=dirty, fake=fake,
+                jobs=self.jobs_per_build, forward_stdin=False)
+            self.build_processes[pkg_id] = (task, process)
+            return
+
+        # Fork a child to do the actual installation.
+        self._complete_build(task, lambda: spack.build_environment.fork(
+            pkg, build_process, dirty=dirty, fake=fake))
+
+    _install_task.__doc__ += install_args_docstring
+
+    def _build_concurrently(self, task):
+        """
+        Determine if the build of the task can proceed in the background
+        while other tasks are being processed.
+
+        Overwrite installs are always built synchronously since they are
+        performed within a directory transaction.
+
+        Args:
+            task (BuildTask): the build task for the package
+
+        Return:
+            (bool) ``True`` if the task is built concurrently, otherwise
+                ``False``
+        """
+        return (self.max_concurrent_builds > 1 and
+                task.pkg.spec.dag_hash() not in self.overwrite)
 
-            # Fork a child to do the actual installation.
+    def _complete_build(self, task, build):
+        """
+        Wait for the build of the task's package to finish and register the
+        newly installed package.
+
+        Args:
+            task (BuildTask): the build task for the package
+            build (callable): argless function returning the result of the
+                build process
+        """
+        pkg = task.pkg
+        try:
             # Preserve verbosity settings across installs.
-            spack.package.PackageBase._verbose = spack.build_environment.fork(
-                pkg, build_process, dirty=dirty, fake=fake)
+            spack.package.PackageBase._verbose = build()
 
             # Note: PARENT of the build process adds the new package to
             # the database, so that we don't need to re-read from file.
             spack.store.db.add(pkg.spec, spack.store.layout,
-                               explicit=explicit)
+                               explicit=task.pkg_id in self.root_ids)
 
             # If a compiler, ensure it is added to the configuration
             if task.compiler:
@@ -1216,12 +1424,50 @@ def build_process():
         except spack.build_environment.StopPhase as e:
             # A StopPhase exception means that do_install was asked to
             # stop early from clients, and is not an error at this point
-            pre = '{0}'.format(self.pid) if tty.show_pid() else ''
+            pid = '{0}: '.format(self.pid) if tty.show_pid() else ''
             tty.debug('{0}{1}'.format(pid, str(e)))
             tty.debug('Package stage directory : {0}'
                       .format(pkg.stage.source_path))
 
-    _install_task.__doc__ += install_args_docstring
+    def _install_or_overwrite(self, task, **kwargs):
+        """
+        Install the package of the build task, replacing the existing
+        installation in a directory transaction when it is being overwritten.
+
+        Args:
+            task (BuildTask): the installation build task for a package"""
+        pkg = task.pkg
+        if pkg.spec.dag_hash() in self.overwrite:
+            rec, _ = self._check_db(pkg.spec)
+            if rec and rec.installed:
+                if rec.installation_time < self.overwrite_time:
+                    # If it's actually overwriting, do a fs transaction
+                    if os.path.exists(rec.path):
+                        with fs.replace_directory_transaction(
+                                rec.path):
+                            self._install_task(task, **kwargs)
+                    else:
+                        tty.debug("Missing installation to overwrite")
+                        self._install_task(task, **kwargs)
+            else:
+                # overwriting nothing
+                self._install_task(task, **kwargs)
+        else:
+            self._install_task(task, **kwargs)
+
+    _install_or_overwrite.__doc__ += install_args_docstring
+
+    def _next_is_ready(self):
+        """
+        Determine if the next queued build task has no uninstalled
+        dependencies, discarding any removed tasks at the front of the queue.
+
+        Return:
+            True if it does, False otherwise
+        """
+        while self.build_pq and self.build_pq[0][1].status == STATUS_REMOVED:
+            heapq.heappop(self.build_pq)
+        return bool(self.build_pq) and self._next_is_pri0()
 
     def _next_is_pri0(self):
         """
@@ -1274,9 +1520,97 @@ def _push_task(self, pkg, compiler, start, attempts, status):
         # was decremented due to the installation of one of its dependencies.
         task = BuildTask(pkg, compiler, start, attempts, status,
                          self.installed)
+        task.dependents.update(self.dependents.get(pkg_id, ()))
         self.build_tasks[pkg_id] = task
         heapq.heappush(self.build_pq, (task.key, task))
 
+    def _process_install_result(self, task, install, keep_prefix,
+                                fail_fast):
+        """
+        Perform (part of) the installation of the package and update the
+        installed and failed status of its build task accordingly.
+
+        Nothing is updated while the package is still being built by a
+        concurrent build process.
+
+        Args:
+            task (BuildTask): the installation build task for a package
+            install (callable): argless function performing the installation
+            keep_prefix (bool): ``True`` if the prefix is to be kept on
+                failure, otherwise ``False``
+            fail_fast (bool): ``True`` if the installation is to terminate
+                on the first failure, otherwise ``False``
+
+        Return:
+            (bool) the updated value of ``keep_prefix``
+        """
+        pkg = task.pkg
+        pkg_id = task.pkg_id
+        try:
+            install()
+            if pkg_id in self.build_processes:
+                return keep_prefix
+
+            self._update_installed(task)
+
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, 'stop_before_phase', None)
+            last_phase = getattr(pkg, 'last_phase', None)
+            keep_prefix = keep_prefix or \
+                (stop_before_phase is None and last_phase is None)
+
+        except spack.directory_layout.InstallDirectoryAlreadyExistsError:
+            tty.debug("Keeping existing install prefix in place.")
+            self._update_installed(task)
+            raise
+
+        except KeyboardInterrupt as exc:
+            # The build has been terminated with a Ctrl-C so terminate.
+            err = 'Failed to install {0} due to {1}: {2}'
+            tty.error(err.format(pkg.name, exc.__class__.__name__,
+                      str(exc)))
+            raise
+
+        except (Exception, SystemExit) as exc:
+            # Best effort installs suppress the exception and mark the
+            # package as a failure UNLESS this is an explicit package.
+            if (not isinstance(exc, spack.error.SpackError) or
+                not exc.printed):
+                # SpackErrors can be printed by the build process or at
+                # lower levels -- skip printing if already printed.
+                # TODO: sort out this and SpackEror.print_context()
+                err = 'Failed to install {0} due to {1}: {2}'
+                tty.error(
+                    err.format(pkg.name, exc.__class__.__name__, str(exc)))
+
+            self._update_failed(task, True, exc)
+
+            if fail_fast:
+                # The user requested the installation to terminate on
+                # failure.
+                raise InstallError('{0}: {1}'
+                                   .format(_fail_fast_err, str(exc)))
+
+            if pkg_id in self.root_ids:
+                raise
+
+        finally:
+            if pkg_id not in self.build_processes:
+                # Remove the install prefix if anything went wrong during
+                # install.
+                if not keep_prefix:
+                    pkg.remove_prefix()
+
+                # The subprocess *may* have removed the build stage. Mark it
+                # not created so that the next time pkg.stage is invoked, we
+                # check the filesystem for it.
+                pkg.stage.created = False
+
+        # Perform basic task cleanup for the installed spec to
+        # include downgrading the write to a read lock
+        self._cleanup_task(pkg)
+        return keep_prefix
+
     def _release_lock(self, pkg_id):
         """
         Release any lock on the package
@@ -1361,6 +1695,14 @@ def _setup_install_dir(self, pkg):
             # Ensure the metadata path exists as well
             fs.mkdirp(spack.store.layout.metadata_path(pkg.spec), mode=perms)
 
+    def _terminate_builds(self):
+        """Terminate any concurrent build processes still running."""
+        for pkg_id, (task, process) in list(self.build_processes.items()):
+            tty.debug('Terminating the build process for {0}'.format(pkg_id))
+            process.terminate()
+            task.pkg.stage.created = False
+        self.build_processes.clear()
+
     def _update_failed(self, task, mark=False, exc=None):
         """
         Update the task and transitive dependents as failed; optionally mark
@@ -1422,19 +1764,143 @@ def _update_installed(self, task):
                 tty.debug('{0} has no build task to update for {1}\'s success'
                           .format(dep_id, pkg_id))
 
+    def _start_prefetch(self, jobs, restage, use_cache, full_hash_match):
+        """
+        Start downloading the sources of the queued packages in a pool of
+        worker processes, in the order in which they are going to be built.
+
+        Args:
+            jobs (int): maximum number of concurrent downloads
+            restage (bool): ``True`` if forcing Spack to restage the package
+                source, otherwise ``False``
+            use_cache (bool): ``True`` if packages are installed from binary
+                caches, if available, otherwise ``False``
+            full_hash_match (bool): ``True`` if binary packages must match
+                the full hash of the package
+        """
+        # The first build would only wait for its own download
+        if len(self.build_tasks) < 2:
+            return
+
+        pkgs = []
+        for _, task in sorted(self.build_pq, key=lambda item: item[0]):
+            pkg = task.pkg
+            if task.pkg_id in self.installed or pkg.spec.external or \
+                    pkg.installed_upstream:
+                continue
+
+            _, installed_in_db = self._check_db(pkg.spec)
+            if not installed_in_db and _prefetchable(pkg, restage):
+                pkgs.append(pkg)
+
+        if len(pkgs) < 2:
+            return
+
+        tty.debug('Prefetching sources of {0} packages'.format(len(pkgs)))
+        _prefetch_pkgs.clear()
+        _prefetch_pkgs.update((package_id(pkg), pkg) for pkg in pkgs)
+
+        self.prefetch_pool = llnl.util.lang.fork_context.Pool(
+            processes=min(jobs, len(pkgs)))
+        for pkg in pkgs:
+            pkg_id = package_id(pkg)
+            result = self.prefetch_pool.apply_async(
+                _prefetch, (pkg_id, use_cache, full_hash_match))
+            self.prefetches[pkg_id] = (pkg, result)
+        self.prefetch_pool.close()
+
+    def _wait_for_prefetch(self, task):
+        """
+        Wait for the sources of the task's package to be downloaded, if they
+        are being prefetched.  The build fetches any sources that could not
+        be prefetched from a clean stage, and reports errors then.
+
+        Args:
+            task (BuildTask): the build task for the package
+        """
+        pkg, result = self.prefetches.pop(task.pkg_id, (None, None))
+        if result is None:
+            return
+
+        if not result.ready():
+            tty.debug('Waiting for the sources of {0}'.format(task.pkg_id))
+
+        # Waiting with a timeout keeps Python 2 responsive to interrupts
+        while not result.ready():
+            result.wait(1)
+
+        error = result.get()
+        if error:
+            tty.debug('Failed to prefetch the sources of {0}: {1}'
+                      .format(task.pkg_id, error))
+            pkg.stage.destroy()
+
+    def _stop_prefetch(self, keep_stage):
+        """
+        Stop any downloads in progress, and remove the stages of packages
+        whose sources were prefetched but that were not built.
+
+        Args:
+            keep_stage (bool): ``True`` if the stages are to be kept,
+                otherwise ``False``
+        """
+        if self.prefetch_pool is None:
+            return
+
+        self.prefetch_pool.terminate()
+        self.prefetch_pool.join()
+        self.prefetch_pool = None
+
+        if not keep_stage:
+            for pkg, _ in self.prefetches.values():
+                pkg.stage.destroy()
+        self.prefetches.clear()
+        _prefetch_pkgs.clear()
+
+    def _wait_for_builds(self, keep_prefix, fail_fast):
+        """
+        Wait for at least one concurrent build process to finish and process
+        the results of all of the finished builds.
+
+        Args:
+            keep_prefix (bool): ``True`` if the prefix is to be kept on
+                failure, otherwise ``False``
+            fail_fast (bool): ``True`` if the installation is to terminate
+                on the first failure, otherwise ``False``
+
+        Return:
+            (bool) the updated value of ``keep_prefix``
+        """
+        processes = [process for _, process in self.build_processes.values()]
+        ready, _, _ = select.select(processes, [], [])
+        for pkg_id in list(self.build_processes):
+            task, process = self.build_processes[pkg_id]
+            if process not in ready:
+                continue
+
+            del self.build_processes[pkg_id]
+            keep_prefix = self._process_install_result(
+                task, lambda: self._complete_build(task, process.complete),
+                keep_prefix, fail_fast)
+        return keep_prefix
+
     def install(self, **kwargs):
         """
         Install the package and/or associated dependencies.
 
         Args:"""
 
+        cache_only = kwargs.get('cache_only', False)
         fail_fast = kwargs.get('fail_fast', False)
+        fake = kwargs.get('fake', False)
+        full_hash_match = kwargs.get('full_hash_match', False)
         install_deps = kwargs.get('install_deps', True)
         keep_prefix = kwargs.get('keep_prefix', False)
         keep_stage = kwargs.get('keep_stage', False)
         restage = kwargs.get('restage', False)
-
-        fail_fast_err = 'Terminating after first install failure'
+        use_cache = kwargs.get('use_cache', True)
+        jobs_packages = kwargs.get('jobs_packages', 1) or 1
+        prefetch_jobs = kwargs.get('prefetch_jobs', 4)
 
         # install_package defaults True and is popped so that dependencies are
         # always installed regardless of whether the root was installed
@@ -1446,214 +1912,183 @@ def install(self, **kwargs):
         if self.overwrite:
             self.overwrite_time = time.time()
 
+        # Split the build jobs between the packages built concurrently
+        self.max_concurrent_builds = jobs_packages
+        if jobs_packages > 1:
+            build_jobs = min(spack.config.get('config:build_jobs', 16),
+                             multiprocessing.cpu_count())
+            self.jobs_per_build = max(1, build_jobs // jobs_packages)
+
         # Ensure not attempting to perform an installation when user didn't
         # want to go that far.
         self._check_last_phase(**kwargs)
 
-        # Skip out early if the spec is not being installed locally (i.e., if
-        # external or upstream).
-        not_local = _handle_external_and_upstream(self.pkg, True)
-        if not_local:
+        # Skip out early if no root is being installed locally (i.e., if they
+        # are all external or upstream).  Other roots flag them as installed.
+        not_local = [pkg for pkg in self.roots
+                     if _handle_external_and_upstream(pkg, True)]
+        if len(not_local) == len(self.roots):
             return
+        self.installed.update(package_id(pkg) for pkg in not_local)
 
         # Initialize the build task queue
         self._init_queue(install_deps, install_package)
 
         # Proceed with the installation
-        while self.build_pq:
-            task = self._pop_task()
-            if task is None:
-                continue
-
-            pkg, spec = task.pkg, task.pkg.spec
-            pkg_id = package_id(pkg)
-            tty.verbose('Processing {0}: task={1}'.format(pkg_id, task))
-
-            # Ensure that the current spec has NO uninstalled dependencies,
-            # which is assumed to be reflected directly in its priority.
-            #
-            # If the spec has uninstalled dependencies, then there must be
-            # a bug in the code (e.g., priority queue or uninstalled
-            # dependencies handling).  So terminate under the assumption that
-            # all subsequent tasks will have non-zero priorities or may be
-            # dependencies of this task.
-            if task.priority != 0:
-                tty.error('Detected uninstalled dependencies for {0}: {1}'
-                          .format(pkg_id, task.uninstalled_deps))
-                dep_str = 'dependencies' if task.priority > 1 else 'dependency'
-                raise InstallError(
-                    'Cannot proceed with {0}: {1} uninstalled {2}: {3}'
-                    .format(pkg_id, task.priority, dep_str,
-                            ','.join(task.uninstalled_deps)))
-
-            # Skip the installation if the spec is not being installed locally
-            # (i.e., if external or upstream) BUT flag it as installed since
-            # some package likely depends on it.
-            if pkg_id != self.pkg_id:
-                not_local = _handle_external_and_upstream(pkg, False)
-                if not_local:
-                    self._update_installed(task)
-                    _print_installed_pkg(pkg.prefix)
+        try:
+            # Download sources while the packages ahead of them are built
+            if prefetch_jobs > 0 and not (fake or cache_only):
+                self._start_prefetch(prefetch_jobs, restage, use_cache,
+                                     full_hash_match)
+
+            while self.build_pq or self.build_processes:
+                # Wait for a concurrent build to finish when we are at capacity
+                # or there is no task ready to be installed.
+                at_capacity = \
+                    len(self.build_processes) >= self.max_concurrent_builds
+                if self.build_processes and (
+                        at_capacity or not self._next_is_ready()):
+                    keep_prefix = self._wait_for_builds(keep_prefix,
+                                                        fail_fast)
                     continue
 
-            # Flag a failed spec.  Do not need an (install) prefix lock since
-            # assume using a separate (failed) prefix lock file.
-            if pkg_id in self.failed or spack.store.db.prefix_failed(spec):
-                tty.warn('{0} failed to install'.format(pkg_id))
-                self._update_failed(task)
-
-                if fail_fast:
-                    raise InstallError(fail_fast_err)
-
-                continue
+                task = self._pop_task()
+                if task is None:
+                    continue
 
-            # Attempt to get a write lock.  If we can't get the lock then
-            # another process is likely (un)installing the spec or has
-            # determined the spec has already been installed (though the
-            # other process may be hung).
-            ltype, lock = self._ensure_locked('write', pkg)
-            if lock is None:
-                # Attempt to get a read lock instead.  If this fails then
-                # another process has a write lock so must be (un)installing
-                # the spec (or that process is hung).
-                ltype, lock = self._ensure_locked('read', pkg)
-
-            # Requeue the spec if we cannot get at least a read lock so we
-            # can check the status presumably established by another process
-            # -- failed, installed, or uninstalled -- on the next pass.
-            if lock is None:
-                self._requeue_task(task)
-                continue
+                pkg, spec = task.pkg, task.pkg.spec
+                pkg_id = package_id(pkg)
+                tty.verbose('Processing {0}: task={1}'.format(pkg_id, task))
+
+                # Ensure that the current spec has NO uninstalled dependencies,
+                # which is assumed to be reflected directly in its priority.
+                #
+                # If the spec has uninstalled dependencies, then there must be
+                # a bug in the code (e.g., priority queue or uninstalled
+                # dependencies handling).  So terminate under the assumption
+                # that all subsequent tasks will have non-zero priorities or
+                # may be dependencies of this task.
+                if task.priority != 0:
+                    tty.error('Detected uninstalled dependencies for {0}: {1}'
+                              .format(pkg_id, task.uninstalled_deps))
+                    dep_str = 'dependencies' if task.priority > 1 \
+                        else 'dependency'
+                    raise InstallError(
+                        'Cannot proceed with {0}: {1} uninstalled {2}: {3}'
+                        .format(pkg_id, task.priority, dep_str,
+                                ','.join(task.uninstalled_deps)))
+
+                # Skip the installation if the spec is not being installed
+                # locally (i.e., if external or upstream) BUT flag it as
+                # installed since some package likely depends on it.
+                if pkg_id not in self.root_ids:
+                    not_local = _handle_external_and_upstream(pkg, False)
+                    if not_local:
+                        self._update_installed(task)
+                        _print_installed_pkg(pkg.prefix)
+                        continue
+
+                # Flag a failed spec.  Do not need an (install) prefix lock
+                # since assume using a separate (failed) prefix lock file.
+                if pkg_id in self.failed or spack.store.db.prefix_failed(spec):
+                    tty.warn('{0} failed to install'.format(pkg_id))
+                    self._update_failed(task)
+
+                    if fail_fast:
+                        raise InstallError(_fail_fast_err)
 
-            # Determine state of installation artifacts and adjust accordingly.
-            self._prepare_for_install(task, keep_prefix, keep_stage,
-                                      restage)
-
-            # Flag an already installed package
-            if pkg_id in self.installed:
-                # Downgrade to a read lock to preclude other processes from
-                # uninstalling the package until we're done installing its
-                # dependents.
-                ltype, lock = self._ensure_locked('read', pkg)
-                if lock is not None:
-                    self._update_installed(task)
-                    _print_installed_pkg(pkg.prefix)
-
-                    # It's an already installed compiler, add it to the config
-                    if task.compiler:
-                        spack.compilers.add_compilers_to_config(
-                            spack.compilers.find_compilers([pkg.spec.prefix]))
+                    continue
 
-                else:
-                    # At this point we've failed to get a write or a read
-                    # lock, which means another process has taken a write
-                    # lock between our releasing the write and acquiring the
-                    # read.
-                    #
-                    # Requeue the task so we can re-check the status
-                    # established by the other process -- failed, installed,
-                    # or uninstalled -- on the next pass.
-                    self.installed.remove(pkg_id)
+                # Attempt to get a write lock.  If we can't get the lock then
+                # another process is likely (un)installing the spec or has
+                # determined the spec has already been installed (though the
+                # other process may be hung).
+                ltype, lock = self._ensure_locked('write', pkg)
+                if lock is None:
+                    # Attempt to get a read lock instead.  If this fails then
+                    # another process has a write lock so must be
+                    # (un)installing the spec (or that process is hung).
+                    ltype, lock = self._ensure_locked('read', pkg)
+
+                # Requeue the spec if we cannot get at least a read lock so we
+                # can check the status presumably established by another
+                # process -- failed, installed, or uninstalled -- on the next
+                # pass.
+                if lock is None:
                     self._requeue_task(task)
-                continue
+                    continue
 
-            # Having a read lock on an uninstalled pkg may mean another
-            # process completed an uninstall of the software between the
-            # time we failed to acquire the write lock and the time we
-            # took the read lock.
-            #
-            # Requeue the task so we can check the status presumably
-            # established by the other process -- failed, installed, or
-            # uninstalled -- on the next pass.
-            if ltype == 'read':
-                self._requeue_task(task)
-                continue
+                # Determine state of installation artifacts and adjust
+                # accordingly.
+                self._wait_for_prefetch(task)
+                self._prepare_for_install(task, keep_prefix, keep_stage,
+                                          restage)
+
+                # Flag an already installed package
+                if pkg_id in self.installed:
+                    # Downgrade to a read lock to preclude other processes from
+                    # uninstalling the package until we're done installing its
+                    # dependents.
+                    ltype, lock = self._ensure_locked('read', pkg)
+                    if lock is not None:
+                        self._update_installed(task)
+                        _print_installed_pkg(pkg.prefix)
+
+                        # It's an already installed compiler, add it to the
+                        # config
+                        if task.compiler:
+                            spack.compilers.add_compilers_to_config(
+                                spack.compilers.find_compilers(
+                                    [pkg.spec.prefix]))
 
-            # Proceed with the installation since we have an exclusive write
-            # lock on the package.
-            try:
-                if pkg.spec.dag_hash() in self.overwrite:
-                    rec, _ = self._check_db(pkg.spec)
-                    if rec and rec.installed:
-                        if rec.installation_time < self.overwrite_time:
-                            # If it's actually overwriting, do a fs transaction
-                            if os.path.exists(rec.path):
-                                with fs.replace_directory_transaction(
-                                        rec.path):
-                                    self._install_task(task, **kwargs)
-                            else:
-                                tty.debug("Missing installation to overwrite")
-                                self._install_task(task, **kwargs)
                     else:
-                        # overwriting nothing
-                        self._install_task(task, **kwargs)
-                else:
-                    self._install_task(task, **kwargs)
-                self._update_installed(task)
-
-                # If we installed then we should keep the prefix
-                stop_before_phase = getattr(pkg, 'stop_before_phase', None)
-                last_phase = getattr(pkg, 'last_phase', None)
-                keep_prefix = keep_prefix or \
-                    (stop_before_phase is None and last_phase is None)
-
-            except spack.directory_layout.InstallDirectoryAlreadyExistsError:
-                tty.debug("Keeping existing install prefix in place.")
-                self._update_installed(task)
-                raise
+                        # At this point we've failed to get a write or a read
+                        # lock, which means another process has taken a write
+                        # lock between our releasing the write and acquiring
+                        # the read.
+                        #
+                        # Requeue the task so we can re-check the status
+                        # established by the other process -- failed,
+                        # installed, or uninstalled -- on the next pass.
+                        self.installed.remove(pkg_id)
+                        self._requeue_task(task)
+                    continue
 
-            except KeyboardInterrupt as exc:
-                # The build has been terminated with a Ctrl-C so terminate.
-                err = 'Failed to install {0} due to {1}: {2}'
-                tty.error(err.format(pkg.name, exc.__class__.__name__,
-                          str(exc)))
-                raise
+                # Having a read lock on an uninstalled pkg may mean another
+                # process completed an uninstall of the software between the
+                # time we failed to acquire the write lock and the time we
+                # took the read lock.
+                #
+                # Requeue the task so we can check the status presumably
+                # established by the other process -- failed, installed, or
+                # uninstalled -- on the next pass.
+                if ltype == 'read':
+                    self._requeue_task(task)
+                    continue
 
-            except (Exception, SystemExit) as exc:
-                # Best effort installs suppress the exception and mark the
-                # package as a failure UNLESS this is the explicit package.
-                if (not isinstance(exc, spack.error.SpackError) or
-                    not exc.printed):
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackEror.print_context()
-                    err = 'Failed to install {0} due to {1}: {2}'
-                    tty.error(
-                        err.format(pkg.name, exc.__class__.__name__, str(exc)))
-
-                self._update_failed(task, True, exc)
-
-                if fail_fast:
-                    # The user requested the installation to terminate on
-                    # failure.
-                    raise InstallError('{0}: {1}'
-                                       .format(fail_fast_err, str(exc)))
-
-                if pkg_id == self.pkg_id:
-                    raise
-
-            finally:
-                # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix:
-                    pkg.remove_prefix()
+                # Proceed with the installation since we have an exclusive
+                # write lock on the package.
+                keep_prefix = self._process_install_result(
+                    task, lambda: self._install_or_overwrite(task, **kwargs),
+                    keep_prefix, fail_fast)
 
-                # The subprocess *may* have removed the build stage. Mark it
-                # not created so that the next time pkg.stage is invoked, we
-                # check the filesystem for it.
-                pkg.stage.created = False
+        except BaseException:
+            # Do not leave concurrent builds running behind our back
+            self._terminate_builds()
+            raise
 
-            # Perform basic task cleanup for the installed spec to
-            # include downgrading the write to a read lock
-            self._cleanup_task(pkg)
+        finally:
+            self._stop_prefetch(keep_stage)
 
         # Cleanup, which includes releasing all of the read locks
         self._cleanup_all_tasks()
 
-        # Ensure we properly report if the original/explicit pkg is failed
-        if self.pkg_id in self.failed:
+        # Ensure we properly report if an original/explicit pkg is failed
+        failed_roots = [pkg_id for pkg_id in sorted(self.root_ids)
+                        if pkg_id in self.failed]
+        if failed_roots:
             msg = ('Installation of {0} failed.  Review log for details'
-                   .format(self.pkg_id))
+                   .format(', '.join(failed_roots)))
             raise InstallError(msg)
 
     install.__doc__ += install_args_docstring
@@ -21,23 +21,20 @@
 import warnings
 from six import StringIO
 
-import archspec.cpu
 import llnl.util.filesystem as fs
 import llnl.util.tty as tty
 import llnl.util.tty.color as color
 from llnl.util.tty.log import log_output
 
 import spack
-import spack.architecture
 import spack.config
 import spack.cmd
-import spack.environment as ev
 import spack.paths
-import spack.repo
-import spack.store
 import spack.util.debug
+import spack.util.lock
 import spack.util.path
 import spack.util.executable as exe
+import spack.util.spack_json as sjson
 from spack.error import SpackError
 
 
@@ -90,6 +87,9 @@
 #: Properties that commands are required to set.
 required_command_properties = ['level', 'section', 'description']
 
+#: name of the command index in the misc cache
+command_index_cache = 'commands/index.json'
+
 #: Recorded directory where spack command was originally invoked
 spack_working_dir = None
 spack_ld_library_path = os.environ.get('LD_LIBRARY_PATH', '')
@@ -140,25 +140,73 @@ def get_version():
     return spack.spack_version
 
 
+def command_index():
+    """Get the required properties of every spack command.
+
+    Reading the properties means importing the command modules, which
+    pulls in most of Spack. They are kept in an index in the misc cache,
+    and only commands whose source changed since the index was written
+    are imported again.
+
+    The index is only an optimization: if the misc cache cannot be read
+    or written, or the index is corrupt, the commands are imported and
+    the index is rewritten when possible.
+
+    Returns:
+        (dict): dict of ``required_command_properties``, by command name
+    """
+    import spack.caches
+    from llnl.util.lock import LockError
+    from spack.util.file_cache import CacheError
+    cache_errors = (CacheError, LockError, IOError, OSError, ValueError)
+
+    misc_cache = spack.caches.misc_cache
+    index, index_mtime = {}, 0
+    try:
+        index_mtime = misc_cache.mtime(command_index_cache)
+        if index_mtime:
+            with misc_cache.read_transaction(command_index_cache) as f:
+                index = sjson.load(f)
+    except cache_errors as e:
+        tty.debug('Cannot read the command index: {0}'.format(e))
+        index, index_mtime = {}, 0
+
+    files = spack.cmd.command_files()
+    stale = [cmd for cmd, path in files.items()
+             if cmd not in index or os.path.getmtime(path) > index_mtime]
+    if stale:
+        for command in stale:
+            cmd_module = spack.cmd.get_module(command)
+            index[command] = dict((p, getattr(cmd_module, p, None))
+                                  for p in required_command_properties)
+
+        try:
+            misc_cache.init_entry(command_index_cache)
+            with misc_cache.write_transaction(
+                    command_index_cache) as (old, new):
+                sjson.dump(index, new)
+        except cache_errors as e:
+            tty.debug('Cannot write the command index: {0}'.format(e))
+
+    return dict((cmd, index[cmd]) for cmd in files)
+
+
 def index_commands():
     """create an index of commands by section for this help level"""
     index = {}
-    for command in spack.cmd.all_commands():
-        cmd_module = spack.cmd.get_module(command)
-
+    for command, properties in sorted(command_index().items()):
         # make sure command modules have required properties
         for p in required_command_properties:
-            prop = getattr(cmd_module, p, None)
-            if not prop:
+            if not properties.get(p):
                 tty.die("Command doesn't define a property '%s': %s"
                         % (p, command))
 
         # add commands to lists for their level and higher levels
         for level in reversed(levels):
             level_sections = index.setdefault(level, {})
-            commands = level_sections.setdefault(cmd_module.section, [])
+            commands = level_sections.setdefault(properties['section'], [])
             commands.append(command)
-            if level == cmd_module.level:
+            if level == properties['level']:
                 break
 
     return index
@@ -190,8 +238,15 @@ def format_help_sections(self, level):
         if level not in levels:
             raise ValueError("level must be one of: %s" % levels)
 
-        # lazily add all commands to the parser when needed.
-        add_all_commands(self)
+        # lazily add all commands to the parser when needed.  Only their
+        # descriptions are shown, so take them from the command index
+        # instead of importing every command module.
+        added = set()
+        if hasattr(self, 'subparsers'):
+            added = set(self.subparsers.choices)
+        for cmd_name, properties in sorted(command_index().items()):
+            if cmd_name not in added:
+                self._add_subparser(cmd_name, properties['description'])
 
         """Print help on subcommands in neatly formatted sections."""
         formatter = self._get_formatter()
@@ -299,8 +354,8 @@ def add_parser(name, **kwargs):
         sp.add_parser = add_parser
         return sp
 
-    def add_command(self, cmd_name):
-        """Add one subcommand to this parser."""
+    def _add_subparser(self, cmd_name, description):
+        """Add the subparser of one subcommand, without any arguments."""
         # lazily initialize any subparsers
         if not hasattr(self, 'subparsers'):
             # remove the dummy "command" argument.
@@ -309,16 +364,20 @@ def add_command(self, cmd_name):
             self.subparsers = self.add_subparsers(metavar='COMMAND',
                                                   dest="command")
 
-        # each command module implements a parser() function, to which we
-        # pass its subparser for setup.
-        module = spack.cmd.get_module(cmd_name)
-
         # build a list of aliases
         alias_list = [k for k, v in aliases.items() if v == cmd_name]
 
-        subparser = self.subparsers.add_parser(
+        return self.subparsers.add_parser(
             cmd_name, aliases=alias_list,
-            help=module.description, description=module.description)
+            help=description, description=description)
+
+    def add_command(self, cmd_name):
+        """Add one subcommand to this parser."""
+        # each command module implements a parser() function, to which we
+        # pass its subparser for setup.
+        module = spack.cmd.get_module(cmd_name)
+
+        subparser = self._add_subparser(cmd_name, module.description)
         module.setup_parser(subparser)
 
         # return the callable function for the command
@@ -408,6 +467,9 @@ def make_argument_parser(**kwargs):
     parser.add_argument(
         '--lines', default=20, action='store',
         help="lines of profile output or 'all' (default: 20)")
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help="show how long it takes to import each module")
     parser.add_argument(
         '-v', '--verbose', action='store_true',
         help="print additional output during builds")
@@ -455,8 +517,8 @@ def setup_main_options(args):
         spack.config.set('config:locks', False, scope='command_line')
 
     if args.mock:
-        rp = spack.repo.RepoPath(spack.paths.mock_packages_path)
-        spack.repo.set_path(rp)
+        from spack.repo import RepoPath, set_path
+        set_path(RepoPath(spack.paths.mock_packages_path))
 
     # If the user asked for it, don't check ssl certs.
     if args.insecure:
@@ -626,6 +688,8 @@ def shell_set(var, value):
         else:
             tty.die('shell must be sh or csh')
 
+    import spack.architecture
+
     # print sys type
     shell_set('_sp_sys_type', spack.architecture.sys_type())
     shell_set('_sp_compatible_sys_types',
@@ -664,6 +728,8 @@ def shell_set(var, value):
     # print environment module system if available. This can be expensive
     # on clusters, so skip it if not needed.
     if 'modules' in info:
+        import archspec.cpu
+        import spack.store
         generic_arch = archspec.cpu.host().family
         module_spec = 'environment-modules target={0}'.format(generic_arch)
         specs = spack.store.db.query(module_spec)
@@ -688,6 +754,21 @@ def main(argv=None):
     parser.add_argument('command', nargs=argparse.REMAINDER)
     args, unknown = parser.parse_known_args(argv)
 
+    if not args.profile_startup:
+        return _main(parser, args, argv)
+
+    # bin/spack has usually started the profiler already, to include the
+    # imports done before we get here.
+    import spack.util.import_profile as import_profile
+    import_profile.start()
+    try:
+        return _main(parser, args, argv)
+    finally:
+        import_profile.report(args.lines)
+
+
+def _main(parser, args, argv):
+    """Run the command in ``args``, after the first parse in ``main()``."""
     # Recover stored LD_LIBRARY_PATH variables from spack shell function
     # This is necessary because MacOS System Integrity Protection clears
     # (DY?)LD_LIBRARY_PATH variables on process start.
@@ -706,8 +787,12 @@ def main(argv=None):
     if args.config_scopes:
         spack.config.command_line_scopes = args.config_scopes
 
-    # activate an environment if one was specified on the command line
-    if not args.no_env:
+    # activate an environment if one was specified on the command line.
+    # Environments pull in most of Spack, so only import them when one
+    # could actually be found.
+    if not args.no_env and (args.env or args.env_dir or
+                            os.environ.get('SPACK_ENV')):
+        import spack.environment as ev
         env = ev.find_environment(args)
         if env:
             ev.activate(env, args.use_env_repo, add_view=False)
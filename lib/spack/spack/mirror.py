@@ -11,8 +11,10 @@
 where spack is run is not connected to the internet, it allows spack
 to download packages directly from a mirror (e.g., on an intranet).
 """
+import collections
 import sys
 import os
+import threading
 import traceback
 import os.path
 import operator
@@ -30,6 +32,7 @@
 
 import llnl.util.tty as tty
 from llnl.util.filesystem import mkdirp
+from llnl.util.lang import fork_context
 
 import spack.config
 import spack.error
@@ -401,7 +404,8 @@ def get_matching_versions(specs, num_versions=1):
     return matching
 
 
-def create(path, specs, skip_unstable_versions=False):
+def create(path, specs, skip_unstable_versions=False, jobs=1,
+           jobs_per_host=None):
     """Create a directory to be used as a spack mirror, and fill it with
     package archives.
 
@@ -412,6 +416,9 @@ def create(path, specs, skip_unstable_versions=False):
         skip_unstable_versions: if true, this skips adding resources when
             they do not have a stable archive checksum (as determined by
             ``fetch_strategy.stable_target``)
+        jobs (int): number of specs to add to the mirror at the same time
+        jobs_per_host (int or None): maximum number of specs fetched from
+            the same server at the same time, or None for no limit
 
     Return Value:
         Returns a tuple of lists: (present, mirrored, error)
@@ -447,6 +454,11 @@ def create(path, specs, skip_unstable_versions=False):
         mirror_root, skip_unstable_versions=skip_unstable_versions)
     mirror_stats = MirrorStats()
 
+    if jobs > 1 and len(specs) > 1:
+        _add_specs_in_parallel(
+            specs, mirror_cache, mirror_stats, jobs, jobs_per_host)
+        return mirror_stats.stats()
+
     # Iterate through packages and download all safe tarballs for each
     for spec in specs:
         mirror_stats.next_spec(spec)
@@ -465,6 +477,9 @@ def __init__(self):
         self.added_resources = set()
         self.existing_resources = set()
 
+        # results of parallel workers are merged from a pool thread
+        self._lock = threading.Lock()
+
     def next_spec(self, spec):
         self._tally_current_spec()
         self.current_spec = spec
@@ -495,6 +510,23 @@ def added(self, resource):
     def error(self):
         self.errors.add(self.current_spec)
 
+    def merge(self, spec, added, existing, error):
+        """Record the outcome of adding a spec to the mirror elsewhere.
+
+        Arguments:
+            spec (Spec): spec that was added to the mirror
+            added (int): number of resources of the spec that were added
+            existing (int): number of its resources that were present
+            error (bool): whether adding the spec failed
+        """
+        with self._lock:
+            if added:
+                self.new[spec] = added
+            if existing:
+                self.present[spec] = existing
+            if error:
+                self.errors.add(spec)
+
 
 def _add_single_spec(spec, mirror, mirror_stats):
     tty.msg("Adding package {pkg} to mirror".format(
@@ -526,6 +558,93 @@ def _add_single_spec(spec, mirror, mirror_stats):
         mirror_stats.error()
 
 
+#: Specs added to the mirror by parallel workers, which are forked after
+#: it is set, so they inherit it.
+_mirror_specs = []
+
+
+def _add_spec_in_worker(index, mirror):
+    """Add ``_mirror_specs[index]`` to the mirror, in a worker process.
+
+    Returns:
+        (tuple): the index, the numbers of added and existing resources,
+            and whether adding the spec failed
+    """
+    spec = _mirror_specs[index]
+    stats = MirrorStats()
+    stats.next_spec(spec)
+    _add_single_spec(spec, mirror, stats)
+    return (index, len(stats.added_resources),
+            len(stats.existing_resources), bool(stats.errors))
+
+
+def _fetch_host(spec):
+    """Server from which the sources of ``spec`` are fetched, if known."""
+    try:
+        fetch_url = getattr(spec.package.fetcher, 'url', None)
+    except spack.error.SpackError:
+        return None
+    if not isinstance(fetch_url, six.string_types):
+        return None
+    return url_util.parse(fetch_url).netloc or None
+
+
+def _add_specs_in_parallel(specs, mirror, mirror_stats, jobs, jobs_per_host):
+    """Add specs to the mirror with a pool of worker processes.
+
+    Workers are processes rather than threads because fetchers change the
+    working directory.  Specs whose sources come from the same server are
+    handed to at most ``jobs_per_host`` workers at a time.
+    """
+    global _mirror_specs
+    _mirror_specs = specs
+
+    hosts = [_fetch_host(spec) for spec in specs]
+    running = collections.defaultdict(int)
+    finished = threading.Condition()
+    pending = list(range(len(specs)))
+    results = []
+
+    def _done(result):
+        index, added, existing, error = result
+        mirror_stats.merge(specs[index], added, existing, error)
+        with finished:
+            running[hosts[index]] -= 1
+            finished.notify()
+
+    def _can_start(index):
+        host = hosts[index]
+        return jobs_per_host is None or host is None or \
+            running[host] < jobs_per_host
+
+    pool = fork_context.Pool(processes=jobs)
+    try:
+        with finished:
+            while pending:
+                waiting = []
+                for index in pending:
+                    if _can_start(index):
+                        running[hosts[index]] += 1
+                        results.append(pool.apply_async(
+                            _add_spec_in_worker, (index, mirror),
+                            callback=_done))
+                    else:
+                        waiting.append(index)
+                pending = waiting
+
+                if pending:
+                    # A timeout keeps the wait interruptible on Python 2
+                    finished.wait(1)
+
+        pool.close()
+        for result in results:
+            result.get()
+    finally:
+        pool.terminate()
+        pool.join()
+        _mirror_specs = []
+
+
 class MirrorError(spack.error.SpackError):
     """Superclass of all mirror-creation related errors."""
 
@@ -43,6 +43,8 @@
 import spack.paths
 import spack.schema.environment
 import spack.projections as proj
+import spack.repo
+import spack.store
 import spack.tengine as tengine
 import spack.util.environment
 import spack.util.file_permissions as fp
@@ -143,7 +143,12 @@ def expect(self, id):
 
     def setup(self, text):
         if isinstance(text, string_types):
-            text = shlex.split(str(text))
+            text = str(text)
+            # shlex is slow, and only needed to handle quotes and escapes
+            if any(c in text for c in '\'"\\'):
+                text = shlex.split(text)
+            else:
+                text = text.split()
         self.text = text
         self.push_tokens(self.lexer.lex(text))
 
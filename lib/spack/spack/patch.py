@@ -361,7 +361,15 @@ def patch_for_package(self, sha256, pkg):
         patch_dict['sha256'] = sha256
         return from_dict(patch_dict)
 
-    def update_package(self, pkg_fullname):
+    def update_package(self, pkg_fullname, partial_index=None):
+        """Replace the patches of a package in the cache.
+
+        Arguments:
+            pkg_fullname (str): namespaced name of the package
+            partial_index (dict): patches of the package, as returned by
+                ``_index_patches()``.  They're computed from the package
+                if not provided.
+        """
         # remove this package from any patch entries that reference it.
         empty = []
         for sha256, package_to_patch in self.index.items():
@@ -381,8 +389,9 @@ def update_package(self, pkg_fullname):
             del self.index[sha256]
 
         # update the index with per-package patch indexes
-        pkg = spack.repo.get(pkg_fullname)
-        partial_index = self._index_patches(pkg)
+        if partial_index is None:
+            pkg = spack.repo.get(pkg_fullname)
+            partial_index = self._index_patches(pkg)
         for sha256, package_to_patch in partial_index.items():
             p2p = self.index.setdefault(sha256, {})
             p2p.update(package_to_patch)
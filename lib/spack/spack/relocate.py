@@ -2,6 +2,8 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import itertools
+import mmap
 import os
 import platform
 import re
@@ -32,6 +34,12 @@ def __init__(self, file_path, root_path):
             "after replacing it in rpaths.\n"
             "Package should not be relocated.\n Use -a to override." %
             (file_path, root_path))
+        self.file_path = file_path
+        self.root_path = root_path
+
+    def __reduce__(self):
+        # Allow the error to be sent back from a relocation worker process
+        return InstallRootStringError, (self.file_path, self.root_path)
 
 
 class BinaryStringReplacementError(spack.error.SpackError):
@@ -48,6 +56,14 @@ def __init__(self, file_path, old_len, new_len):
             "The size of the file changed from %s to %s\n"
             "when it should have remanined the same." %
             (file_path, old_len, new_len))
+        self.file_path = file_path
+        self.old_len = old_len
+        self.new_len = new_len
+
+    def __reduce__(self):
+        # Allow the error to be sent back from a relocation worker process
+        return BinaryStringReplacementError, (
+            self.file_path, self.old_len, self.new_len)
 
 
 class BinaryTextReplaceError(spack.error.SpackError):
@@ -68,6 +84,12 @@ def __init__(self, old_path, new_path):
         err_msg += "Create buildcache from an install path "
         err_msg += "longer than new path."
         super(BinaryTextReplaceError, self).__init__(msg, err_msg)
+        self.old_path = old_path
+        self.new_path = new_path
+
+    def __reduce__(self):
+        # Allow the error to be sent back from a relocation worker process
+        return BinaryTextReplaceError, (self.old_path, self.new_path)
 
 
 def _patchelf():
@@ -449,72 +471,134 @@ def needs_text_relocation(m_type, m_subtype):
     return m_type == 'text'
 
 
-def _replace_prefix_text(filename, old_dir, new_dir):
-    """Replace all the occurrences of the old install prefix with a
-    new install prefix in text files that are utf-8 encoded.
+#: Compiled regexes of ``_prefix_text_regex()`` and ``_prefix_bin_regex()``.
+#: The prefixes differ for each relocated package, so only the most recently
+#: used regexes are kept.
+_prefix_regexes = llnl.util.lang.LRUCache(32)
+
+
+def _prefix_text_regex(old_dirs):
+    """Compile a single regex matching any of the old directories at the
+    beginning of a path.
+
+    Args:
+        old_dirs (tuple): utf-8 encoded directories to be searched for
+
+    Returns:
+        Compiled regex whose second group is the matched old directory
+    """
+    key = ('text', old_dirs)
+    pat = _prefix_regexes.get(key)
+    if pat is not None:
+        return pat
+
+    # Replace old_dir with new_dir if it appears at the beginning of a path
+    # Negative lookbehind for a character legal in a path
+    # Then a match group for any characters legal in a compiler flag
+    # Then old_dir
+    # Then characters legal in a path
+    # Ensures we only match the old_dir if it's precedeed by a flag or by
+    # characters not legal in a path, but not if it's preceeded by other
+    # components of a path.
+    #
+    # Longer directories come first so that an install prefix takes
+    # precedence over the layout root containing it.
+    alternatives = b'|'.join(
+        re.escape(d) for d in sorted(old_dirs, key=len, reverse=True))
+    pat = re.compile(
+        b'(?<![\\w\\-_/])([\\w\\-_]*?)(%s)([\\w\\-_/]*)' % alternatives)
+    _prefix_regexes[key] = pat
+    return pat
+
+
+def _replace_prefix_text(filename, prefix_to_prefix):
+    """Replace all the occurrences of the old prefixes with the
+    corresponding new prefixes in text files that are utf-8 encoded.
+
+    All of the prefixes are replaced in a single pass over the file, and
+    the file is only rewritten if something was replaced.
 
     Args:
         filename (str): target text file (utf-8 encoded)
-        old_dir (str): directory to be searched in the file
-        new_dir (str): substitute for the old directory
+        prefix_to_prefix (dict): maps directories to be searched in the
+            file to their substitutes
     """
-    # TODO: cache regexes globally to speedup computation
+    byte_prefixes = dict(
+        (old_dir.encode('utf-8'), new_dir.encode('utf-8'))
+        for old_dir, new_dir in prefix_to_prefix.items())
+    pat = _prefix_text_regex(tuple(sorted(byte_prefixes)))
+
+    def replace(match):
+        return match.group(1) + byte_prefixes[match.group(2)] + match.group(3)
+
     with open(filename, 'rb+') as f:
         data = f.read()
+        ndata, nsubs = pat.subn(replace, data)
+        if not nsubs:
+            return
         f.seek(0)
-        # Replace old_dir with new_dir if it appears at the beginning of a path
-        # Negative lookbehind for a character legal in a path
-        # Then a match group for any characters legal in a compiler flag
-        # Then old_dir
-        # Then characters legal in a path
-        # Ensures we only match the old_dir if it's precedeed by a flag or by
-        # characters not legal in a path, but not if it's preceeded by other
-        # components of a path.
-        old_bytes = old_dir.encode('utf-8')
-        pat = b'(?<![\\w\\-_/])([\\w\\-_]*?)%s([\\w\\-_/]*)' % old_bytes
-        repl = b'\\1%s\\2' % new_dir.encode('utf-8')
-        ndata = re.sub(pat, repl, data)
         f.write(ndata)
         f.truncate()
 
 
-def _replace_prefix_bin(filename, old_dir, new_dir):
-    """Replace all the occurrences of the old install prefix with a
-    new install prefix in binary files.
+def _prefix_bin_regex(old_dirs):
+    """Compile a single regex matching any of the old directories.
+
+    Args:
+        old_dirs (tuple): utf-8 encoded directories to be searched for
+
+    Returns:
+        Compiled regex matching the longest of the old directories
+    """
+    key = ('bin', old_dirs)
+    pat = _prefix_regexes.get(key)
+    if pat is None:
+        pat = re.compile(b'|'.join(
+            re.escape(d) for d in sorted(old_dirs, key=len, reverse=True)))
+        _prefix_regexes[key] = pat
+    return pat
+
 
-    The new install prefix is prefixed with ``os.sep`` until the
-    lengths of the prefixes are the same.
+def _replace_prefix_bin(filename, prefix_to_prefix):
+    """Replace all the occurrences of the old prefixes with the
+    corresponding new prefixes in binary files.
+
+    Each new prefix is prefixed with ``os.sep`` until the lengths of the
+    prefixes are the same, so that the strings can be patched in place.
+    The file is memory-mapped and scanned once for all of the prefixes, and
+    it is left untouched if none of them occurs in it.
 
     Args:
         filename (str): target binary file
-        old_dir (str): directory to be searched in the file
-        new_dir (str): substitute for the old directory
+        prefix_to_prefix (dict): maps directories to be searched in the
+            file to their substitutes, which must not be longer
+
+    Raises:
+        BinaryStringReplacementError: when a new prefix is longer than the
+            prefix it replaces
     """
-    def replace(match):
-        occurances = match.group().count(old_dir.encode('utf-8'))
-        olen = len(old_dir.encode('utf-8'))
-        nlen = len(new_dir.encode('utf-8'))
-        padding = (olen - nlen) * occurances
+    replacements = {}
+    for old_dir, new_dir in prefix_to_prefix.items():
+        old_bytes = old_dir.encode('utf-8')
+        new_bytes = new_dir.encode('utf-8')
+        padding = len(old_bytes) - len(new_bytes)
         if padding < 0:
-            return data
-        return match.group().replace(
-            old_dir.encode('utf-8'),
-            os.sep.encode('utf-8') * padding + new_dir.encode('utf-8')
-        )
+            raise BinaryStringReplacementError(
+                filename, len(old_bytes), len(new_bytes))
+        replacements[old_bytes] = os.sep.encode('utf-8') * padding + new_bytes
+    pat = _prefix_bin_regex(tuple(sorted(replacements)))
 
     with open(filename, 'rb+') as f:
-        data = f.read()
-        f.seek(0)
-        original_data_len = len(data)
-        pat = re.compile(old_dir.encode('utf-8'))
-        if not pat.search(data):
+        # Empty files cannot be memory-mapped, but there's nothing to do
+        if os.fstat(f.fileno()).st_size == 0:
             return
-        ndata = pat.sub(replace, data)
-        if not len(ndata) == original_data_len:
-            raise BinaryStringReplacementError(
-                filename, original_data_len, len(ndata))
-        f.write(ndata)
-        f.truncate()
+
+        data = mmap.mmap(f.fileno(), 0)
+        try:
+            for match in pat.finditer(data):
+                data[match.start():match.end()] = replacements[match.group()]
+        finally:
+            data.close()
 
 
 def relocate_macho_binaries(path_names, old_layout_root, new_layout_root,
@@ -817,17 +901,21 @@ def relocate_text(
     orig_sbang = '#!/bin/bash {0}/bin/sbang'.format(orig_spack)
     new_sbang = sbang.sbang_shebang_line()
 
-    # Do relocations on text that refers to the install tree
-    for filename in files:
-        _replace_prefix_text(filename, orig_install_prefix, new_install_prefix)
-        for orig_dep_prefix, new_dep_prefix in new_prefixes.items():
-            _replace_prefix_text(filename, orig_dep_prefix, new_dep_prefix)
-        _replace_prefix_text(filename, orig_layout_root, new_layout_root)
+    # Do relocations on text that refers to the install tree.  When an old
+    # prefix appears more than once, the first mapping takes precedence.
+    prefix_to_prefix = {}
+    for orig_dir, new_dir in itertools.chain(
+            [(orig_install_prefix, new_install_prefix)],
+            new_prefixes.items(),
+            [(orig_layout_root, new_layout_root),
+             # Point old packages at the new sbang location. Packages that
+             # already use the new sbang location are handled by the
+             # replacement of the layout root.
+             (orig_sbang, new_sbang)]):
+        prefix_to_prefix.setdefault(orig_dir, new_dir)
 
-        # Point old packages at the new sbang location. Packages that
-        # already use the new sbang location will already have been
-        # handled by the prior call to _replace_prefix_text
-        _replace_prefix_text(filename, orig_sbang, new_sbang)
+    for filename in files:
+        _replace_prefix_text(filename, prefix_to_prefix)
 
 
 def relocate_text_bin(
@@ -857,11 +945,16 @@ def relocate_text_bin(
     if not new_prefix_is_shorter and len(binaries) > 0:
         raise BinaryTextReplaceError(orig_install_prefix, new_install_prefix)
 
+    # Dependency prefixes that would grow cannot be replaced, and the install
+    # prefix takes precedence over any other mapping for the same prefix
+    prefix_to_prefix = dict(
+        (old_dep_prefix, new_dep_prefix)
+        for old_dep_prefix, new_dep_prefix in new_prefixes.items()
+        if len(new_dep_prefix) <= len(old_dep_prefix))
+    prefix_to_prefix[orig_install_prefix] = new_install_prefix
+
     for binary in binaries:
-        for old_dep_prefix, new_dep_prefix in new_prefixes.items():
-            if len(new_dep_prefix) <= len(old_dep_prefix):
-                _replace_prefix_bin(binary, old_dep_prefix, new_dep_prefix)
-        _replace_prefix_bin(binary, orig_install_prefix, new_install_prefix)
+        _replace_prefix_bin(binary, prefix_to_prefix)
 
     # Note: Replacement of spack directory should not be done. This causes
     # an incorrect replacement path in the case where the install root is a
@@ -10,6 +10,7 @@
 import functools
 import inspect
 import itertools
+import multiprocessing
 import os
 import re
 import shutil
@@ -232,16 +233,83 @@ def update_package(self, pkg_name):
 
         """
         package = path.get(pkg_name)
+        self.update_tags(package.name, getattr(package, 'tags', []))
 
+    def update_tags(self, pkg_name, tags):
+        """Replaces the tags of a package in the tag index.
+
+        Args:
+            pkg_name (str): name of the package, without namespace
+            tags (list): tags of the package
+        """
         # Remove the package from the list of packages, if present
         for pkg_list in self._tag_dict.values():
             if pkg_name in pkg_list:
                 pkg_list.remove(pkg_name)
 
         # Add it again under the appropriate tags
-        for tag in getattr(package, 'tags', []):
+        for tag in tags:
             tag = tag.lower()
-            self._tag_dict[tag].append(package.name)
+            self._tag_dict[tag].append(pkg_name)
+
+
+class MetadataIndex(Mapping):
+    """Maps package names to plain metadata read from their directives.
+
+    The metadata is what read-only commands need to know about packages
+    (description, versions, dependencies, provided virtuals), so that it
+    can be looked up without importing every ``package.py`` file.
+    """
+
+    def __init__(self):
+        self._metadata = {}
+
+    def to_json(self, stream):
+        sjson.dump({'metadata': self._metadata}, stream)
+
+    @staticmethod
+    def from_json(stream):
+        d = sjson.load(stream)
+
+        r = MetadataIndex()
+        r._metadata.update(d['metadata'])
+        return r
+
+    def __getitem__(self, item):
+        return self._metadata[item]
+
+    def __iter__(self):
+        return iter(self._metadata)
+
+    def __len__(self):
+        return len(self._metadata)
+
+    def update_package(self, pkg_name, metadata):
+        """Replaces the metadata of a package in the index.
+
+        Args:
+            pkg_name (str): name of the package, without namespace
+            metadata (dict): metadata of the package, as returned by
+                ``package_metadata()``
+        """
+        self._metadata[pkg_name] = metadata
+
+    @staticmethod
+    def package_metadata(pkg_cls):
+        """Metadata of a package class, as JSON-serializable data."""
+        dependencies = {}
+        for name, conditions in pkg_cls.dependencies.items():
+            deptypes = set()
+            for dependency in conditions.values():
+                deptypes.update(dependency.type)
+            dependencies[name] = sorted(deptypes)
+
+        return {
+            'description': pkg_cls.__doc__,
+            'versions': [str(v) for v in sorted(pkg_cls.versions)],
+            'dependencies': dependencies,
+            'provided': sorted(set(s.name for s in pkg_cls.provided)),
+        }
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -275,9 +343,24 @@ def needs_update(self, pkg):
     def read(self, stream):
         """Read this index from a provided file object."""
 
-    @abc.abstractmethod
     def update(self, pkg_fullname):
         """Update the index in memory with information about a package."""
+        self.merge(pkg_fullname, self.fragment(pkg_fullname))
+
+    @staticmethod
+    @abc.abstractmethod
+    def fragment(pkg_fullname):
+        """Compute the information about a package that goes in the index.
+
+        Fragments are computed by worker processes when many packages need
+        to be indexed (see ``RepoIndex``), so they must be picklable, and
+        they can't depend on the current state of the index.
+        """
+
+    @abc.abstractmethod
+    def merge(self, pkg_fullname, fragment):
+        """Replace the information about a package in the index in memory
+        with a fragment computed by ``fragment()``."""
 
     @abc.abstractmethod
     def write(self, stream):
@@ -292,8 +375,36 @@ def _create(self):
     def read(self, stream):
         self.index = TagIndex.from_json(stream)
 
-    def update(self, pkg_fullname):
-        self.index.update_package(pkg_fullname)
+    @staticmethod
+    def fragment(pkg_fullname):
+        pkg_cls = path.get_pkg_class(pkg_fullname)
+        return pkg_cls.name, list(getattr(pkg_cls, 'tags', []))
+
+    def merge(self, pkg_fullname, fragment):
+        self.index.update_tags(*fragment)
+
+    def write(self, stream):
+        self.index.to_json(stream)
+
+
+class MetadataIndexer(Indexer):
+    """Lifecycle methods for a MetadataIndex on a Repo."""
+    def _create(self):
+        return MetadataIndex()
+
+    def read(self, stream):
+        self.index = MetadataIndex.from_json(stream)
+
+    @staticmethod
+    def fragment(pkg_fullname):
+        # The class name of packages that derive from other packages can
+        # be inherited, so the name comes from the namespaced name
+        pkg_cls = path.get_pkg_class(pkg_fullname)
+        pkg_name = pkg_fullname.rpartition('.')[2]
+        return pkg_name, MetadataIndex.package_metadata(pkg_cls)
+
+    def merge(self, pkg_fullname, fragment):
+        self.index.update_package(*fragment)
 
     def write(self, stream):
         self.index.to_json(stream)
@@ -307,9 +418,19 @@ def _create(self):
     def read(self, stream):
         self.index = spack.provider_index.ProviderIndex.from_json(stream)
 
-    def update(self, pkg_fullname):
+    @staticmethod
+    def fragment(pkg_fullname):
+        # Specs don't pickle, so the fragment is the JSON of an index of
+        # the package alone
+        index = spack.provider_index.ProviderIndex([pkg_fullname])
+        stream = six.StringIO()
+        index.to_json(stream)
+        return stream.getvalue()
+
+    def merge(self, pkg_fullname, fragment):
         self.index.remove_provider(pkg_fullname)
-        self.index.update(pkg_fullname)
+        self.index.merge(
+            spack.provider_index.ProviderIndex.from_json(fragment))
 
     def write(self, stream):
         self.index.to_json(stream)
@@ -333,8 +454,34 @@ def read(self, stream):
     def write(self, stream):
         self.index.to_json(stream)
 
-    def update(self, pkg_fullname):
-        self.index.update_package(pkg_fullname)
+    @staticmethod
+    def fragment(pkg_fullname):
+        return spack.patch.PatchCache._index_patches(get(pkg_fullname))
+
+    def merge(self, pkg_fullname, fragment):
+        self.index.update_package(pkg_fullname, fragment)
+
+
+#: Minimum number of packages to update for indexes to be computed by
+#: worker processes
+_parallel_index_threshold = 32
+
+
+def _package_fragments(indexer_types, pkg_fullnames):
+    """Compute the index fragments of packages in a worker process.
+
+    Returns:
+        (list): for each package, the list of its fragments for each
+            type of indexer, or None if the package failed to load.
+    """
+    results = []
+    for pkg_fullname in pkg_fullnames:
+        try:
+            results.append([t.fragment(pkg_fullname) for t in indexer_types])
+        except Exception:
+            # The error is reported when the package is indexed again
+            results.append(None)
+    return results
 
 
 class RepoIndex(object):
@@ -392,25 +539,92 @@ def _build_all_indexes(self):
         rather only pay that cost once rather than on several
         invocations.
 
+        When many packages need an update, they are loaded by a pool of
+        worker processes, which return the fragments of all the indexes
+        for their packages.
+
         """
-        for name, indexer in self.indexers.items():
-            self.indexes[name] = self._build_index(name, indexer)
+        needs_update = dict(
+            (name, self._needs_update(name)) for name in self.indexers)
+        stale = sorted(set(itertools.chain(*needs_update.values())))
+        fragments = self._index_fragments(stale)
 
-    def _build_index(self, name, indexer):
-        """Determine which packages need an update, and update indexes."""
+        for name, indexer in self.indexers.items():
+            self.indexes[name] = self._build_index(
+                name, indexer, needs_update[name], fragments.get(name, {}))
 
-        # Filename of the provider index cache (we assume they're all json)
-        cache_filename = '{0}/{1}-index.json'.format(name, self.namespace)
+    def _cache_filename(self, name):
+        """Filename of the cache of an index (we assume they're all json)"""
+        return '{0}/{1}-index.json'.format(name, self.namespace)
 
-        # Compute which packages needs to be updated in the cache
+    def _needs_update(self, name):
+        """Compute which packages need to be updated in an index."""
         misc_cache = spack.caches.misc_cache
-        index_mtime = misc_cache.mtime(cache_filename)
+        index_mtime = misc_cache.mtime(self._cache_filename(name))
 
-        needs_update = [
+        return [
             x for x, sinfo in self.checker.items()
             if sinfo.st_mtime > index_mtime
         ]
 
+    def _index_fragments(self, pkg_names):
+        """Compute the index fragments of packages in worker processes.
+
+        Returns:
+            (dict): fragments by package name, by index name.  Fragments
+                that couldn't be computed (e.g., because there are too few
+                packages to make worker processes worthwhile, because the
+                import lock is held, or because a package failed to load)
+                are left out, to be computed by ``Indexer.update()``.
+        """
+        jobs = min(spack.config.get('config:build_jobs', 16),
+                   multiprocessing.cpu_count())
+        if jobs < 2 or len(pkg_names) < _parallel_index_threshold:
+            return {}
+
+        # Workers forked while the import lock is held (e.g., when the index
+        # is first needed while a package module is being loaded) would
+        # deadlock as soon as they import a package.
+        if simp.import_lock_held():
+            tty.debug('Indexing packages serially: the import lock is held')
+            return {}
+
+        names = list(self.indexers)
+        indexer_types = [type(self.indexers[name]) for name in names]
+        fullnames = ['%s.%s' % (self.namespace, pkg_name)
+                     for pkg_name in pkg_names]
+        nchunks = min(len(fullnames), jobs * 4)
+        chunks = [fullnames[i::nchunks] for i in range(nchunks)]
+
+        pool = llnl.util.lang.fork_context.Pool(processes=jobs)
+        try:
+            results = pool.map(
+                functools.partial(_package_fragments, indexer_types), chunks)
+        finally:
+            pool.terminate()
+            pool.join()
+
+        fragments = dict((name, {}) for name in names)
+        for chunk, chunk_fragments in zip(chunks, results):
+            for pkg_fullname, pkg_fragments in zip(chunk, chunk_fragments):
+                if pkg_fragments is None:
+                    continue
+                for name, fragment in zip(names, pkg_fragments):
+                    fragments[name][pkg_fullname] = fragment
+        return fragments
+
+    def _build_index(self, name, indexer, needs_update, fragments):
+        """Update an index with the packages that need an update.
+
+        Arguments:
+            name (str): name of the index
+            indexer (Indexer): indexer of the index
+            needs_update (list): names of the packages to update
+            fragments (dict): fragments of the index computed in advance,
+                by namespaced package name
+        """
+        cache_filename = self._cache_filename(name)
+        misc_cache = spack.caches.misc_cache
         index_existed = misc_cache.init_entry(cache_filename)
         if index_existed and not needs_update:
             # If the index exists and doesn't need an update, read it
@@ -424,7 +638,11 @@ def _build_index(self, name, indexer):
 
                 for pkg_name in needs_update:
                     namespaced_name = '%s.%s' % (self.namespace, pkg_name)
-                    indexer.update(namespaced_name)
+                    if namespaced_name in fragments:
+                        indexer.merge(
+                            namespaced_name, fragments[namespaced_name])
+                    else:
+                        indexer.update(namespaced_name)
 
                 indexer.write(new)
 
@@ -679,6 +897,10 @@ def is_virtual(self, pkg_name):
         """True if the package with this name is virtual, False otherwise."""
         return pkg_name in self.provider_index
 
+    def package_metadata(self, pkg_name):
+        """Metadata of a package, without importing it (see MetadataIndex)."""
+        return self.repo_for_pkg(pkg_name).package_metadata(pkg_name)
+
     def __contains__(self, pkg_name):
         return self.exists(pkg_name)
 
@@ -941,6 +1163,7 @@ def index(self):
             self._repo_index.add_indexer('providers', ProviderIndexer())
             self._repo_index.add_indexer('tags', TagIndexer())
             self._repo_index.add_indexer('patches', PatchIndexer())
+            self._repo_index.add_indexer('metadata', MetadataIndexer())
         return self._repo_index
 
     @property
@@ -958,6 +1181,21 @@ def patch_index(self):
         """Index of patches and packages they're defined on."""
         return self.index['patches']
 
+    @property
+    def metadata_index(self):
+        """Index of the metadata of packages in this repo."""
+        return self.index['metadata']
+
+    def package_metadata(self, pkg_name):
+        """Metadata of a package, without importing it (see MetadataIndex).
+
+        Raises UnknownPackageError if the package is not in this repo.
+        """
+        name = pkg_name.rpartition('.')[2]
+        if not self.exists(name):
+            raise UnknownPackageError(pkg_name, self)
+        return self.metadata_index[name]
+
     @autospec
     def providers_for(self, vpkg_spec):
         providers = self.provider_index.providers_for(vpkg_spec)
@@ -1203,6 +1441,7 @@ def set_path(repo):
     """
     global path
     path = repo
+    spack.spec.satisfies_cache.clear()
 
     # make the new repo_path an importer if needed
     append = isinstance(repo, (Repo, RepoPath))
@@ -1226,6 +1465,7 @@ def swap(repo_path):
     if remove_from_meta:
         sys.meta_path.remove(repo_path)
     path = saved
+    spack.spec.satisfies_cache.clear()
 
 
 @contextlib.contextmanager
@@ -1236,8 +1476,10 @@ def additional_repository(repository):
         repository: repository to be added
     """
     path.put_first(repository)
+    spack.spec.satisfies_cache.clear()
     yield
     path.remove(repository)
+    spack.spec.satisfies_cache.clear()
 
 
 class RepoError(spack.error.SpackError):
@@ -12,7 +12,6 @@
 
 import llnl.util.lang
 import llnl.util.tty
-import spack.spec
 
 
 # jsonschema is imported lazily as it is heavy to import
@@ -62,6 +61,7 @@ def _set_pp_defaults(validator, properties, instance, schema):
     def _validate_spec(validator, is_spec, instance, schema):
         """Check if the attributes on instance are valid specs."""
         import jsonschema
+        import spack.spec
         if not validator.is_type(instance, "object"):
             return
 
@@ -24,6 +24,7 @@
             'properties': {
                 'relative_prefix': {'type': 'string'},
                 'relative_rpaths': {'type': 'boolean'},
+                'compression': {'type': 'string'},
             },
         },
         'spec': {
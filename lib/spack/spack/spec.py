@@ -96,7 +96,7 @@
 import spack.paths
 import spack.architecture
 import spack.compiler
-import spack.compilers as compilers
+import spack.compilers
 import spack.dependency as dp
 import spack.error
 import spack.hash_types as ht
@@ -679,8 +679,7 @@ def valid_compiler_flags():
 
     def copy(self):
         clone = FlagMap(None)
-        for name, value in self.items():
-            clone[name] = value
+        clone.dict.update(self.dict)
         return clone
 
     def _cmp_key(self):
@@ -982,6 +981,19 @@ def __init__(self, spec_like=None,
             self._dup(spec_like)
             return
 
+        # Copy strings that were parsed before from the parse cache.
+        # Strings with '/' can refer to installed hashes or to files,
+        # so they are always parsed again.
+        cache_parse = (
+            isinstance(spec_like, six.string_types) and '/' not in spec_like
+            and not (normal or concrete or external_path or
+                     external_modules or full_hash))
+        if cache_parse:
+            template = _parsed_specs.get(spec_like)
+            if template is not None:
+                self._dup(template)
+                return
+
         # init an empty spec that matches anything.
         self.name = None
         self.versions = vn.VersionList(':')
@@ -1030,6 +1042,13 @@ def __init__(self, spec_like=None,
             if len(spec_list) < 1:
                 raise ValueError("String contains no specs: " + spec_like)
 
+            # Architectures can depend on the host platform, and copies
+            # can't tell anonymous dependencies apart, so these specs
+            # aren't cached.
+            if cache_parse and self.architecture is None and all(
+                    s.name for s in self.traverse(root=False)):
+                _parsed_specs[spec_like] = self.copy()
+
         elif spec_like is not None:
             raise TypeError("Can't make spec out of %s" % type(spec_like))
 
@@ -1410,7 +1429,7 @@ def _spec_hash(self, hash):
         # TODO: curently we strip build dependencies by default.  Rethink
         # this when we move to using package hashing on all specs.
         node_dict = self.to_node_dict(hash=hash)
-        yaml_text = syaml.dump(node_dict, default_flow_style=True)
+        yaml_text = syaml.dump_flow_style(node_dict)
         sha = hashlib.sha1(yaml_text.encode('utf-8'))
         b32_hash = base64.b32encode(sha.digest()).lower()
 
@@ -2420,6 +2439,8 @@ def _mark_concrete(self, value=True):
         for s in self.traverse():
             if (not value) and s.concrete and s.package.installed:
                 continue
+            if (not value) and s._concrete:
+                s._unshare()
             s._normal = value
             s._concrete = value
 
@@ -2790,7 +2811,7 @@ def validate_or_raise(self):
 
             # validate compiler in addition to the package name.
             if spec.compiler:
-                if not compilers.supported(spec.compiler):
+                if not spack.compilers.supported(spec.compiler):
                     raise UnsupportedCompilerError(spec.compiler.name)
 
             # Ensure correctness of variants (if the spec is not virtual)
@@ -2972,20 +2993,7 @@ def satisfies(self, other, deps=True, strict=False, strict_deps=False):
 
         # A concrete provider can satisfy a virtual dependency.
         if not self.virtual and other.virtual:
-            try:
-                pkg = spack.repo.get(self.fullname)
-            except spack.repo.UnknownEntityError:
-                # If we can't get package info on this spec, don't treat
-                # it as a provider of this vdep.
-                return False
-
-            if pkg.provides(other.name):
-                for provided, when_specs in pkg.provided.items():
-                    if any(self.satisfies(when_spec, deps=False, strict=strict)
-                           for when_spec in when_specs):
-                        if provided.satisfies(other):
-                            return True
-            return False
+            return self._memoized_check(self._provides, other, strict)
 
         # Otherwise, first thing we care about is whether the name matches
         if self.name != other.name and self.name and other.name:
@@ -3038,6 +3046,54 @@ def satisfies(self, other, deps=True, strict=False, strict_deps=False):
         else:
             return True
 
+    def _provides(self, other, strict=False):
+        """True if this spec is a provider that satisfies the virtual
+        spec ``other``.
+        """
+        try:
+            pkg = spack.repo.get(self.fullname)
+        except spack.repo.UnknownEntityError:
+            # If we can't get package info on this spec, don't treat
+            # it as a provider of this vdep.
+            return False
+
+        if pkg.provides(other.name):
+            for provided, when_specs in pkg.provided.items():
+                if any(self.satisfies(when_spec, deps=False, strict=strict)
+                       for when_spec in when_specs):
+                    if provided.satisfies(other):
+                        return True
+        return False
+
+    def _memoized_check(self, check, other, strict):
+        """Return ``check(other, strict)``, using ``satisfies_cache`` if
+        this spec is concrete.
+
+        Concrete specs never change, so the result of checking one against
+        a constraint only depends on the spec's build hash (which, unlike
+        the DAG hash, covers build dependencies) and on the constraint.
+        """
+        if not self._concrete:
+            return check(other, strict)
+
+        key = (check.__name__, self.build_hash(), other._constraint_key(),
+               strict)
+        result = satisfies_cache.get(key)
+        if result is None:
+            result = check(other, strict)
+            satisfies_cache[key] = result
+        return result
+
+    def _constraint_key(self):
+        """Canonical, hashable form of the constraints ``satisfies()``
+        checks on this spec and its dependencies.
+        """
+        return tuple(
+            (s.name, s.namespace, str(s.versions), str(s.compiler),
+             str(s.variants), str(s.compiler_flags), str(s.architecture),
+             s.dag_hash() if s._concrete else None)
+            for s in self.traverse())
+
     def satisfies_dependencies(self, other, strict=False):
         """
         This checks constraints on common dependencies against each other.
@@ -3048,6 +3104,10 @@ def satisfies_dependencies(self, other, strict=False):
         if not other._dependencies:
             return True
 
+        return self._memoized_check(
+            self._satisfies_dependencies, other, strict)
+
+    def _satisfies_dependencies(self, other, strict=False):
         if strict:
             # if we have no dependencies, we can't satisfy any constraints.
             if not self._dependencies:
@@ -3169,28 +3229,28 @@ def _dup(self, other, deps=True, cleardeps=True, caches=None):
 
         self._package = None
 
-        # Local node attributes get copied first.
+        # Local node attributes get copied first.  Concrete specs are
+        # never modified in place (constrain() refuses to and concretize()
+        # skips them), so a copy of a concrete node shares its versions,
+        # architecture, compiler and variant objects with the original.
+        # _unshare() gives the copy its own objects if it stops being
+        # concrete.
         self.name = other.name
-        self.versions = other.versions.copy()
-        self.architecture = other.architecture.copy() if other.architecture \
-            else None
-        self.compiler = other.compiler.copy() if other.compiler else None
+        if other._concrete:
+            self.versions = other.versions
+            self.architecture = other.architecture
+            self.compiler = other.compiler
+        else:
+            self.versions = other.versions.copy()
+            self.architecture = other.architecture.copy() \
+                if other.architecture else None
+            self.compiler = other.compiler.copy() if other.compiler else None
         if cleardeps:
             self._dependents = DependencyMap()
             self._dependencies = DependencyMap()
         self.compiler_flags = other.compiler_flags.copy()
         self.compiler_flags.spec = self
-        self.variants = other.variants.copy()
-
-        # FIXME: we manage _patches_in_order_of_appearance specially here
-        # to keep it from leaking out of spec.py, but we should figure
-        # out how to handle it more elegantly in the Variant classes.
-        for k, v in other.variants.items():
-            patches = getattr(v, '_patches_in_order_of_appearance', None)
-            if patches:
-                self.variants[k]._patches_in_order_of_appearance = patches
-
-        self.variants.spec = self
+        self._copy_variants(other.variants, deep=not other._concrete)
         self.external_path = other.external_path
         self.external_modules = other.external_modules
         self.extra_attributes = other.extra_attributes
@@ -3229,6 +3289,39 @@ def _dup(self, other, deps=True, cleardeps=True, caches=None):
 
         return changed
 
+    def _copy_variants(self, variants, deep=True):
+        """Set this spec's variants to a copy of ``variants``.
+
+        Args:
+            variants (VariantMap): variants to be copied
+            deep (bool): if False, the variant objects are shared with
+                ``variants`` instead of being copied
+        """
+        self.variants = variants.copy(deep=deep)
+        self.variants.spec = self
+        if not deep:
+            return
+
+        # FIXME: we manage _patches_in_order_of_appearance specially here
+        # to keep it from leaking out of spec.py, but we should figure
+        # out how to handle it more elegantly in the Variant classes.
+        for k, v in variants.items():
+            patches = getattr(v, '_patches_in_order_of_appearance', None)
+            if patches:
+                self.variants[k]._patches_in_order_of_appearance = patches
+
+    def _unshare(self):
+        """Replace any attributes this node may share with the concrete
+        spec it was copied from with private copies, so that they can be
+        modified safely.
+        """
+        self.versions = self.versions.copy()
+        if self.architecture:
+            self.architecture = self.architecture.copy()
+        if self.compiler:
+            self.compiler = self.compiler.copy()
+        self._copy_variants(self.variants)
+
     def _dup_deps(self, other, deptypes, caches):
         new_specs = {self.name: self}
         for dspec in other.traverse_edges(cover='edges',
@@ -4052,6 +4145,15 @@ def __missing__(self, key):
         return value
 
 
+#: Specs parsed from strings, by string. Parsing a string that is in
+#: the cache costs a copy of the cached spec.
+_parsed_specs = lang.LRUCache(4096)
+
+#: Results of checking concrete specs against abstract constraints (see
+#: ``Spec._memoized_check``).  ``spack.repo`` clears it when the package
+#: repository changes, since providers of virtual packages may change.
+satisfies_cache = lang.LRUCache(16384)
+
 #: These are possible token types in the spec grammar.
 HASH, DEP, AT, COLON, COMMA, ON, OFF, PCT, EQ, ID, VAL, FILE = range(12)
 
@@ -4059,39 +4161,82 @@ def __missing__(self, key):
 spec_id_re = r'\w[\w.-]*'
 
 
+#: Lexicon of the spec grammar, as (regex, token type) pairs.  Earlier
+#: entries win over later ones; whitespace produces no token.
+spec_lexicon = [
+    (r'\^', DEP),
+    (r'\@', AT),
+    (r'\:', COLON),
+    (r'\,', COMMA),
+    (r'\+', ON),
+    (r'\-', OFF),
+    (r'\~', OFF),
+    (r'\%', PCT),
+    (r'\=', EQ),
+
+    # Filenames match before identifiers, so no initial filename
+    # component is parsed as a spec (e.g., in subdir/spec.yaml)
+    (r'[/\w.-]*/[/\w/-]+\.yaml[^\b]*', FILE),
+
+    # Hash match after filename. No valid filename can be a hash
+    # (files end w/.yaml), but a hash can match a filename prefix.
+    (r'/', HASH),
+
+    # Identifiers match after filenames and hashes.
+    (spec_id_re, ID),
+
+    (r'\s+', None)]
+
+
 class SpecLexer(spack.parse.Lexer):
 
-    """Parses tokens that make up spack specs."""
+    """Parses tokens that make up spack specs.
+
+    The lexicon is compiled into a single regular expression that is
+    matched once per token, which is much cheaper than the generic
+    ``re.Scanner`` of ``spack.parse.Lexer``.  After an ``=``, the rest
+    of the word is a single value token.
+    """
+
+    #: one group per lexicon entry; the patterns themselves have no groups
+    token_re = re.compile('|'.join('(%s)' % r for r, _ in spec_lexicon))
+
+    #: token type of each group in ``token_re``, by group index
+    token_types = [None] + [t for _, t in spec_lexicon]
+
+    #: value following an ``=``, possibly after some whitespace
+    value_re = re.compile(r'\s*(\S.*)?')
 
     def __init__(self):
-        super(SpecLexer, self).__init__([
-            (r'\^', lambda scanner, val: self.token(DEP,   val)),
-            (r'\@', lambda scanner, val: self.token(AT,    val)),
-            (r'\:', lambda scanner, val: self.token(COLON, val)),
-            (r'\,', lambda scanner, val: self.token(COMMA, val)),
-            (r'\+', lambda scanner, val: self.token(ON,    val)),
-            (r'\-', lambda scanner, val: self.token(OFF,   val)),
-            (r'\~', lambda scanner, val: self.token(OFF,   val)),
-            (r'\%', lambda scanner, val: self.token(PCT,   val)),
-            (r'\=', lambda scanner, val: self.token(EQ,    val)),
-
-            # Filenames match before identifiers, so no initial filename
-            # component is parsed as a spec (e.g., in subdir/spec.yaml)
-            (r'[/\w.-]*/[/\w/-]+\.yaml[^\b]*',
-             lambda scanner, v: self.token(FILE, v)),
-
-            # Hash match after filename. No valid filename can be a hash
-            # (files end w/.yaml), but a hash can match a filename prefix.
-            (r'/', lambda scanner, val: self.token(HASH, val)),
-
-            # Identifiers match after filenames and hashes.
-            (spec_id_re, lambda scanner, val: self.token(ID, val)),
-
-            (r'\s+', lambda scanner, val: None)],
-            [EQ],
-            [(r'[\S].*', lambda scanner, val: self.token(VAL,    val)),
-             (r'\s+', lambda scanner, val: None)],
-            [VAL])
+        self.mode = 0
+
+    def lex_word(self, word):
+        tokens = []
+        pos, end = 0, len(word)
+        while pos < end:
+            if self.mode == 1:
+                # the rest of the word is the value of a key=value pair
+                match = self.value_re.match(word, pos)
+                if match.group(1) is not None:
+                    tokens.append(spack.parse.Token(
+                        VAL, match.group(1), match.start(1), match.end(1)))
+                    self.mode = 0
+                pos = match.end()
+                continue
+
+            match = self.token_re.match(word, pos)
+            if not match:
+                raise spack.parse.LexError("Invalid character", word, pos)
+
+            token_type = self.token_types[match.lastindex]
+            if token_type is not None:
+                tokens.append(spack.parse.Token(
+                    token_type, match.group(), match.start(), match.end()))
+                if token_type == EQ:
+                    self.mode = 1
+            pos = match.end()
+
+        return tokens
 
 
 # Lexer is always the same for every parser.
@@ -33,7 +33,7 @@
 import spack.util.path as sup
 import spack.util.url as url_util
 
-from spack.util.crypto import prefix_bits, bit_length
+from spack.util.crypto import prefix_bits, bit_length, Checker
 
 
 # The well-known stage source subdirectory name.
@@ -571,7 +571,8 @@ def cache_mirror(self, mirror, stats):
         absolute_storage_path = os.path.join(
             mirror.root, self.mirror_paths.storage_path)
 
-        if os.path.exists(absolute_storage_path):
+        if os.path.exists(absolute_storage_path) and \
+           self._valid_mirror_archive(absolute_storage_path):
             stats.already_existed(absolute_storage_path)
         else:
             self.fetch()
@@ -582,6 +583,21 @@ def cache_mirror(self, mirror, stats):
 
         mirror.symlink(self.mirror_paths)
 
+    def _valid_mirror_archive(self, path):
+        """Whether an archive already in a mirror has the right checksum."""
+        digest = getattr(self.default_fetcher, 'digest', None)
+        if not digest or not spack.config.get('config:checksum'):
+            return True
+
+        checker = Checker(digest)
+        if checker.check(path):
+            return True
+
+        tty.warn("Replacing {0} in the mirror".format(path),
+                 "Expected {0} checksum {1} but got {2}".format(
+                     checker.hash_name, digest, checker.sum))
+        return False
+
     def expand_archive(self):
         """Changes to the stage directory and attempt to expand the downloaded
         archive.  Fail if the stage is not set up or if the archive is not yet
@@ -7,9 +7,14 @@
 
 import os
 import os.path
+import tarfile
+from contextlib import closing
 
 import spack.spec
 import spack.binary_distribution
+import spack.relocate
+import spack.util.spack_json as sjson
+import spack.util.spack_yaml as syaml
 
 install = spack.main.SpackCommand('install')
 
@@ -39,3 +44,253 @@ def test_build_tarball_overwrite(
 
         with pytest.raises(spack.binary_distribution.NoOverwriteException):
             spack.binary_distribution.build_tarball(spec, '.', unsigned=True)
+
+
+@pytest.mark.parametrize('compression', [
+    'gzip',
+    pytest.param('zstd', marks=pytest.mark.requires_executables('zstd')),
+])
+def test_build_tarball_compression(
+        compression, install_mockery, mock_fetch, tmpdir):
+    """Round-trip a buildcache tarball written with each compression."""
+    with tmpdir.as_cwd():
+        spec = spack.spec.Spec('trivial-install-test-package').concretized()
+        install(str(spec))
+        spack.binary_distribution.build_tarball(
+            spec, '.', unsigned=True, compression=compression)
+
+        spackfile_path = os.path.join(
+            spack.binary_distribution.build_cache_prefix('.'),
+            spack.binary_distribution.tarball_path_name(spec, '.spack'))
+        specfile_path = os.path.join(
+            spack.binary_distribution.build_cache_prefix('.'),
+            spack.binary_distribution.tarball_name(spec, '.spec.yaml'))
+        with open(specfile_path) as f:
+            spec_dict = syaml.load(f)
+        assert spec_dict['buildinfo']['compression'] == compression
+
+        spack.binary_distribution.extract_tarball(
+            spec, spackfile_path, unsigned=True, force=True)
+        assert os.path.exists(os.path.join(spec.prefix, 'dummy_file'))
+
+
+def test_build_tarball_unknown_compression(
+        install_mockery, mock_fetch, tmpdir):
+    with tmpdir.as_cwd():
+        spec = spack.spec.Spec('trivial-install-test-package').concretized()
+        install(str(spec))
+        with pytest.raises(
+                spack.binary_distribution.UnknownCompressionException):
+            spack.binary_distribution.build_tarball(
+                spec, '.', unsigned=True, compression='lzma')
+
+
+def test_write_prefix_tarball(tmpdir):
+    """Stream a prefix into a .spack archive, with files taken from a
+    work directory in place of those of the prefix."""
+    prefix = tmpdir.ensure('prefix', dir=True)
+    prefix.ensure('bin', 'tool').write('original')
+    prefix.ensure('lib', 'libfoo.so').write('library')
+    os.link(str(prefix.join('lib', 'libfoo.so')),
+            str(prefix.join('lib', 'libfoo.so.1')))
+    os.symlink('/abs/target', str(prefix.join('link')))
+    workdir = tmpdir.ensure('workdir', dir=True)
+    workdir.ensure('bin', 'tool').write('relative')
+    workdir.ensure('.spack', 'binary_distribution').write('buildinfo')
+    os.symlink('rel/target', str(workdir.join('link')))
+
+    spackfile = str(tmpdir.join('pkg.spack'))
+    checksum = spack.binary_distribution._write_prefix_tarball(
+        spackfile, 'pkg.tar.gz', str(prefix), str(workdir))
+    tmpdir.join('pkg.spec.yaml').write('spec')
+    with closing(tarfile.open(spackfile, 'a')) as tar:
+        tar.add(str(tmpdir.join('pkg.spec.yaml')), arcname='pkg.spec.yaml')
+
+    extracted = tmpdir.ensure('extracted', dir=True)
+    with closing(tarfile.open(spackfile)) as tar:
+        assert tar.getnames() == ['pkg.tar.gz', 'pkg.spec.yaml']
+        tar.extractall(str(extracted))
+    tarball = str(extracted.join('pkg.tar.gz'))
+    assert spack.binary_distribution.checksum_tarball(tarball) == checksum
+
+    with closing(tarfile.open(tarball)) as tar:
+        tar.extractall(str(extracted))
+    root = extracted.join('prefix')
+    assert root.join('bin', 'tool').read() == 'relative'
+    assert root.join('.spack', 'binary_distribution').read() == 'buildinfo'
+    assert root.join('lib', 'libfoo.so.1').read() == 'library'
+    assert (os.stat(str(root.join('lib', 'libfoo.so'))).st_ino ==
+            os.stat(str(root.join('lib', 'libfoo.so.1'))).st_ino)
+    assert os.readlink(str(root.join('link'))) == 'rel/target'
+
+
+def test_map_relocation_in_worker_processes(tmpdir, monkeypatch):
+    """Relocate binaries in a pool of worker processes."""
+    monkeypatch.setattr(spack.binary_distribution, '_relocation_jobs',
+                        lambda: 2)
+
+    files = []
+    for i in range(5):
+        path = tmpdir.join('binary{0}'.format(i))
+        path.write_binary(b'/old/prefix/bin/tool\x00')
+        files.append(str(path))
+
+    results = spack.binary_distribution._map_relocation(
+        spack.relocate.relocate_text_bin, files,
+        '/old/prefix', '/new', '/spack', '/spack', {})
+
+    assert len(results) == 5
+    for path in files:
+        with open(path, 'rb') as f:
+            assert f.read() == b'////////new/bin/tool\x00'
+
+
+def _relocate_writable(files):
+    for path in files:
+        with open(path, 'r+') as f:
+            f.write('relocated')
+
+
+def test_map_relocation_reports_os_errors(tmpdir, monkeypatch):
+    """All chunks are relocated before an OSError is reported."""
+    monkeypatch.setattr(spack.binary_distribution, '_relocation_jobs',
+                        lambda: 2)
+
+    # one file per chunk
+    files = []
+    for i in range(7):
+        path = tmpdir.join('file{0}'.format(i))
+        path.write('original')
+        files.append(str(path))
+    missing = str(tmpdir.join('missing'))
+
+    with pytest.raises(IOError):
+        spack.binary_distribution._map_relocation(
+            _relocate_writable, [missing] + files)
+
+    for path in files:
+        with open(path) as f:
+            assert f.read() == 'relocated'
+
+
+def test_map_relocation_keeps_hardlinks_together(tmpdir, monkeypatch):
+    """Hardlinks to one file are relocated by a single worker."""
+    monkeypatch.setattr(spack.binary_distribution, '_relocation_jobs',
+                        lambda: 2)
+
+    prefix = tmpdir.ensure('prefix', dir=True)
+    binaries, texts = [], []
+    for i in range(4):
+        binary = prefix.join('perl5.{0}'.format(i))
+        binary.write_binary(b'/old/prefix/bin/perl\x00')
+        text = prefix.join('script{0}'.format(i))
+        text.write('#!/old/prefix/bin/perl\n')
+        os.link(str(binary), str(binary) + '-link')
+        os.link(str(text), str(text) + '-link')
+        binaries.extend([str(binary), str(binary) + '-link'])
+        texts.extend([str(text), str(text) + '-link'])
+
+    chunks = spack.binary_distribution._map_relocation(list, binaries)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        for path in chunk:
+            if not path.endswith('-link'):
+                assert path + '-link' in chunk
+
+    spack.binary_distribution._map_relocation(
+        spack.relocate.relocate_text_bin, binaries,
+        '/old/prefix', '/new', '/spack', '/spack', {})
+    spack.binary_distribution._map_relocation(
+        spack.relocate.relocate_text, texts,
+        '/old', '/new', '/old/prefix', '/new', '/spack', '/spack',
+        {'/old/prefix': '/new'})
+
+    for path in binaries:
+        with open(path, 'rb') as f:
+            assert f.read() == b'////////new/bin/perl\x00'
+    for path in texts:
+        with open(path) as f:
+            assert f.read() == '#!/new/bin/perl\n'
+
+
+def test_map_relocation_reports_errors(monkeypatch):
+    """Errors raised by the worker processes are reported in the parent."""
+    monkeypatch.setattr(spack.binary_distribution, '_relocation_jobs',
+                        lambda: 2)
+
+    with pytest.raises(spack.relocate.BinaryTextReplaceError,
+                       match='New path longer than old path'):
+        spack.binary_distribution._map_relocation(
+            spack.relocate.relocate_text_bin, ['/a', '/b', '/c'],
+            '/short', '/much/longer', '/spack', '/spack', {})
+
+
+@pytest.mark.db
+def test_generate_package_index_concurrently(database, tmpdir):
+    """Build the index of a build cache from many spec.yaml files."""
+    cache_dir = tmpdir.ensure('build_cache', dir=True)
+    specs = database.query_local()
+    for spec in specs:
+        yaml_path = cache_dir.join('{0}.spec.yaml'.format(spec.dag_hash()))
+        yaml_path.write(spec.to_yaml())
+
+    spack.binary_distribution.generate_package_index(
+        'file://{0}'.format(cache_dir.strpath), concurrency=4)
+
+    with open(cache_dir.join('index.json').strpath) as f:
+        index = sjson.load(f)
+    assert (set(index['database']['installs']) ==
+            set(s.dag_hash() for s in specs))
+    assert cache_dir.join('index.json.hash').check()
+
+
+@pytest.mark.db
+def test_generate_package_index_incrementally(
+        database, tmpdir, monkeypatch):
+    """Update the index of a build cache, fetching only new spec.yaml files.
+    """
+    cache_dir = tmpdir.ensure('build_cache', dir=True)
+    cache_url = 'file://{0}'.format(cache_dir.strpath)
+    specs = database.query_local()
+    yaml_paths = dict(
+        (s.dag_hash(), cache_dir.join(
+            spack.binary_distribution.tarball_name(s, '.spec.yaml')))
+        for s in specs)
+
+    def index_installs():
+        with open(cache_dir.join('index.json').strpath) as f:
+            return sjson.load(f)['database']['installs']
+
+    # Publish all but one root spec and index them, then add it, remove
+    # another root and update the index
+    added, removed = database.query_local(explicit=True)[:2]
+    for s in specs:
+        if s != added:
+            yaml_paths[s.dag_hash()].write(s.to_yaml())
+    spack.binary_distribution.generate_package_index(cache_url)
+    yaml_paths[added.dag_hash()].write(added.to_yaml())
+    yaml_paths[removed.dag_hash()].remove()
+
+    fetched = []
+    read_spec = spack.binary_distribution._read_spec_from_mirror
+
+    def _read_spec(yaml_url):
+        fetched.append(yaml_url)
+        return read_spec(yaml_url)
+
+    monkeypatch.setattr(
+        spack.binary_distribution, '_read_spec_from_mirror', _read_spec)
+    spack.binary_distribution.generate_package_index(
+        cache_url, incremental=True)
+    assert fetched == [
+        '{0}/{1}'.format(cache_url, yaml_paths[added.dag_hash()].basename)]
+    incremental = index_installs()
+
+    # The result is the same as rebuilding the index from scratch
+    spack.binary_distribution.generate_package_index(cache_url)
+    assert len(fetched) == len(specs)
+    assert removed.dag_hash() not in incremental
+    full = index_installs()
+    assert sorted(incremental) == sorted(full)
+    for h in full:
+        assert incremental[h]['spec'] == full[h]['spec']
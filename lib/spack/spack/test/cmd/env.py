@@ -10,7 +10,9 @@
 
 import llnl.util.filesystem as fs
 
+import spack.config
 import spack.hash_types as ht
+import spack.installer
 import spack.modules
 import spack.environment as ev
 
@@ -47,7 +49,8 @@ def check_mpileaks_and_deps_in_view(viewdir):
 def check_viewdir_removal(viewdir):
     """Check that the uninstall/removal worked."""
     assert (not os.path.exists(str(viewdir.join('.spack'))) or
-            os.listdir(str(viewdir.join('.spack'))) == ['projections.yaml'])
+            set(os.listdir(str(viewdir.join('.spack')))) <=
+            set(['projections.yaml', 'manifest.json']))
 
 
 @pytest.fixture()
@@ -149,6 +152,28 @@ def test_env_install_all(install_mockery, mock_fetch):
     assert spec.package.installed
 
 
+def test_env_install_all_links_logs_of_installed_roots(
+        install_mockery, mock_fetch, monkeypatch):
+    install = spack.installer.PackageInstaller.install
+
+    def _install_and_fail(installer, **kwargs):
+        install(installer, **kwargs)
+        raise spack.installer.InstallError('mock failure')
+    monkeypatch.setattr(
+        spack.installer.PackageInstaller, 'install', _install_and_fail)
+
+    e = ev.create('test')
+    e.add('cmake-client')
+    e.concretize()
+    with pytest.raises(spack.installer.InstallError):
+        e.install_all()
+
+    spec = e.specs_by_hash[e.concretized_order[0]]
+    assert spec.package.installed
+    assert os.listdir(e.log_path) == [
+        'cmake-client-{0}.log'.format(spec.dag_hash(7))]
+
+
 def test_env_install_single_spec(install_mockery, mock_fetch):
     env('create', 'test')
     install = SpackCommand('install')
@@ -1181,6 +1206,50 @@ def test_env_updates_view_force_remove(
     check_viewdir_removal(view_dir)
 
 
+def test_env_updates_view_incrementally(
+        tmpdir, mock_stage, mock_fetch, install_mockery, monkeypatch):
+    view_dir = tmpdir.mkdir('view')
+    env('create', '--with-view=%s' % view_dir, 'test')
+    with ev.read('test'):
+        add('mpileaks')
+        add('a')
+        install('--fake')
+
+    check_mpileaks_and_deps_in_view(view_dir)
+    assert os.path.islink(str(view_dir.join('bin', 'a')))
+    with open(str(view_dir.join('.spack', 'manifest.json'))) as f:
+        manifest = sjson.load(f)['specs']
+    assert any(e['name'] == 'a' for e in manifest.values())
+
+    # The view is not rebuilt when a spec is removed
+    def _no_rebuild(*args, **kwargs):
+        raise AssertionError('the view is rebuilt')
+
+    transaction = fs.replace_directory_transaction
+    monkeypatch.setattr(fs, 'replace_directory_transaction', _no_rebuild)
+    with ev.read('test'):
+        remove('a')
+        concretize()
+
+    check_mpileaks_and_deps_in_view(view_dir)
+    assert os.path.islink(str(view_dir.join('bin', 'mpileaks')))
+    assert not os.path.lexists(str(view_dir.join('bin', 'a')))
+    assert not os.path.lexists(str(view_dir.join('lib', 'liba.so')))
+    assert not os.path.exists(str(view_dir.join('.spack', 'a')))
+
+    # Full rebuilds stay available to repair the view
+    os.remove(str(view_dir.join('bin', 'mpileaks')))
+    monkeypatch.setattr(fs, 'replace_directory_transaction', transaction)
+    with ev.read('test'):
+        env('view', 'regenerate', '--full')
+
+    check_mpileaks_and_deps_in_view(view_dir)
+    assert os.path.islink(str(view_dir.join('bin', 'mpileaks')))
+    with open(str(view_dir.join('.spack', 'manifest.json'))) as f:
+        manifest = sjson.load(f)['specs']
+    assert not any(e['name'] == 'a' for e in manifest.values())
+
+
 def test_env_activate_view_fails(
         tmpdir, mock_stage, mock_fetch, install_mockery, env_deactivate):
     """Sanity check on env activate to make sure it requires shell support"""
@@ -2109,6 +2178,55 @@ def test_duplicate_packages_raise_when_concretizing_together():
         e.concretize()
 
 
+def test_concretize_separately_in_parallel(mutable_config, monkeypatch):
+    user_specs = ['mpileaks', 'libelf', 'a foobar=bar', 'dyninst']
+
+    def concretize(jobs):
+        spack.config.set('config:build_jobs', jobs)
+        e = ev.create('parallel%d' % jobs)
+        for s in user_specs:
+            e.add(s)
+        e.concretize()
+        return [(str(u), c.build_hash()) for u, c in e.concretized_specs()]
+
+    monkeypatch.setattr(ev.multiprocessing, 'cpu_count', lambda: 4)
+    sequential = concretize(1)
+    parallel = concretize(4)
+
+    # Results are merged back in manifest order and match what the
+    # sequential path computes
+    assert [u for u, _ in parallel] == user_specs
+    assert parallel == sequential
+
+    # Specs that come back from the workers are concrete and hashed
+    specs = ev._concretize_in_parallel(
+        [[Spec('mpileaks')], [Spec('libelf')]]
+    )
+    assert all(s is not None and s.concrete for s in specs)
+    assert specs[0].dag_hash() == Spec('mpileaks').concretized().dag_hash()
+
+
+def test_concretize_in_parallel_keeps_concrete_constraints(
+        mutable_config, monkeypatch):
+    """Constraints that would not survive being sent to a worker as
+    strings, e.g. with a concrete dependency, are concretized in-process."""
+    monkeypatch.setattr(ev.multiprocessing, 'cpu_count', lambda: 4)
+    spack.config.set('config:build_jobs', 4)
+
+    libelf = Spec('libelf').concretized()
+    with_concrete_dep = Spec('libdwarf')
+    with_concrete_dep._add_dependency(libelf, ('build', 'link'))
+    assert ev._constraint_strs([with_concrete_dep]) is None
+    assert ev._constraint_strs([libelf]) is None
+    assert ev._constraint_strs([Spec('mpileaks ^mpich')]) == [
+        'mpileaks ^mpich']
+
+    specs = ev._concretize_in_parallel(
+        [[with_concrete_dep], [Spec('mpileaks')], [Spec('libelf')]])
+    assert specs[0] is None
+    assert all(s is not None and s.concrete for s in specs[1:])
+
+
 def test_env_write_only_non_default():
     env('create', 'test')
 
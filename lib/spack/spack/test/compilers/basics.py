@@ -19,6 +19,7 @@
 import spack.compilers as compilers
 import spack.spec
 import spack.util.environment
+import spack.util.file_cache
 
 from spack.compiler import Compiler
 from spack.util.executable import ProcessError
@@ -295,6 +296,106 @@ def module(*args):
     assert dirs == no_flag_dirs
 
 
+@pytest.fixture()
+def counting_compiler(tmpdir):
+    """A compiler script that logs its invocations and prints link paths."""
+    gcc = str(tmpdir.join('gcc'))
+    log = str(tmpdir.join('log'))
+
+    def write(version):
+        with open(gcc, 'w') as f:
+            f.write("""#!/bin/bash
+echo "$@" >> {0}
+echo '{1}'
+echo 'gcc version {2}'
+""".format(log, no_flag_output, version))
+        fs.set_executable(gcc)
+
+    def calls():
+        if not os.path.exists(log):
+            return 0
+        with open(log) as f:
+            return len(f.readlines())
+
+    write('4.5.0')
+    return gcc, write, calls
+
+
+@pytest.mark.enable_compiler_link_paths
+def test_compiler_link_paths_are_cached(
+        counting_compiler, mock_compiler_probe_cache, monkeypatch):
+    gcc, write, calls = counting_compiler
+    compiler = MockCompiler()
+
+    assert compiler._get_compiler_link_paths([gcc]) == no_flag_dirs
+    assert calls() == 1
+
+    # a new process reads the results from the misc cache
+    probe_cache = spack.compiler.CompilerProbeCache(
+        mock_compiler_probe_cache.file_cache)
+    monkeypatch.setattr(spack.compiler, 'probe_cache', probe_cache)
+    assert MockCompiler()._get_compiler_link_paths([gcc]) == no_flag_dirs
+    assert calls() == 1
+
+    # flags and the compiler environment are part of the key
+    compiler.flags = {'ldflags': ['--extra-flag']}
+    compiler._get_compiler_link_paths([gcc])
+    assert calls() == 2
+
+    compiler.environment = {'set': {'FOO': 'bar'}}
+    compiler._get_compiler_link_paths([gcc])
+    assert calls() == 3
+
+    compiler._get_compiler_link_paths([gcc])
+    assert calls() == 3
+
+    # changing the executable invalidates its entries
+    write('4.5.10')
+    compiler._get_compiler_link_paths([gcc])
+    assert calls() == 4
+
+
+def test_compiler_version_output_is_cached(counting_compiler):
+    gcc, write, calls = counting_compiler
+    memoized = spack.compiler._get_compiler_version_output.cache
+
+    output = spack.compiler.get_compiler_version_output(gcc, '--version')
+    assert 'gcc version 4.5.0' in output
+    memoized.clear()
+    assert spack.compiler.get_compiler_version_output(
+        gcc, '--version') == output
+    assert calls() == 1
+
+    write('4.5.10')
+    memoized.clear()
+    output = spack.compiler.get_compiler_version_output(gcc, '--version')
+    assert 'gcc version 4.5.10' in output
+    assert calls() == 2
+
+
+def test_compiler_probe_cache_errors(counting_compiler, tmpdir):
+    gcc, _, _ = counting_compiler
+    probe_cache = spack.compiler.CompilerProbeCache(
+        spack.util.file_cache.FileCache(str(tmpdir.join('cache'))))
+    probe_cache.set(gcc, ['version', '--version'], 'output')
+    assert probe_cache.get(gcc, ['version', '--version']) == 'output'
+
+    # a corrupt cache file is treated as a miss, and then replaced
+    cache_file = probe_cache.file_cache.cache_path(
+        spack.compiler.probe_cache_key)
+    with open(cache_file, 'w') as f:
+        f.write('{"not": json')
+    probe_cache = spack.compiler.CompilerProbeCache(probe_cache.file_cache)
+    assert probe_cache.get(gcc, ['version', '--version']) is None
+
+    probe_cache.set(gcc, ['version', '--version'], 'output')
+    assert probe_cache.get(gcc, ['version', '--version']) == 'output'
+
+    # compilers that cannot be identified are not cached
+    probe_cache.set('gcc', ['version', '--version'], 'output')
+    assert probe_cache.get('gcc', ['version', '--version']) is None
+
+
 # Get the desired flag from the specified compiler spec.
 def flag_value(flag, spec):
     compiler = None
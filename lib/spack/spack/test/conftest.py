@@ -10,16 +10,20 @@
 import itertools
 import os
 import os.path
+import re
 import shutil
 import tempfile
+import threading
 import xml.etree.ElementTree
 
 import py
 import pytest
+from six.moves import BaseHTTPServer, socketserver
 
 from llnl.util.filesystem import mkdirp, remove_linked_tree
 
 import spack.architecture
+import spack.compiler
 import spack.compilers
 import spack.config
 import spack.caches
@@ -33,7 +37,9 @@
 import spack.repo
 import spack.stage
 import spack.util.executable
+import spack.util.file_cache
 import spack.util.gpg
+import spack.util.web
 import spack.util.spack_yaml as syaml
 
 from spack.util.pattern import Bunch
@@ -654,6 +660,17 @@ def noop(*args):
         )
 
 
+@pytest.fixture(scope='function', autouse=True)
+def mock_compiler_probe_cache(monkeypatch, tmpdir_factory):
+    """Keep the results of running compilers out of the user's misc cache,
+    and from leaking between tests."""
+    cache_dir = tmpdir_factory.mktemp('compiler-probes')
+    probe_cache = spack.compiler.CompilerProbeCache(
+        spack.util.file_cache.FileCache(str(cache_dir)))
+    monkeypatch.setattr(spack.compiler, 'probe_cache', probe_cache)
+    yield probe_cache
+
+
 @pytest.fixture(scope='function')
 def install_mockery(tmpdir, config, mock_packages, monkeypatch):
     """Hooks a fake install directory, DB, and stage directory into Spack."""
@@ -1191,3 +1208,86 @@ def _factory(name, output, subdir=('bin',)):
         return str(f)
 
     return _factory
+
+
+class MockHTTPRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves ``server.files`` with keep-alive and range requests."""
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        byte_range = self.headers.get('Range')
+        self.server.requests.append((self.command, self.path, byte_range))
+
+        headers = {}
+        body = self.server.files.get(self.path)
+        if self.path in self.server.redirects:
+            status, body = 302, b''
+            headers['Location'] = self.server.redirects[self.path]
+        elif body is None:
+            status, body = 404, b''
+        elif byte_range:
+            start = int(re.match(r'bytes=(\d+)-', byte_range).group(1))
+            if start >= len(body):
+                status = 416
+                headers['Content-Range'] = 'bytes */%d' % len(body)
+                body = b''
+            else:
+                status = 206
+                headers['Content-Range'] = 'bytes %d-%d/%d' % (
+                    start, len(body) - 1, len(body))
+                body = body[start:]
+        else:
+            status = 200
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture()
+def mock_http_server():
+    """Local HTTP/1.1 server for tests of pooled web requests.
+
+    Add bytes to ``server.files`` and redirect targets to
+    ``server.redirects`` by path; the server records each request in
+    ``server.requests`` and counts connections in ``server.connections``.
+    """
+    server = MockHTTPServer(('127.0.0.1', 0), MockHTTPRequestHandler)
+    server.files = {}
+    server.redirects = {}
+    server.requests = []
+    server.connections = 0
+    server.url = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    spack.util.web.clear_connection_pool()
+    yield server
+    spack.util.web.clear_connection_pool()
+
+    server.shutdown()
+    server.server_close()
@@ -496,6 +496,129 @@ def test_017_write_and_read_without_uuid(mutable_database, monkeypatch):
         assert new_rec.installed == rec.installed
 
 
+def test_018_read_specs_lazily(database):
+    """Specs read from the DB index are only built when they are needed."""
+    db = spack.database.Database(database.root)
+    with db.read_transaction():
+        assert all(rec._spec is None for rec in db._data.values())
+
+        # Only the records of mpileaks, and of its dependencies, are built
+        assert len(db.query('mpileaks ^mpich')) == 1
+        built = set(key for key, rec in db._data.items()
+                    if rec._spec is not None)
+        needed = set(d.dag_hash() for s in db.query('mpileaks')
+                     for d in s.traverse())
+        assert built == needed
+        assert len(built) < len(db._data)
+
+        # Writing the DB back doesn't build the other specs
+        with open(os.devnull, 'w') as f:
+            db._write_to_file(f)
+        assert built == set(key for key, rec in db._data.items()
+                            if rec._spec is not None)
+
+        # Dependents are connected when needed
+        relatives = db.installed_relatives('callpath ^mpich', 'parents')
+        assert [s.name for s in relatives] == ['mpileaks']
+
+    # The lazily built specs are the same as those of the DB
+    for spec in db.query():
+        assert spec == database.get_record(spec).spec
+        assert spec.concrete
+
+
+def test_018_read_index(database, tmpdir):
+    """An index written by one database can be read into another one."""
+    with open(database._index_path) as f:
+        index_string = f.read()
+
+    db = spack.database.Database(str(tmpdir))
+    db.read_index(index_string)
+    assert set(db._data) == set(database._data)
+
+    with pytest.raises(spack.database.CorruptDatabaseError):
+        db.read_index('{"database": ')
+
+
+def test_019_query_package_not_in_repo(mutable_database, monkeypatch):
+    """Installed packages that were removed from the repo can be queried."""
+    exists = spack.repo.path.exists
+    monkeypatch.setattr(spack.repo.path, 'exists',
+                        lambda name: name != 'externaltool' and exists(name))
+
+    assert len(mutable_database.query('externaltool')) == 1
+    assert len(mutable_database.query('externaltool', known=False)) == 1
+    assert not mutable_database.query('externaltool', known=True)
+
+
+def test_018_corrupt_record_read_lazily(database, tmpdir):
+    """A record whose spec cannot be built fails on every access."""
+    with open(database._index_path) as f:
+        index = json.load(f)
+    mpileaks = database.query_one('mpileaks ^mpich')
+    hash_key = mpileaks.dag_hash()
+    index['database']['installs'][hash_key]['spec']['mpileaks']['arch'] = 5
+
+    db = spack.database.Database(str(tmpdir))
+    with open(db._index_path, 'w') as f:
+        json.dump(index, f)
+
+    with db.read_transaction():
+        rec = db._data[hash_key]
+        for _ in range(2):
+            with pytest.raises(spack.database.CorruptDatabaseError,
+                               match=hash_key):
+                rec.spec
+            assert rec.name == 'mpileaks'
+            assert rec.compiler_name == 'gcc'
+
+        # records that don't depend on it are still fine
+        assert db.query_one('callpath ^mpich').name == 'callpath'
+
+
+def test_019_query_indexes(mutable_database):
+    """Queries narrowed down by the secondary indexes of the DB return the
+    same specs as a scan of all its records."""
+    def check_queries():
+        for query_spec in ('mpileaks', 'mpi', 'mpi@2:', '%gcc',
+                           'callpath%gcc', 'externaltool', any):
+            for explicit in (any, True, False):
+                expected = sorted(
+                    rec.spec for rec in mutable_database._data.values()
+                    if rec.installed and
+                    (explicit is any or rec.explicit == explicit) and
+                    (query_spec is any or
+                     rec.spec.satisfies(query_spec, strict=True)))
+                assert mutable_database.query(
+                    query_spec, explicit=explicit) == expected
+
+    check_queries()
+    assert len(mutable_database.query('mpi')) == 3
+
+    # Indexes are kept up to date when records are removed ...
+    mutable_database.remove('mpileaks ^mpich')
+    mutable_database.remove('callpath ^mpich')
+    check_queries()
+    assert len(mutable_database.query('callpath')) == 2
+
+    # ... deprecated ...
+    mutable_database.deprecate(mutable_database.query_one('mpileaks ^zmpi'),
+                               mutable_database.query_one('mpileaks ^mpich2'))
+    check_queries()
+
+    # ... marked explicit ...
+    mutable_database.update_explicit('externaltool', True)
+    check_queries()
+    assert mutable_database.query('externaltool', explicit=True)
+
+    # ... and re-read
+    with mutable_database.write_transaction():
+        pass
+    new_db = spack.database.Database(mutable_database.root)
+    with new_db.read_transaction():
+        assert new_db._data.select(['externaltool'], explicit=True)
+
+
 def test_020_db_sanity(database):
     """Make sure query() returns what's actually in the db."""
     _check_db_sanity(database)
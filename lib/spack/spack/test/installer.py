@@ -7,12 +7,15 @@
 import py
 import pytest
 
+from multiprocessing import cpu_count
+
 import llnl.util.filesystem as fs
 import llnl.util.tty as tty
 import llnl.util.lock as ulk
 
 import spack.binary_distribution
 import spack.compilers
+import spack.config
 import spack.directory_layout as dl
 import spack.installer as inst
 import spack.package_prefs as prefs
@@ -535,7 +538,7 @@ def test_check_deps_status_install_failure(install_mockery, monkeypatch):
     monkeypatch.setattr(spack.database.Database, 'prefix_failed', _true)
 
     with pytest.raises(inst.InstallError, match='install failure'):
-        installer._check_deps_status()
+        installer._check_deps_status(spec.package)
 
 
 def test_check_deps_status_write_locked(install_mockery, monkeypatch):
@@ -545,7 +548,7 @@ def test_check_deps_status_write_locked(install_mockery, monkeypatch):
     monkeypatch.setattr(inst.PackageInstaller, '_ensure_locked', _not_locked)
 
     with pytest.raises(inst.InstallError, match='write locked by another'):
-        installer._check_deps_status()
+        installer._check_deps_status(spec.package)
 
 
 def test_check_deps_status_external(install_mockery, monkeypatch):
@@ -553,7 +556,7 @@ def test_check_deps_status_external(install_mockery, monkeypatch):
 
     # Mock the known dependent, b, as external so assumed to be installed
     monkeypatch.setattr(spack.spec.Spec, 'external', True)
-    installer._check_deps_status()
+    installer._check_deps_status(spec.package)
     assert 'b' in installer.installed
 
 
@@ -562,7 +565,7 @@ def test_check_deps_status_upstream(install_mockery, monkeypatch):
 
     # Mock the known dependent, b, as installed upstream
     monkeypatch.setattr(spack.package.PackageBase, 'installed_upstream', True)
-    installer._check_deps_status()
+    installer._check_deps_status(spec.package)
     assert 'b' in installer.installed
 
 
@@ -964,3 +967,178 @@ def test_install_skip_patch(install_mockery, mock_fetch):
     installer.install(fake=False, skip_patch=True)
 
     assert 'b' in installer.installed
+
+
+def test_install_concurrent_builds(install_mockery, mock_fetch, monkeypatch):
+    """Test install building independent packages at the same time."""
+    orig_wait = inst.PackageInstaller._wait_for_builds
+    in_progress = []
+
+    def _wait(installer, keep_prefix, fail_fast):
+        in_progress.append(len(installer.build_processes))
+        return orig_wait(installer, keep_prefix, fail_fast)
+
+    monkeypatch.setattr(inst.PackageInstaller, '_wait_for_builds', _wait)
+
+    spec, installer = create_installer('mpileaks')
+    with spack.config.override('config:build_jobs', 4):
+        installer.install(fake=True, jobs_packages=2)
+
+    assert installer.jobs_per_build == max(1, min(4, cpu_count()) // 2)
+    assert not installer.build_processes
+    assert max(in_progress) == 2
+    assert all(s.package.installed for s in spec.traverse())
+
+
+@pytest.mark.disable_clean_stage_check
+def test_install_concurrent_failure(install_mockery, mock_fetch, capsys):
+    """Test concurrent install of a failing dependency skips dependents."""
+    spec, installer = create_installer('dependent-install')
+
+    def _fail(*args, **kwargs):
+        raise RuntimeError('mock build failure')
+
+    dep_pkg = spec['dependency-install'].package
+    dep_pkg.unit_test_check = lambda: True
+    dep_pkg.do_stage = _fail
+
+    msg = 'Installation of dependent-install failed'
+    with pytest.raises(spack.installer.InstallError, match=msg):
+        installer.install(jobs_packages=2)
+
+    assert 'dependency-install' in installer.failed
+    assert 'dependent-install' in installer.failed
+    assert not installer.build_processes
+
+    out = str(capsys.readouterr())
+    assert 'Skipping build of dependent-install' in out
+
+
+def test_batch_roots(install_mockery):
+    """Test roots with different specs of the same package are split."""
+    pkgs = []
+    for name in ['mpileaks ^mpich', 'libdwarf', 'mpileaks ^zmpi', 'a']:
+        spec = spack.spec.Spec(name)
+        spec.concretize()
+        pkgs.append(spec.package)
+
+    batches = inst.batch_roots(pkgs)
+    assert batches == [[pkgs[0], pkgs[1], pkgs[3]], [pkgs[2]]]
+
+
+def test_install_roots_shared_dag(install_mockery, mock_fetch, monkeypatch):
+    """Test installing several roots in a single build DAG."""
+    specs = [spack.spec.Spec(name) for name in ['libdwarf', 'mpileaks']]
+    for spec in specs:
+        spec.concretize()
+
+    installer = inst.PackageInstaller(specs[0].package, [specs[1].package])
+    installer._init_queue(True, True)
+
+    # The dependencies shared by the roots have a single task, which knows
+    # about their dependents in both DAGs
+    ids = list(installer.build_tasks)
+    assert len(ids) == len(set(ids))
+    assert ids.count('libelf') == 1
+    assert installer.build_tasks['libelf'].dependents == set(
+        ['libdwarf', 'dyninst'])
+
+    installer = inst.PackageInstaller(specs[0].package, [specs[1].package])
+    with spack.config.override('config:build_jobs', 4):
+        installer.install(fake=True, jobs_packages=2)
+
+    assert installer.root_ids == set(['libdwarf', 'mpileaks'])
+    for spec in specs:
+        assert all(s.package.installed for s in spec.traverse())
+        _, rec = spack.store.db.query_by_spec_hash(spec.dag_hash())
+        assert rec.explicit
+    _, rec = spack.store.db.query_by_spec_hash(specs[1]['libelf'].dag_hash())
+    assert not rec.explicit
+
+
+def test_prefetchable(install_mockery, mock_fetch):
+    """Test which packages have their sources prefetched."""
+    spec, installer = create_installer('dependent-install')
+    pkg = spec.package
+    assert inst._prefetchable(pkg, False)
+
+    # The mock fetcher has no checksum, so its downloads are not cached
+    # and would be destroyed when restaging
+    assert not inst._prefetchable(pkg, True)
+
+    # Stages this install did not create are not touched
+    pkg.stage.create()
+    try:
+        assert not inst._prefetchable(pkg, False)
+    finally:
+        pkg.stage.destroy()
+
+    pkg.manual_download = True
+    assert not inst._prefetchable(pkg, False)
+
+
+def test_install_prefetch(install_mockery, mock_fetch, monkeypatch):
+    """Test sources are downloaded before the builds that need them."""
+    orig_wait = inst.PackageInstaller._wait_for_prefetch
+    fetched = []
+
+    def _wait(installer, task):
+        prefetched = task.pkg_id in installer.prefetches
+        orig_wait(installer, task)
+        if prefetched:
+            fetched.append((task.pkg_id, task.pkg.stage.archive_file))
+
+    monkeypatch.setattr(inst.PackageInstaller, '_wait_for_prefetch', _wait)
+
+    spec, installer = create_installer('dependent-install')
+    installer.install(prefetch_jobs=2)
+
+    assert sorted(pkg_id for pkg_id, _ in fetched) == [
+        'dependency-install', 'dependent-install']
+    assert all(archive for _, archive in fetched)
+    assert installer.prefetch_pool is None
+    assert not installer.prefetches
+    assert all(s.package.installed for s in spec.traverse())
+
+
+@pytest.mark.disable_clean_stage_check
+def test_install_prefetch_failure(install_mockery, mock_fetch):
+    """Test prefetched sources of packages that are not built are removed."""
+    spec, installer = create_installer('dependent-install')
+
+    def _fail(*args, **kwargs):
+        raise RuntimeError('mock build failure')
+
+    dep_pkg = spec['dependency-install'].package
+    dep_pkg.unit_test_check = lambda: True
+    dep_pkg.do_stage = _fail
+
+    with pytest.raises(spack.installer.InstallError):
+        installer.install(prefetch_jobs=2)
+
+    assert 'dependent-install' in installer.failed
+    assert not os.path.exists(spec.package.stage.path)
+    assert installer.prefetch_pool is None
+
+
+@pytest.mark.disable_clean_stage_check
+def test_install_prefetch_failure_keeps_existing_stages(
+        install_mockery, mock_fetch):
+    """Test stages that existed before the install are not removed."""
+    spec, installer = create_installer('dependent-install')
+
+    def _fail(*args, **kwargs):
+        raise RuntimeError('mock build failure')
+
+    dep_pkg = spec['dependency-install'].package
+    dep_pkg.unit_test_check = lambda: True
+    dep_pkg.do_stage = _fail
+
+    stage = spec.package.stage
+    stage.create()
+    try:
+        with pytest.raises(spack.installer.InstallError):
+            installer.install(prefetch_jobs=2)
+        assert os.path.exists(stage.path)
+    finally:
+        stage.destroy()
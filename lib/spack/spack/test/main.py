@@ -4,10 +4,17 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import os
+import sys
 
 import llnl.util.filesystem as fs
 
+import spack.caches
+import spack.cmd
+import spack.main
 import spack.paths
+import spack.util.file_cache
+import spack.util.import_profile as import_profile
+import spack.util.spack_json as sjson
 from spack.main import get_version, main
 
 
@@ -61,3 +68,89 @@ def test_get_version_bad_git(tmpdir, working_env):
 
     os.environ["PATH"] = str(tmpdir)
     assert spack.spack_version == get_version()
+
+
+def test_main_profile_startup(tmpdir, capsys, working_env):
+    os.environ["PATH"] = str(tmpdir)
+    main(["--profile-startup", "-V"])
+    out, err = capsys.readouterr()
+    assert spack.spack_version == out.strip()
+    assert "self (s)" in err
+
+    # the profiler is stopped once the report is printed
+    assert import_profile._start_time is None
+
+
+def test_import_profile_records_new_modules():
+    sys.modules.pop("colorsys", None)
+    import_profile.start()
+    try:
+        import colorsys  # noqa
+        import os.path  # noqa
+    finally:
+        import_profile.stop()
+
+    assert [r[0] for r in import_profile._records] == ["colorsys"]
+
+
+def test_command_index(tmpdir, monkeypatch):
+    monkeypatch.setattr(spack.caches, "misc_cache",
+                        spack.util.file_cache.FileCache(str(tmpdir)))
+    index = spack.main.command_index()
+    assert sorted(index) == spack.cmd.all_commands()
+    assert index["install"]["section"] == "build"
+
+    imported = []
+    get_module = spack.cmd.get_module
+
+    def _get_module(cmd_name):
+        imported.append(cmd_name)
+        return get_module(cmd_name)
+    monkeypatch.setattr(spack.cmd, "get_module", _get_module)
+
+    # Commands are not imported while the cached index is up to date
+    assert spack.main.command_index() == index
+    assert not imported
+
+    # Only commands whose source changed are imported again
+    getmtime = os.path.getmtime
+    index_mtime = spack.caches.misc_cache.mtime(
+        spack.main.command_index_cache)
+
+    def _getmtime(path):
+        if os.path.basename(path) == "info.py":
+            return index_mtime + 1
+        return getmtime(path)
+    monkeypatch.setattr(os.path, "getmtime", _getmtime)
+
+    assert spack.main.command_index() == index
+    assert imported == ["info"]
+
+
+def test_command_index_corrupt(tmpdir, monkeypatch):
+    monkeypatch.setattr(spack.caches, "misc_cache",
+                        spack.util.file_cache.FileCache(str(tmpdir)))
+    index = spack.main.command_index()
+
+    # A corrupt index is rebuilt, and rewritten
+    index_path = spack.caches.misc_cache.cache_path(
+        spack.main.command_index_cache)
+    with open(index_path, "w") as f:
+        f.write('{"install": ')
+    assert spack.main.command_index() == index
+    with open(index_path) as f:
+        assert sjson.load(f) == index
+
+
+def test_command_index_unwritable_cache(tmpdir, monkeypatch):
+    cache = spack.util.file_cache.FileCache(str(tmpdir))
+    monkeypatch.setattr(spack.caches, "misc_cache", cache)
+
+    def _fail(*args, **kwargs):
+        raise spack.util.file_cache.CacheError("Cannot access cache")
+    monkeypatch.setattr(cache, "init_entry", _fail)
+
+    index = spack.main.command_index()
+    assert sorted(index) == spack.cmd.all_commands()
+    assert not os.path.exists(cache.cache_path(
+        spack.main.command_index_cache))
@@ -5,11 +5,14 @@
 
 import filecmp
 import os
+import time
+
 import pytest
 
 import spack.repo
 import spack.mirror
 import spack.util.executable
+import spack.version
 from spack.spec import Spec
 from spack.stage import Stage
 from spack.util.executable import which
@@ -224,3 +227,80 @@ def test_mirror_cache_symlinks(tmpdir):
     assert os.path.exists(link_target)
     assert (os.path.normpath(link_target) ==
             os.path.join(cache.root, reference.storage_path))
+
+
+@pytest.fixture
+def pkg_with_hash_source(mock_packages, tmpdir):
+    """Point the version of trivial-pkg-with-valid-hash at a local file."""
+    pkg = spack.repo.get('trivial-pkg-with-valid-hash')
+    local_path = str(tmpdir.join(os.path.basename(pkg.url)))
+    with open(local_path, 'w') as f:
+        f.write(pkg.hashed_content)
+    pkg.versions[spack.version.Version('1.0')]['url'] = 'file://' + local_path
+    return Spec('trivial-pkg-with-valid-hash').concretized()
+
+
+def test_mirror_create_parallel(tmpdir, mock_archive, pkg_with_hash_source):
+    set_up_package('trivial-install-test-package', mock_archive, 'url')
+    repos.clear()
+    specs = [Spec('trivial-install-test-package').concretized(),
+             pkg_with_hash_source]
+    mirror_root = str(tmpdir.join('mirror'))
+
+    with spack.config.override('config:checksum', False):
+        present, mirrored, error = spack.mirror.create(
+            mirror_root, specs, jobs=2, jobs_per_host=1)
+        assert (present, error) == ([], [])
+        assert set(mirrored) == set(specs)
+        assert set(os.listdir(mirror_root)) == set(
+            ['_source-cache'] + [s.name for s in specs])
+
+        present, mirrored, error = spack.mirror.create(
+            mirror_root, specs, jobs=2)
+        assert (mirrored, error) == ([], [])
+        assert set(present) == set(specs)
+
+
+def test_mirror_create_replaces_corrupt_archive(tmpdir, pkg_with_hash_source):
+    mirror_root = str(tmpdir.join('mirror'))
+    spack.mirror.create(mirror_root, [pkg_with_hash_source])
+
+    archive = os.path.join(
+        mirror_root, 'trivial-pkg-with-valid-hash',
+        'trivial-pkg-with-valid-hash-1.0')
+    with open(archive, 'w') as f:
+        f.write('corrupted content')
+
+    present, mirrored, error = spack.mirror.create(
+        mirror_root, [pkg_with_hash_source])
+    assert (present, mirrored, error) == ([], [pkg_with_hash_source], [])
+    with open(archive) as f:
+        assert f.read() == pkg_with_hash_source.package.hashed_content
+
+
+def _add_spec_exclusively(index, mirror):
+    """Mock mirroring worker that fails if another worker uses its host."""
+    marker = os.path.join(mirror.root, '%s.lock' % (index % 2))
+    try:
+        fd = os.open(marker, os.O_CREAT | os.O_EXCL)
+    except OSError:
+        return index, 0, 0, True
+    time.sleep(0.1)
+    os.close(fd)
+    os.remove(marker)
+    return index, 1, 0, False
+
+
+def test_mirror_create_jobs_per_host(tmpdir, monkeypatch):
+    monkeypatch.setattr(spack.mirror, '_add_spec_in_worker',
+                        _add_spec_exclusively)
+    monkeypatch.setattr(spack.mirror, '_fetch_host',
+                        lambda spec: spec.name)
+
+    specs = [Spec(name) for name in ('a', 'b', 'a', 'b', 'a', 'b')]
+    for i, spec in enumerate(specs):
+        spec.versions = spack.version.ver(str(i))
+    present, mirrored, error = spack.mirror.create(
+        str(tmpdir), specs, jobs=4, jobs_per_host=1)
+    assert (present, error) == ([], [])
+    assert len(mirrored) == len(specs)
@@ -281,7 +281,7 @@ def test_replace_prefix_bin(hello_world):
     executable = hello_world(rpaths=['/usr/lib', '/usr/lib64'])
 
     # Relocate the RPATHs
-    spack.relocate._replace_prefix_bin(str(executable), '/usr', '/foo')
+    spack.relocate._replace_prefix_bin(str(executable), {'/usr': '/foo'})
 
     # Some compilers add rpaths so ensure changes included in final result
     assert '/foo/lib:/foo/lib64' in rpaths_for(executable)
@@ -447,3 +447,82 @@ def test_relocate_text_old_sbang(tmpdir, sbang_line):
     )
 
     assert expected == open(str(path)).read()
+
+
+def test_relocate_text_single_pass(tmpdir):
+    """Ensure prefixes are replaced once, even when the new layout root is
+    nested in the original one, and unchanged files are left alone."""
+    orig_root = '/orig/root'
+    new_root = '/orig/root/nested'
+    orig_prefix = orig_root + '/pkg-abcdef'
+    new_prefix = new_root + '/pkg-abcdef'
+    orig_dep = orig_root + '/dep-123456'
+    new_dep = new_root + '/dep-123456'
+
+    path = tmpdir.ensure('relocated.txt')
+    path.write('\n'.join([
+        orig_prefix + '/bin',
+        '-I{0}/include -L{1}/lib'.format(orig_dep, orig_prefix),
+        orig_root + '/share',
+        '/other' + orig_root,
+    ]))
+    untouched = tmpdir.ensure('untouched.txt')
+    untouched.write('nothing to relocate here\n')
+    untouched.setmtime(0)
+
+    spack.relocate.relocate_text(
+        [str(path), str(untouched)],
+        orig_root, new_root,
+        orig_prefix, new_prefix,
+        '/orig/spack', '/new/spack',
+        {orig_dep: new_dep}
+    )
+
+    assert path.read() == '\n'.join([
+        new_prefix + '/bin',
+        '-I{0}/include -L{1}/lib'.format(new_dep, new_prefix),
+        new_root + '/share',
+        '/other' + orig_root,
+    ])
+    assert untouched.mtime() == 0
+
+
+def test_replace_prefix_bin_single_scan(tmpdir):
+    """Ensure all prefixes are patched in place in a single scan and files
+    without any prefix are left untouched."""
+    binary = tmpdir.ensure('binary')
+    binary.write_binary(
+        b'\x7fELF\x00/old/dep/lib\x00/old/prefix/lib:/old/dep/lib\x00\x01')
+    untouched = tmpdir.ensure('untouched')
+    untouched.write_binary(b'\x7fELF\x00/usr/lib\x00')
+    untouched.setmtime(0)
+    empty = tmpdir.ensure('empty')
+
+    prefix_to_prefix = {'/old/prefix': '/new', '/old/dep': '/dep'}
+    for path in (binary, untouched, empty):
+        spack.relocate._replace_prefix_bin(str(path), prefix_to_prefix)
+
+    assert binary.read_binary() == (
+        b'\x7fELF\x00/////dep/lib\x00////////new/lib://///dep/lib\x00\x01')
+    assert untouched.mtime() == 0
+    assert empty.read_binary() == b''
+
+    with pytest.raises(spack.relocate.BinaryStringReplacementError):
+        spack.relocate._replace_prefix_bin(
+            str(binary), {'/dep': '/much/longer/dep'})
+
+
+def test_prefix_regexes_are_bounded():
+    """Ensure compiled prefix regexes are reused, but not kept for every
+    set of prefixes ever relocated."""
+    old_dirs = (b'/old/dep', b'/old/prefix')
+    text_regex = spack.relocate._prefix_text_regex(old_dirs)
+    bin_regex = spack.relocate._prefix_bin_regex(old_dirs)
+    assert text_regex is not bin_regex
+    assert spack.relocate._prefix_text_regex(old_dirs) is text_regex
+    assert spack.relocate._prefix_bin_regex(old_dirs) is bin_regex
+
+    maxsize = spack.relocate._prefix_regexes.maxsize
+    for i in range(2 * maxsize):
+        spack.relocate._prefix_bin_regex((('/old/%d' % i).encode('utf-8'),))
+    assert len(spack.relocate._prefix_regexes) == maxsize
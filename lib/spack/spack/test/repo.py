@@ -6,8 +6,14 @@
 import os
 import pytest
 
-import spack.repo
+import llnl.util.lang
+
+import spack.caches
+import spack.config
 import spack.paths
+import spack.repo
+import spack.util.file_cache
+import spack.util.imp
 
 
 @pytest.fixture()
@@ -67,3 +73,77 @@ def test_repo_invisibles(mutable_mock_repo, extra_repo):
     with open(os.path.join(extra_repo.root, 'packages', '.invisible'), 'w'):
         pass
     extra_repo.all_package_names()
+
+
+def test_repo_index_built_in_parallel(
+        mock_packages, mutable_config, tmpdir, monkeypatch):
+    """Indexes built from fragments computed by worker processes are the
+    same as indexes built sequentially."""
+    monkeypatch.setattr(spack.repo.multiprocessing, 'cpu_count', lambda: 4)
+    spack.config.set('config:build_jobs', 4)
+
+    def build_indexes(threshold):
+        cache = spack.util.file_cache.FileCache(str(tmpdir.mkdtemp()))
+        monkeypatch.setattr(spack.caches, 'misc_cache', cache)
+        monkeypatch.setattr(spack.repo, '_parallel_index_threshold', threshold)
+
+        repo = spack.repo.Repo(spack.paths.mock_packages_path)
+        return (repo.provider_index, repo.tag_index, repo.patch_index,
+                repo.metadata_index)
+
+    # All the packages are indexed from fragments
+    update = spack.repo.Indexer.__dict__['update']
+    monkeypatch.setattr(spack.repo.Indexer, 'update', None)
+    providers, tags, patches, metadata = build_indexes(threshold=0)
+    monkeypatch.setattr(spack.repo.Indexer, 'update', update)
+    assert 'mpi' in providers.providers
+    assert tags['tag1']
+    assert patches.index
+
+    expected = build_indexes(threshold=float('inf'))
+    assert providers == expected[0]
+    assert dict(tags) == dict(expected[1])
+    assert patches.index == expected[2].index
+    assert dict(metadata) == dict(expected[3])
+
+
+def test_repo_index_serial_if_import_lock_held(
+        mock_packages, mutable_config, monkeypatch):
+    """Worker processes are not forked while the import lock is held."""
+    monkeypatch.setattr(spack.repo.multiprocessing, 'cpu_count', lambda: 4)
+    spack.config.set('config:build_jobs', 4)
+    monkeypatch.setattr(spack.repo, '_parallel_index_threshold', 0)
+    monkeypatch.setattr(spack.util.imp, 'import_lock_held', lambda: True)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError('worker pool created')
+    monkeypatch.setattr(llnl.util.lang.fork_context, 'Pool', _fail)
+
+    repo = spack.repo.Repo(spack.paths.mock_packages_path)
+    assert repo.index._index_fragments(['mpich', 'mpileaks']) == {}
+
+
+def test_import_lock_released_on_error():
+    imp_importer = pytest.importorskip('spack.util.imp.imp_importer')
+    with pytest.raises(ValueError):
+        with imp_importer.import_lock():
+            raise ValueError()
+    assert not imp_importer.import_lock_held()
+
+
+def test_package_metadata(mock_packages):
+    metadata = spack.repo.path.package_metadata('mpileaks')
+    pkg_cls = spack.repo.path.get_pkg_class('mpileaks')
+    assert metadata == spack.repo.MetadataIndex.package_metadata(pkg_cls)
+
+    assert metadata['description'] == pkg_cls.__doc__
+    assert metadata['versions'] == ['1.0', '2.1', '2.2', '2.3']
+    assert metadata['dependencies']['mpi'] == ['build', 'link']
+    assert set(metadata['dependencies']) == set(['mpi', 'callpath'])
+    assert metadata['provided'] == []
+
+    mpich = spack.repo.path.package_metadata('builtin.mock.mpich')
+    assert mpich['provided'] == ['mpi']
+
+    with pytest.raises(spack.repo.UnknownPackageError):
+        spack.repo.path.package_metadata('not-a-package')
@@ -89,3 +89,17 @@ def test_yaml_aliases():
 
     # ensure no YAML aliases appear in syaml dumps.
     assert '*id' not in string
+
+
+@pytest.mark.parametrize('value', [
+    'foo', '1.0', '', 'true', 'yes', 'null', '~', '0o7', '2019-01-01',
+    'a b', ' a', 'a ', "it's", '-f', '-', '*', '@x', 'a:b', 'a,b', '[x]',
+    'x#y', 'x #y', '#x', '---x', '/a/b c', 'a\\b', 'x\ty', 'x\ny', u'\xe9',
+    0, -1, 1.5, True, False, None, [], ['a', 1, None], {}, {'a': []},
+    {'': 'x'}, {'k' * 128: 'v'},
+])
+def test_dump_flow_style(value):
+    """dump_flow_style() writes the same text as ruamel."""
+    data = syaml.syaml_dict([('key', value), ('list', [value, value])])
+    assert (syaml.dump_flow_style(data) ==
+            syaml.dump(data, default_flow_style=True))
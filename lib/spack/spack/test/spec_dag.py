@@ -13,6 +13,7 @@
 from spack.spec import Spec
 from spack.dependency import all_deptypes, Dependency, canonical_deptype
 from spack.util.mock_package import MockPackageMultiRepo
+from spack.version import ver
 
 
 def check_links(spec_to_check):
@@ -618,6 +619,40 @@ def test_copy_concretized(self):
         copy_ids = set(id(s) for s in copy.traverse())
         assert not orig_ids.intersection(copy_ids)
 
+    def test_copy_concretized_shares_attributes(self):
+        orig = Spec('mpileaks')
+        orig.concretize()
+        copy = orig.copy()
+
+        # copies of concrete nodes share their immutable attributes
+        for o, c in zip(orig.traverse(), copy.traverse()):
+            assert o.versions is c.versions
+            assert o.architecture is c.architecture
+            assert o.compiler is c.compiler
+            assert o.variants is not c.variants
+            assert c.variants.spec is c
+            for name in o.variants:
+                assert o.variants[name] is c.variants[name]
+
+        # until they stop being concrete
+        copy.normalize(force=True)
+        for o, c in zip(orig.traverse(), copy.traverse()):
+            assert o.versions is not c.versions
+            assert o.architecture is not c.architecture
+            assert o.versions == c.versions
+            assert o.architecture == c.architecture
+            for name in o.variants:
+                assert o.variants[name] is not c.variants[name]
+
+        copy.versions.intersect(ver('0.0:0.1'))
+        assert orig.versions != copy.versions
+
+        # copies of abstract specs never share
+        abstract = Spec('mpileaks@1.0 +debug')
+        copy = abstract.copy()
+        assert abstract.versions is not copy.versions
+        assert abstract.variants['debug'] is not copy.variants['debug']
+
     """
     Here is the graph with deptypes labeled (assume all packages have a 'dt'
     prefix). Arrows are marked with the deptypes ('b' for 'build', 'l' for
@@ -16,6 +16,7 @@
 import spack.architecture
 import spack.directives
 import spack.error
+import spack.spec
 
 
 def make_spec(spec_like, concrete):
@@ -485,6 +486,37 @@ def test_copy_satisfies_transitive(self):
             assert s.satisfies(copy[s.name])
             assert copy[s.name].satisfies(s)
 
+    def test_satisfies_cache(self):
+        cache = spack.spec.satisfies_cache
+        cache.clear()
+
+        spec = Spec('mpileaks ^mpich').concretized()
+        assert spec.satisfies('^mpi', strict=True)
+        hits, misses = cache.hits, cache.misses
+        assert misses > 0
+
+        # Checks against the same constraint are cached by hash, so they
+        # also hit for copies of the spec.
+        assert spec.copy().satisfies('^mpi', strict=True)
+        assert (cache.hits, cache.misses) == (hits + 1, misses)
+
+        assert not spec.satisfies('^zmpi', strict=True)
+        assert not spec.satisfies('^mpich@:0.1', strict=True)
+        assert spec.satisfies('^mpich@3:', strict=True)
+
+        # Results are not cached for abstract specs
+        hits, misses = cache.hits, cache.misses
+        assert Spec('mpileaks ^mpich').satisfies('^mpi')
+        assert (cache.hits, cache.misses) == (hits, misses)
+
+        # A concrete spec read without its build dependencies has the
+        # same DAG hash, but must not share results with the original
+        spec = Spec('dttop').concretized()
+        no_build_deps = Spec.from_dict(spec.to_dict())
+        assert no_build_deps.dag_hash() == spec.dag_hash()
+        assert spec.satisfies('^dtbuild1', strict=True)
+        assert not no_build_deps.satisfies('^dtbuild1', strict=True)
+
     def test_unsatisfiable_compiler_flag_mismatch(self):
         # No matchi in specs
         check_unsatisfiable(
@@ -13,6 +13,7 @@
 import spack.repo
 import spack.store
 import spack.spec as sp
+import spack.version as vn
 from spack.parse import Token
 from spack.spec import Spec
 from spack.spec import SpecParseError, RedundantSpecError
@@ -806,3 +807,31 @@ def test_kv_with_spaces(self):
     ])
     def test_target_tokenization(self, expected_tokens, spec_string):
         self.check_lex(expected_tokens, spec_string)
+
+    def test_parse_cache(self):
+        spec_str = 'mvapich_foo ^_openmpi@1.2:1.4,1.6%intel@12.1+debug~qt_4'
+        sp._parsed_specs.clear()
+
+        first = Spec(spec_str)
+        first.versions = vn.VersionList('2.0')
+        first['_openmpi'].variants['debug'].value = False
+
+        # The second parse is a copy of the cached spec, which is not
+        # affected by changes to the specs returned earlier
+        second = Spec(spec_str)
+        assert (sp._parsed_specs.hits, sp._parsed_specs.misses) == (1, 1)
+        assert str(second) == str(Spec(spec_str))
+        assert second.satisfies('^_openmpi+debug')
+        assert second.versions == vn.VersionList(':')
+
+        # Specs with architectures are not cached
+        Spec('mvapich_foo target=x86_64')
+        assert 'mvapich_foo target=x86_64' not in sp._parsed_specs
+
+    def test_fast_split_matches_shlex(self):
+        spec_str = 'mvapich_foo  debug=4\t^ _openmpi @1.2 cflags="-O3 -g"'
+        parser = sp.SpecParser()
+        parser.setup(spec_str.replace('"', ''))
+        assert parser.text == shlex.split(spec_str.replace('"', ''))
+        parser.setup(spec_str)
+        assert parser.text == shlex.split(spec_str)
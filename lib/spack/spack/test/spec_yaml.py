@@ -211,6 +211,50 @@ def test_ordered_read_not_required_for_consistent_dag_hash(
         assert spec.full_hash() == round_trip_reversed_json_spec.full_hash()
 
 
+@pytest.mark.parametrize('spec_str,dag_hash,build_hash', [
+    ('mpileaks ^mpich', 'b4ervofanrurvlocnwdcezqekdphknd6',
+     'b4ervofanrurvlocnwdcezqekdphknd6'),
+    ('mpileaks ^zmpi', 'xqeg3akn4qgkoio7fyclrsdavd5nmnup',
+     'xqeg3akn4qgkoio7fyclrsdavd5nmnup'),
+    ('dyninst', 'xvb3xy52riui7jyceawrf3v3p4k5m4qk',
+     'xvb3xy52riui7jyceawrf3v3p4k5m4qk'),
+    ('externaltool', 'g23g42apkjyzmtuatxvabiaffh2u25kp',
+     'g23g42apkjyzmtuatxvabiaffh2u25kp'),
+    ('patch-several-dependencies', 'ijm6xlzene7rgn4wa4yelferavt6n5ku',
+     'ijm6xlzene7rgn4wa4yelferavt6n5ku'),
+    ('multivalue-variant foo=bar,baz', '2is4agwwnfy6brb36cgnhe4rzlgsighx',
+     '2is4agwwnfy6brb36cgnhe4rzlgsighx'),
+    ('dttop', 'ka2ompwmyzpeujhya4fxqum22ulvivq7',
+     'jltbkdehiyywjz2eyzrq2qwdrkfi65om'),
+    ('libelf cflags="-O2 -g"', 'nldlflcbw56smswdxwhyoqfptf7cmmdk',
+     'nldlflcbw56smswdxwhyoqfptf7cmmdk'),
+    ('hdf5', 'rpel7uarcsdzaypckszj2tsseywlf4yb',
+     'rpel7uarcsdzaypckszj2tsseywlf4yb'),
+])
+def test_hashes_are_stable(config, mock_packages, spec_str, dag_hash,
+                           build_hash):
+    """Hashes of the mock packages must not change when the way they are
+    computed changes."""
+    spec = Spec(spec_str).concretized()
+    assert spec.dag_hash() == dag_hash
+    assert spec.build_hash() == build_hash
+
+
+@pytest.mark.parametrize('spec_str', [
+    'mpileaks ^zmpi', 'dttop', 'externaltool', 'patch-several-dependencies',
+    'multivalue-variant foo=bar,baz', 'libelf cflags="-O2 -g"'
+])
+def test_node_dicts_are_hashed_as_yaml(config, mock_packages, spec_str):
+    """The text hashed for each node is the flow style YAML of its node
+    dictionary."""
+    spec = Spec(spec_str).concretized()
+    for s in spec.traverse():
+        for hash in (ht.dag_hash, ht.build_hash, ht.full_hash):
+            node_dict = s.to_node_dict(hash=hash)
+            assert (syaml.dump_flow_style(node_dict) ==
+                    syaml.dump(node_dict, default_flow_style=True))
+
+
 @pytest.mark.parametrize("module", [
     spack.spec,
     spack.architecture,
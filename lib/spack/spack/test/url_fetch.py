@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 import collections
+import hashlib
 import os
 import pytest
 import sys
@@ -247,8 +248,63 @@ def _which(*args, **kwargs):
     fetcher = fs.URLFetchStrategy(url=url)
     assert fetcher is not None
 
-    with pytest.raises(TypeError, match='object is not callable'):
-        with Stage(fetcher, path=testpath) as stage:
-            out = stage.fetch()
+    with spack.config.override('config:url_fetch_method', 'curl'):
+        with pytest.raises(TypeError, match='object is not callable'):
+            with Stage(fetcher, path=testpath) as stage:
+                out = stage.fetch()
+
+            assert err_fmt.format('curl') in out
+
+
+def test_fetch_pooled(tmpdir, mock_http_server, monkeypatch):
+    """Ensure HTTP downloads use pooled connections rather than curl."""
+    monkeypatch.setattr(fs.URLFetchStrategy, 'curl', None)
+    mock_http_server.files['/a-1.0.tar.gz'] = b'archive'
+    mirror_url = mock_http_server.url + '/mirror/a-1.0.tar.gz'
 
-        assert err_fmt.format('curl') in out
+    fetcher = fs.URLFetchStrategy(
+        url=mock_http_server.url + '/a-1.0.tar.gz', mirrors=[mirror_url])
+    with Stage(fetcher, path=str(tmpdir)) as stage:
+        # Resume a download that was interrupted
+        with open(stage.save_filename + '.part', 'wb') as f:
+            f.write(b'arc')
+
+        stage.fetch()
+        with open(fetcher.archive_file, 'rb') as f:
+            assert f.read() == b'archive'
+
+    assert mock_http_server.requests == [
+        ('HEAD', '/a-1.0.tar.gz', None),
+        ('GET', '/a-1.0.tar.gz', 'bytes=3-')]
+    assert mock_http_server.connections == 1
+
+
+def test_fetch_pooled_checksum(tmpdir, mock_http_server, monkeypatch):
+    """Ensure pooled downloads are checksummed while they are fetched."""
+    good, bad = b'archive', b'corrupted archive'
+    digest = hashlib.sha256(good).hexdigest()
+    mock_http_server.files['/a-1.0.tar.gz'] = good
+    mock_http_server.files['/bad/a-1.0.tar.gz'] = bad
+
+    fetcher = fs.URLFetchStrategy(
+        url=mock_http_server.url + '/bad/a-1.0.tar.gz',
+        mirrors=[mock_http_server.url + '/a-1.0.tar.gz'],
+        sha256=digest)
+    with Stage(fetcher, path=str(tmpdir)) as stage:
+        # The corrupted download is rejected in favor of the mirror
+        stage.fetch()
+        with open(fetcher.archive_file, 'rb') as f:
+            assert f.read() == good
+
+        # Checking compares the digest recorded while fetching
+        def _check(self, filename):
+            raise AssertionError('archive was checksummed again')
+        monkeypatch.setattr(crypto.Checker, 'check', _check)
+        stage.check()
+
+        # A changed archive does not match the recorded digest
+        with open(fetcher.archive_file, 'wb') as f:
+            f.write(bad)
+        monkeypatch.undo()
+        with pytest.raises(fs.ChecksumError):
+            stage.check()
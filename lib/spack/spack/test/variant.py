@@ -687,6 +687,11 @@ def test_copy(self):
 
         c = a.copy()
         assert a == c
+        assert all(a[k] is not c[k] for k in a)
+
+        c = a.copy(deep=False)
+        assert a == c
+        assert all(a[k] is c[k] for k in a)
 
     def test_str(self):
         c = VariantMap(None)
@@ -2,6 +2,7 @@
 # Spack Project Developers. See the top-level COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import hashlib
 import os
 
 import ordereddict_backport
@@ -195,3 +196,93 @@ def test_list_url(tmpdir):
                               'file-0.txt',
                               'file-1.txt',
                               'file-2.txt']
+
+
+def test_http_request_reuses_connections(mock_http_server):
+    mock_http_server.files['/a.tar.gz'] = b'aaaa'
+    mock_http_server.files['/b.tar.gz'] = b'bbbb'
+    url = mock_http_server.url
+
+    for name in ('a.tar.gz', 'b.tar.gz', 'c.tar.gz'):
+        for method in ('HEAD', 'GET'):
+            with spack.util.web.http_request(url + '/' + name,
+                                             method) as response:
+                response.read()
+
+    assert len(mock_http_server.requests) == 6
+    assert mock_http_server.connections == 1
+
+
+def test_probe_url(mock_http_server):
+    mock_http_server.files['/a.tar.gz'] = b'aaaa'
+    mock_http_server.redirects['/moved.tar.gz'] = '/a.tar.gz'
+    url = mock_http_server.url
+
+    assert spack.util.web.probe_url(url + '/a.tar.gz')
+    assert spack.util.web.probe_url(url + '/moved.tar.gz')
+    assert not spack.util.web.probe_url(url + '/missing.tar.gz')
+    assert len(mock_http_server.requests) == 4
+
+    # Probes are cached
+    assert spack.util.web.probe_url(url + '/a.tar.gz')
+    assert not spack.util.web.probe_url(url + '/missing.tar.gz')
+    assert len(mock_http_server.requests) == 4
+
+
+def test_probe_unreachable_server(mock_http_server):
+    url = mock_http_server.url
+    mock_http_server.shutdown()
+    mock_http_server.server_close()
+
+    assert not spack.util.web.probe_url(url + '/a.tar.gz')
+    with pytest.raises(spack.util.web.NoNetworkConnectionError):
+        spack.util.web.http_request(url + '/b.tar.gz')
+
+
+def test_download_url_resumes(mock_http_server, tmpdir):
+    mock_http_server.files['/a.tar.gz'] = b'0123456789'
+    url = mock_http_server.url + '/a.tar.gz'
+
+    partial = tmpdir.join('a.tar.gz.part')
+    partial.write(b'01234', mode='wb')
+    spack.util.web.download_url(url, str(partial))
+    assert partial.read(mode='rb') == b'0123456789'
+    assert mock_http_server.requests[-1] == ('GET', '/a.tar.gz', 'bytes=5-')
+
+    # Nothing is left to download for a complete file
+    spack.util.web.download_url(url, str(partial))
+    assert partial.read(mode='rb') == b'0123456789'
+
+    # A partial file that is too long is downloaded again
+    partial.write(b'01234567890123', mode='wb')
+    spack.util.web.download_url(url, str(partial))
+    assert partial.read(mode='rb') == b'0123456789'
+    assert mock_http_server.connections == 1
+
+
+def test_download_url_not_found(mock_http_server, tmpdir):
+    partial = tmpdir.join('a.tar.gz.part')
+    partial.write(b'01234', mode='wb')
+
+    with pytest.raises(spack.util.web.HTTPError) as e:
+        spack.util.web.download_url(
+            mock_http_server.url + '/a.tar.gz', str(partial))
+    assert e.value.status == 404
+    assert not partial.exists()
+
+
+def test_download_url_hashes(mock_http_server, tmpdir):
+    mock_http_server.files['/a.tar.gz'] = b'0123456789'
+    url = mock_http_server.url + '/a.tar.gz'
+    expected = hashlib.sha256(b'0123456789').hexdigest()
+
+    partial = tmpdir.join('a.tar.gz.part')
+    partial.write(b'01234', mode='wb')
+    hasher = hashlib.sha256()
+    spack.util.web.download_url(url, str(partial), hasher=hasher)
+    assert hasher.hexdigest() == expected
+
+    # The whole file is hashed if it was already complete
+    hasher = hashlib.sha256()
+    spack.util.web.download_url(url, str(partial), hasher=hasher)
+    assert hasher.hexdigest() == expected
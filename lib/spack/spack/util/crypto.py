@@ -88,18 +88,23 @@ def hash_fun_for_digest(hexdigest):
     return hash_fun_for_algo(hash_algo_for_digest(hexdigest))
 
 
-def checksum(hashlib_algo, filename, **kwargs):
-    """Returns a hex digest of the filename generated using an
-       algorithm from hashlib.
-    """
-    block_size = kwargs.get('block_size', 2**20)
-    hasher = hashlib_algo()
+def update_hash(hasher, filename, block_size=2**20):
+    """Feeds the contents of the file to a hashlib hash object."""
     with open(filename, 'rb') as file:
         while True:
             data = file.read(block_size)
             if not data:
                 break
             hasher.update(data)
+
+
+def checksum(hashlib_algo, filename, **kwargs):
+    """Returns a hex digest of the filename generated using an
+       algorithm from hashlib.
+    """
+    block_size = kwargs.get('block_size', 2**20)
+    hasher = hashlib_algo()
+    update_hash(hasher, filename, block_size)
     return hasher.hexdigest()
 
 
@@ -17,6 +17,6 @@
 """
 
 try:
-    from .importlib_importer import load_source  # noqa
+    from .importlib_importer import load_source, import_lock_held  # noqa
 except ImportError:
-    from .imp_importer import load_source        # noqa
+    from .imp_importer import load_source, import_lock_held        # noqa
@@ -16,8 +16,18 @@
 @contextmanager
 def import_lock():
     imp.acquire_lock()
-    yield
-    imp.release_lock()
+    try:
+        yield
+    finally:
+        imp.release_lock()
+
+
+def import_lock_held():
+    """Whether any thread holds the global import lock.
+
+    Processes forked while it is held cannot import anything.
+    """
+    return imp.lock_held()
 
 
 def load_source(full_name, path, prepend=None):
@@ -29,6 +29,15 @@ def get_data(self, path):
             return self.prepend.encode() + b"\n" + data
 
 
+def import_lock_held():
+    """Whether any thread holds the global import lock.
+
+    ``importlib`` uses per-module locks, which are reinitialized in forked
+    processes, so this is always False.
+    """
+    return False
+
+
 def load_source(full_name, path, prepend=None):
     """Import a Python module from source.
 
@@ -0,0 +1,119 @@
+# Copyright 2013-2020 Lawrence Livermore National Security, LLC and other
+# Spack Project Developers. See the top-level COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+
+"""Import-time profiling for ``spack --profile-startup``.
+
+``start()`` wraps the builtin ``__import__`` to record how long each
+newly loaded module takes to import, and ``report()`` prints the most
+expensive ones.  ``bin/spack`` starts profiling before it imports
+``spack.main`` so that the report covers all of Spack's startup.
+
+This module must only import from the standard library.
+"""
+import sys
+import time
+
+try:
+    import builtins
+except ImportError:  # Python 2
+    import __builtin__ as builtins
+
+#: time at which profiling started, or None if it is not running
+_start_time = None
+
+#: the ``__import__`` function that ``start()`` replaced
+_original_import = None
+
+#: (module name, self time, cumulative time) of each recorded import
+_records = []
+
+#: time spent in nested imports, for each import in progress
+_nested = []
+
+
+def _timed_import(name, *args, **kwargs):
+    """``__import__`` replacement that records new modules' import times."""
+    nmodules = len(sys.modules)
+    _nested.append(0.0)
+    start = time.time()
+    try:
+        return _original_import(name, *args, **kwargs)
+    finally:
+        elapsed = time.time() - start
+        nested = _nested.pop()
+
+        # lookups of modules that were already loaded are not recorded
+        if len(sys.modules) > nmodules:
+            level = args[3] if len(args) > 3 else kwargs.get('level', 0)
+            if level > 0:
+                module_globals = args[0] if args else kwargs.get('globals')
+                name = _absolute_name(name, module_globals or {}, level)
+            _records.append((name, elapsed - nested, elapsed))
+            if _nested:
+                _nested[-1] += elapsed
+
+
+def _absolute_name(name, module_globals, level):
+    """Resolve the name of a relative import, for the report."""
+    package = module_globals.get('__package__')
+    if not package:
+        package = module_globals.get('__name__', '')
+        if '__path__' not in module_globals:
+            package = package.rpartition('.')[0]
+
+    if level > 1:
+        package = package.rsplit('.', level - 1)[0]
+    return '%s.%s' % (package, name) if name else package
+
+
+def start():
+    """Start recording import times, unless we already are."""
+    global _start_time, _original_import
+    if _start_time is not None:
+        return
+
+    del _records[:]
+    _start_time = time.time()
+    _original_import = builtins.__import__
+    builtins.__import__ = _timed_import
+
+
+def stop():
+    """Stop recording import times; the records are kept for ``report()``."""
+    global _start_time
+    if _start_time is None:
+        return
+
+    builtins.__import__ = _original_import
+    _start_time = None
+
+
+def report(lines=20, stream=None):
+    """Stop profiling and print the modules that took longest to import.
+
+    Args:
+        lines (int or str): number of modules to show, or ``'all'``
+        stream (file): where to print the report (default: stderr)
+    """
+    if stream is None:
+        stream = sys.stderr
+
+    if _start_time is None:
+        return
+    total = time.time() - _start_time
+    stop()
+
+    imported = sum(self_time for _, self_time, _ in _records)
+    stream.write(
+        'Imported %d modules in %.3fs (%.3fs since profiling started)\n'
+        % (len(_records), imported, total))
+
+    records = sorted(_records, key=lambda r: r[1], reverse=True)
+    if lines != 'all':
+        records = records[:int(lines)]
+
+    stream.write('%10s %12s  %s\n' % ('self (s)', 'cumul. (s)', 'module'))
+    for name, self_time, cumulative in records:
+        stream.write('%10.4f %12.4f  %s\n' % (self_time, cumulative, name))
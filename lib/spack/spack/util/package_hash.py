@@ -7,7 +7,6 @@
 import hashlib
 
 import spack.repo
-import spack.package
 import spack.directives
 import spack.error
 import spack.spec
@@ -61,6 +60,7 @@ def is_directive(self, node):
                 node.value.func.id in spack.directives.__all__)
 
     def is_spack_attr(self, node):
+        import spack.package  # spack.package imports this module
         return (isinstance(node, ast.Assign) and
                 node.targets and isinstance(node.targets[0], ast.Name) and
                 node.targets[0].id in spack.package.Package.metadata_attrs)
@@ -14,9 +14,10 @@
 """
 import ctypes
 import collections
+import re
 
 from ordereddict_backport import OrderedDict
-from six import string_types, StringIO
+from six import string_types, text_type, StringIO
 
 import ruamel.yaml as yaml
 from ruamel.yaml import RoundTripLoader, RoundTripDumper
@@ -207,6 +208,100 @@ def dump(obj, default_flow_style=False, stream=None):
                      Dumper=SafeDumper, stream=stream)
 
 
+#: Dumper used only to resolve the implicit tags of plain scalars
+_resolver = SafeDumper(None)
+
+#: Exact types of the scalars written by ``dump_flow_style()``
+_str_types = set([str, syaml_str, text_type])
+_int_types = set([int, syaml_int])
+
+#: Characters (or sequences) that prevent a scalar from being plain in a
+#: flow collection, anywhere but at its start
+_flow_indicators = re.compile(r'[,?\[\]{}:]| #')
+
+#: Scalars made only of these characters need no escaping
+_printable = re.compile(r'^[\x20-\x7e]*$')
+
+
+class _FlowStyleUnsupported(Exception):
+    """Raised for data that ``dump_flow_style()`` doesn't know how to write
+    the way ruamel does."""
+
+
+def _flow_scalar(value, tag, key=False):
+    """Write a scalar the way ruamel's emitter does in a flow collection."""
+    if not value:
+        if key:
+            raise _FlowStyleUnsupported()
+        return "''"
+    if not _printable.match(value) or (key and len(value) >= 128):
+        raise _FlowStyleUnsupported()
+
+    plain = not (value.startswith(('---', '...')) or
+                 value[0] in '#,[]{}&*!|>\'"%@`?: ' or
+                 value[-1] == ' ' or
+                 (value[0] == '-' and value[1:2] in ('', ' ')) or
+                 _flow_indicators.search(value, 1))
+    if plain and _resolver.resolve(
+            yaml.nodes.ScalarNode, value, (True, False)) == tag:
+        return value
+    if tag != u'tag:yaml.org,2002:str':
+        raise _FlowStyleUnsupported()
+    return "'%s'" % value.replace("'", "''")
+
+
+def _flow_style_items(obj, out):
+    """Append the flow style text of ``obj`` to the ``out`` list."""
+    obj_type = type(obj)
+    if obj_type in (syaml_dict, dict):
+        out.append('{')
+        for i, (key, value) in enumerate(obj.items()):
+            if i:
+                out.append(', ')
+            if type(key) not in _str_types:
+                raise _FlowStyleUnsupported()
+            out.append(_flow_scalar(key, u'tag:yaml.org,2002:str', key=True))
+            out.append(': ')
+            _flow_style_items(value, out)
+        out.append('}')
+    elif obj_type in (syaml_list, list):
+        out.append('[')
+        for i, value in enumerate(obj):
+            if i:
+                out.append(', ')
+            _flow_style_items(value, out)
+        out.append(']')
+    elif obj_type in _str_types:
+        out.append(_flow_scalar(obj, u'tag:yaml.org,2002:str'))
+    elif obj_type is bool:
+        out.append('true' if obj else 'false')
+    elif obj_type in _int_types:
+        out.append(_flow_scalar(str(obj), u'tag:yaml.org,2002:int'))
+    elif obj is None:
+        out.append("!!null ''")
+    else:
+        raise _FlowStyleUnsupported()
+
+
+def dump_flow_style(obj):
+    """Return the same text as ``dump(obj, default_flow_style=True)``.
+
+    The text is written directly for the dictionaries, lists and simple
+    scalars that make up e.g. spec node dictionaries, which is much faster
+    than going through ruamel's representer, serializer and emitter.
+    Anything else is dumped by ruamel.
+    """
+    if type(obj) in (syaml_dict, dict):
+        out = []
+        try:
+            _flow_style_items(obj, out)
+            out.append('\n')
+            return ''.join(out)
+        except _FlowStyleUnsupported:
+            pass
+    return dump(obj, default_flow_style=True)
+
+
 def file_line(mark):
     """Format a mark as <file>:<line> information."""
     result = mark.name
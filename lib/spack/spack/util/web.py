@@ -12,13 +12,18 @@
 import os.path
 import re
 import shutil
+import socket
 import ssl
 import sys
+import threading
 import traceback
 
 import six
+from six.moves import http_client
 from six.moves.urllib.error import URLError
+from six.moves.urllib.parse import urljoin, urlunparse
 from six.moves.urllib.request import urlopen, Request
+from six.moves.urllib.request import getproxies, proxy_bypass
 
 try:
     # Python 2 had these in the HTMLParser package.
@@ -34,6 +39,7 @@ class HTMLParseError(Exception):
 from llnl.util.filesystem import mkdirp
 import llnl.util.tty as tty
 
+import spack
 import spack.cmd
 import spack.config
 import spack.error
@@ -48,6 +54,28 @@ class HTMLParseError(Exception):
 # Timeout in seconds for web requests
 _timeout = 10
 
+#: HTTP status codes of redirects followed by ``http_request()``
+_redirect_codes = (301, 302, 303, 307, 308)
+
+#: Maximum number of redirects followed for one request
+_max_redirects = 10
+
+#: Size of the blocks in which ``download_url()`` writes files
+_block_size = 64 * 1024
+
+#: Largest unread response body that is read to the end, rather than
+#: closing the connection, so that the connection can be reused
+_max_drain_size = 64 * 1024
+
+#: Message for certificate errors, which are often due to local setup
+_ssl_error_message = (
+    "Spack was unable to fetch {0} due to an invalid certificate. This is "
+    "either an attack, or your cluster's SSL configuration is bad.  If you "
+    "believe your SSL configuration is bad, you can try running spack -k, "
+    "which will not check SSL certificates. Use this at your own risk.")
+
+_ssl_errors = (ssl.SSLError, getattr(ssl, 'CertificateError', ssl.SSLError))
+
 
 class LinkParser(HTMLParser):
     """This parser just takes an HTML page and strips out the hrefs on the
@@ -488,6 +516,369 @@ def _urlopen(req, *args, **kwargs):
     return opener(req, *args, **kwargs)
 
 
+def can_pool(url):
+    """Whether ``url`` can be requested through the connection pool.
+
+    Only HTTP and HTTPS URLs are supported, and only when no proxy is
+    configured for them.  HTTPS also needs a Python that can verify
+    certificates.
+    """
+    url = url_util.parse(url)
+    if url.scheme not in ('http', 'https') or url.username:
+        return False
+
+    if url.scheme == 'https' and __UNABLE_TO_VERIFY_SSL:
+        return False
+
+    return not (url.scheme in getproxies() and not proxy_bypass(url.hostname))
+
+
+#: SSL contexts used by pooled HTTPS connections, by value of verify_ssl
+_ssl_contexts = {}
+
+
+def _ssl_context():
+    verify_ssl = spack.config.get('config:verify_ssl')
+    if verify_ssl not in _ssl_contexts:
+        if verify_ssl:
+            _ssl_contexts[verify_ssl] = ssl.create_default_context()  # novm
+        else:
+            _ssl_contexts[verify_ssl] = ssl._create_unverified_context()
+    return _ssl_contexts[verify_ssl]
+
+
+class ConnectionPool(object):
+    """Persistent HTTP and HTTPS connections, kept for reuse per server.
+
+    Connections go back to the pool once a response has been read, so
+    that later requests to the same server skip the TCP and TLS
+    handshakes.  The pool is thread-safe, and connections inherited by a
+    forked process are not reused.  Servers that could not be reached are
+    remembered, so an unreachable mirror costs only one timeout.
+    """
+
+    def __init__(self, max_idle=4):
+        #: maximum number of idle connections kept for each server
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._idle = {}
+        self._unreachable = set()
+
+    def _check_pid(self):
+        # Sockets inherited from the parent process are shared with it.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = {}
+
+    def get(self, url, timeout=None):
+        """Get a connection to the server of ``url``.
+
+        Returns:
+            (tuple): the connection, and whether it was reused from the pool
+        """
+        with self._lock:
+            self._check_pid()
+            idle = self._idle.get((url.scheme, url.netloc))
+            if idle:
+                return idle.pop(), True
+        return self.connect(url, timeout), False
+
+    def connect(self, url, timeout=None):
+        """Open a new connection to the server of ``url``."""
+        key = (url.scheme, url.netloc)
+        if key in self._unreachable:
+            raise NoNetworkConnectionError(
+                'could not connect to ' + url.netloc, url_util.format(url))
+
+        if url.scheme == 'https':
+            conn = http_client.HTTPSConnection(
+                url.hostname, url.port, timeout=timeout,
+                context=_ssl_context())
+        else:
+            conn = http_client.HTTPConnection(
+                url.hostname, url.port, timeout=timeout)
+
+        try:
+            conn.connect()
+        except _ssl_errors as e:
+            conn.close()
+            tty.debug(str(e))
+            raise SpackWebError(
+                _ssl_error_message.format(url_util.format(url)))
+        except socket.error as e:
+            conn.close()
+            with self._lock:
+                self._unreachable.add(key)
+            raise NoNetworkConnectionError(str(e), url_util.format(url))
+
+        # Like curl, only time out while connecting.
+        conn.sock.settimeout(None)
+        return conn
+
+    def put(self, url, conn):
+        """Return a connection whose last response was read to the end."""
+        with self._lock:
+            self._check_pid()
+            idle = self._idle.setdefault((url.scheme, url.netloc), [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        """Close idle connections and forget unreachable servers."""
+        with self._lock:
+            self._check_pid()
+            idle, self._idle = self._idle, {}
+            self._unreachable.clear()
+
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+#: Connections shared by all pooled requests
+_pool = ConnectionPool()
+
+#: Results of ``probe_url()``, by URL
+_probed_urls = {}
+
+
+def clear_connection_pool():
+    """Close pooled connections and forget what was learned about URLs."""
+    _pool.clear()
+    _probed_urls.clear()
+
+
+class PooledResponse(object):
+    """Response to a request made with ``http_request()``.
+
+    Use it as a context manager.  On exit, the connection goes back to the
+    pool if the response was read to the end, and is closed otherwise.
+    """
+
+    def __init__(self, url, parsed_url, conn, response):
+        #: URL that gave this response, after any redirects
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self._parsed_url = parsed_url
+        self._conn = conn
+        self._response = response
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        return self._response.read(amt)
+
+    @property
+    def incomplete(self):
+        """True if the connection closed before the whole body arrived."""
+        return bool(self._response.length) and self._response.isclosed()
+
+    def close(self):
+        if self._conn is None:
+            return
+
+        response = self._response
+        if not response.isclosed() and response.length is not None and \
+                response.length <= _max_drain_size:
+            try:
+                response.read()
+            except (http_client.HTTPException, socket.error):
+                pass
+
+        reusable = not (response.will_close or self.incomplete)
+        if response.isclosed() and reusable:
+            _pool.put(self._parsed_url, self._conn)
+        else:
+            self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _pooled_request(url, method, headers, timeout):
+    path = urlunparse(('', '', url.path or '/', url.params, url.query, ''))
+
+    conn, reused = _pool.get(url, timeout)
+    while True:
+        try:
+            conn.request(method, path, headers=headers)
+            response = conn.getresponse()
+            break
+        except (http_client.HTTPException, socket.error) as e:
+            conn.close()
+            if not reused:
+                raise SpackWebError('{0} {1} failed: {2}'.format(
+                    method, url_util.format(url), str(e)))
+
+            # The server closed the connection while it was in the pool.
+            conn, reused = _pool.connect(url, timeout), False
+
+    return PooledResponse(url_util.format(url), url, conn, response)
+
+
+def http_request(url, method='GET', headers=None, timeout=None):
+    """Make an HTTP or HTTPS request over a pooled connection.
+
+    Redirects are followed, and connections closed by the server while
+    they were idle are replaced transparently.
+
+    Args:
+        url (str): URL to request, which must satisfy ``can_pool()``
+        method (str): HTTP method to use
+        headers (dict): additional request headers
+        timeout (int): timeout in seconds for new connections (default:
+            ``config:connect_timeout``)
+
+    Returns:
+        (PooledResponse): the response, after any redirects
+
+    Raises:
+        NoNetworkConnectionError: if the server could not be reached
+        UnpoolableURLError: if a redirect leads to an unsupported URL
+        SpackWebError: if the request failed for another reason
+    """
+    if timeout is None:
+        timeout = spack.config.get('config:connect_timeout', 10)
+
+    request_headers = {'User-Agent': 'Spack/' + spack.spack_version}
+    request_headers.update(headers or {})
+
+    for _ in range(_max_redirects + 1):
+        response = _pooled_request(
+            url_util.parse(url), method, request_headers, timeout or None)
+
+        location = response.getheader('Location')
+        if response.status not in _redirect_codes or not location:
+            return response
+
+        response.close()
+        url = urljoin(url, location)
+        if not can_pool(url):
+            raise UnpoolableURLError(url)
+
+    raise SpackWebError('Too many redirects', 'Last URL was ' + url)
+
+
+def probe_url(url, timeout=None):
+    """Check whether ``url`` exists, with a request over a pooled connection.
+
+    The result is kept, so later probes of the same URL, e.g. by other
+    packages on the same mirror, cost nothing.
+
+    Returns:
+        (bool): True if the server has the resource at ``url``
+
+    Raises:
+        UnpoolableURLError: if a redirect leads to an unsupported URL
+    """
+    if url in _probed_urls:
+        return _probed_urls[url]
+
+    try:
+        with http_request(url, 'HEAD', timeout=timeout) as response:
+            status = response.status
+
+        if status in (403, 405, 501):
+            # Some servers refuse HEAD requests; ask for the first byte.
+            headers = {'Range': 'bytes=0-0'}
+            with http_request(url, headers=headers,
+                              timeout=timeout) as response:
+                status = response.status
+
+    except NoNetworkConnectionError as e:
+        tty.debug(str(e))
+        status = None
+
+    except UnpoolableURLError:
+        raise
+
+    except SpackWebError as e:
+        # Don't remember errors that might be transient.
+        tty.debug(str(e))
+        return False
+
+    _probed_urls[url] = status is not None and 200 <= status < 300
+    return _probed_urls[url]
+
+
+def download_url(url, path, headers=None, timeout=None, hasher=None):
+    """Download ``url`` to ``path`` over a pooled connection.
+
+    If ``path`` exists, only the rest of the file is requested, so an
+    interrupted download resumes where it stopped.  The file is kept if
+    the transfer breaks off, but not if the server answers with an error.
+
+    If a hashlib ``hasher`` is given, it is updated with the content of the
+    whole file as the download proceeds.  Only a part of the file that was
+    already on disk is read back from it.
+
+    Returns:
+        (str): the content type of the response, or None
+
+    Raises:
+        HTTPError: if the server answered with an error status
+        UnpoolableURLError: if a redirect leads to an unsupported URL
+        SpackWebError: if the download failed for another reason
+    """
+    request_headers = dict(headers or {})
+    offset = os.path.getsize(path) if os.path.exists(path) else 0
+    if offset:
+        request_headers['Range'] = 'bytes={0}-'.format(offset)
+
+    with http_request(url, headers=request_headers,
+                      timeout=timeout) as response:
+        content_type = response.getheader('Content-Type')
+
+        if offset and response.status == 416:
+            # Nothing left to fetch if the file is already complete.
+            if response.getheader('Content-Range') == 'bytes */{0}'.format(
+                    offset):
+                if hasher:
+                    spack.util.crypto.update_hash(hasher, path)
+                return content_type
+            response.close()
+            os.remove(path)
+            return download_url(url, path, headers, timeout, hasher)
+
+        if response.status not in (200, 206):
+            if os.path.exists(path):
+                os.remove(path)
+            raise HTTPError(response.url, response.status, response.reason)
+
+        mode = 'ab' if response.status == 206 else 'wb'
+        if hasher and mode == 'ab':
+            spack.util.crypto.update_hash(hasher, path)
+
+        try:
+            with open(path, mode) as f:
+                while True:
+                    block = response.read(_block_size)
+                    if not block:
+                        break
+                    f.write(block)
+                    if hasher:
+                        hasher.update(block)
+        except (http_client.HTTPException, socket.error) as e:
+            raise SpackWebError(
+                'Download of {0} was interrupted'.format(url), str(e))
+
+        if response.incomplete:
+            raise SpackWebError(
+                'Download of {0} was interrupted'.format(url),
+                'The server closed the connection early')
+
+    return content_type
+
+
 def find_versions_of_archive(
         archive_urls, list_url=None, list_depth=0, concurrency=32
 ):
@@ -614,3 +1005,20 @@ def __init__(self, message, url):
             "No network connection: " + str(message),
             "URL was: " + str(url))
         self.url = url
+
+
+class HTTPError(SpackWebError):
+    """Raised when a server answers a request with an error status."""
+    def __init__(self, url, status, reason):
+        super(HTTPError, self).__init__(
+            "{0} {1}: {2}".format(status, reason, url))
+        self.url = url
+        self.status = status
+
+
+class UnpoolableURLError(SpackWebError):
+    """Raised when a pooled request is redirected to an unsupported URL."""
+    def __init__(self, url):
+        super(UnpoolableURLError, self).__init__(
+            "Cannot make pooled requests to " + str(url))
+        self.url = url
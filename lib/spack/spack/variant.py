@@ -577,15 +577,22 @@ def concrete(self):
             v in self for v in self.spec.package_class.variants
         )
 
-    def copy(self):
+    def copy(self, deep=True):
         """Return an instance of VariantMap equivalent to self.
 
+        Args:
+            deep (bool): if False, the clone shares its variant instances
+                with self
+
         Returns:
             VariantMap: a copy of self
         """
         clone = VariantMap(self.spec)
-        for name, variant in self.items():
-            clone[name] = variant.copy()
+        if deep:
+            for name, variant in self.items():
+                clone[name] = variant.copy()
+        else:
+            clone.dict.update(self.dict)
         return clone
 
     def __str__(self):